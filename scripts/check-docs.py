@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Microsoft Copilot Agent Team - Documentation Checker
+
+Link and freshness check for the quarterly documentation review
+(DOCS-MAINTENANCE.md). Only files changed since the last run are re-parsed,
+and external links are re-requested only when their cached result expires.
+
+Usage:
+    python check-docs.py
+    python check-docs.py --local-only
+    python check-docs.py --full --json report.json
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from utils.doc_links import (
+    DEFAULT_HOST_RATE,
+    DEFAULT_MAX_WORKERS,
+    DEFAULT_PER_HOST,
+    DEFAULT_STALE_DAYS,
+    DEFAULT_STATE_FILE,
+    DocLinkChecker,
+)
+from utils.profiling import run_with_profiling
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def print_report(report: dict) -> None:
+    print(f"📚 Checked {report['files']} file(s), {report['links']} link(s) "
+          f"in {report['duration_seconds']:.2f}s")
+    print(f"   Re-parsed: {len(report['changed_files'])} changed file(s)")
+    print(f"   External: {report['external_urls']} unique URL(s), {report['external_checked']} requested")
+
+    broken = report["broken_links"]
+    if broken:
+        print(f"\n❌ Broken links ({len(broken)}):")
+        for issue in broken:
+            print(f"  {issue['file']}:{issue['line']}  {issue['url']}  ({issue['error']})")
+    else:
+        print("\n✅ No broken links")
+
+    if report["stale_files"]:
+        print(f"\n⚠️  Stale files ({len(report['stale_files'])}):")
+        for item in report["stale_files"]:
+            print(f"  {item['file']:50} last updated {item['last_updated']} ({item['age_days']} days)")
+    if report["missing_last_updated"]:
+        print(f"\n⚠️  No 'Last Updated' date: {', '.join(report['missing_last_updated'])}")
+
+    versions = sorted({v for found in report["versions"].values() for v in found})
+    if len(versions) > 1:
+        print(f"\n🔢 Version references: {', '.join(versions)}")
+        for name, found in report["versions"].items():
+            print(f"  {name:50} {', '.join(found)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check documentation links and freshness")
+    parser.add_argument("--root", default=str(REPO_ROOT), help="Repository root (default: this repository)")
+    parser.add_argument("--state-file", default=DEFAULT_STATE_FILE,
+                        help=f"Result cache, relative to the root (default: {DEFAULT_STATE_FILE})")
+    parser.add_argument("--full", action="store_true", help="Ignore the cache and check everything")
+    parser.add_argument("--local-only", action="store_true", help="Skip external (http/https) links")
+    parser.add_argument("--max-workers", type=int, default=DEFAULT_MAX_WORKERS,
+                        help=f"External checks in flight (default: {DEFAULT_MAX_WORKERS})")
+    parser.add_argument("--per-host", type=int, default=DEFAULT_PER_HOST,
+                        help=f"Concurrent requests per host (default: {DEFAULT_PER_HOST})")
+    parser.add_argument("--host-rate", type=float, default=DEFAULT_HOST_RATE,
+                        help=f"Requests per second per host (default: {DEFAULT_HOST_RATE:g})")
+    parser.add_argument("--stale-days", type=int, default=DEFAULT_STALE_DAYS,
+                        help=f"Report files not updated for this many days (default: {DEFAULT_STALE_DAYS})")
+    parser.add_argument("--json", metavar="FILE", help="Also write the report as JSON")
+
+    args = parser.parse_args()
+
+    checker = DocLinkChecker(
+        args.root,
+        state_file=args.state_file,
+        max_workers=args.max_workers,
+        per_host=args.per_host,
+        host_rate=args.host_rate,
+        stale_days=args.stale_days,
+    )
+    report = checker.run(full=args.full, external=not args.local_only)
+    print_report(report)
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"\n📄 Report written to {args.json}")
+
+    return 1 if report["broken_links"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(run_with_profiling(main))
@@ -9,11 +9,15 @@ Usage:
     python create-agents.py --agent orchestrator
     python create-agents.py --agent architecture-specialist
     python create-agents.py --all
+    python create-agents.py --all --profile    # profile the run (see utils/profiling.py)
 """
 
 import argparse
 import sys
 
+from utils.profiling import run_with_profiling
+from utils.prompts import render_prompt
+
 # Agent creation configurations
 # These match the detailed specifications from agent-team-design.md
 
@@ -322,6 +326,7 @@ def create_agent(agent_key: str, dry_run: bool = False):
     print(f"\n{'[DRY RUN] ' if dry_run else ''}Creating: {config['name']}")
     print(f"  Description: {config['description'][:80]}...")
     print(f"  Toolkits: {', '.join(config['selected_toolkits'])}")
+    print(f"  Prompt: {len(render_prompt(config['prompt_sections']))} characters")
     
     if dry_run:
         print("  [Would call manage_agents(action='create', ...)]")
@@ -392,4 +397,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    run_with_profiling(main)
@@ -12,14 +12,31 @@ Usage:
     python deploy-agents.py --phase 2
     python deploy-agents.py --phase 3
     python deploy-agents.py --all
+    python deploy-agents.py --all --plan       # show create/update/delete/no-op actions only
+    python deploy-agents.py --canary microsoft-troubleshooter --canary-share 0.2
+    python deploy-agents.py --all --fleet environments.json --summary fleet-summary.json
+    python deploy-agents.py --all --profile    # profile the run (see utils/profiling.py)
 """
 
 import argparse
 import json
+import os
+import re
 import sys
 from pathlib import Path
 from typing import List, Dict
 
+from utils.backend import DEFAULT_STATE_FILE, AgentBackend, StandInBackend
+from utils.canary import (
+    DEFAULT_LATENCY_THRESHOLD, DEFAULT_MIN_SAMPLES, DEFAULT_TRAFFIC_SHARE, CanaryDeployment,
+)
+from utils.fleet import (
+    DEFAULT_MAX_CONCURRENCY, DEFAULT_PER_ENVIRONMENT, DEFAULT_PER_TENANT,
+    EnvironmentResult, FleetDeployer, FleetEnvironment, load_fleet,
+)
+from utils.plan import DELETE, NOOP, UPDATE, apply_action, build_plan, format_plan, plan_agent
+from utils.profiling import run_with_profiling
+
 # Agent configuration data
 AGENT_CONFIGS = {
     "phase1": [
@@ -80,6 +97,62 @@ AGENT_CONFIGS = {
 }
 
 
+# Agent configs indexed by id for direct lookups
+AGENTS_BY_ID = {
+    agent["id"]: agent
+    for phase_agents in AGENT_CONFIGS.values()
+    for agent in phase_agents
+}
+
+# Prompt file contents by path, filled on first use
+PROMPT_CACHE: Dict[str, str] = {}
+
+# Replayed against canaries when no traffic file is given
+CANARY_SAMPLE_REQUESTS = [
+    "Design a topic structure for an HR onboarding agent",
+    "Connect my Copilot agent to a SharePoint list through Power Automate",
+    "Set up RAG over our policy documents in Dataverse",
+    "Write a PowerShell script to export all environment variables",
+    "Find the latest documentation on generative orchestration",
+    "My custom connector returns 401 after an hour, how do I fix it?",
+]
+
+# Simulated stand-in response time: a fixed part plus a part that grows with
+# the prompt, so canary comparisons measure more than timer noise
+STAND_IN_INVOKE_LATENCY_MS = 5.0
+STAND_IN_MS_PER_KCHAR = 2.0
+
+
+def create_backend(state_file: str = None) -> AgentBackend:
+    """
+    Agent management backend for this run.
+
+    The stand-in simulates the manage_agents API and keeps its agents in a
+    state file, so plan, deploy, canary and prune runs see what earlier runs
+    deployed.
+    """
+    return StandInBackend(
+        state_file=state_file or os.getenv("AGENT_BACKEND_STATE_FILE", DEFAULT_STATE_FILE),
+        invoke_latency_ms=STAND_IN_INVOKE_LATENCY_MS,
+        response_ms_per_kchar=STAND_IN_MS_PER_KCHAR,
+    )
+
+
+def traffic_share(value: str) -> float:
+    """argparse type for --canary-share: a fraction strictly between 0 and 1."""
+    share = float(value)
+    if not 0 < share < 1:
+        raise argparse.ArgumentTypeError(f"must be between 0 and 1 (exclusive), got {value}")
+    return share
+
+
+def get_agent_config(agent_id: str) -> Dict:
+    """Look up an agent configuration by id."""
+    if agent_id not in AGENTS_BY_ID:
+        raise KeyError(f"Unknown agent '{agent_id}'")
+    return AGENTS_BY_ID[agent_id]
+
+
 def print_banner():
     """Print deployment banner."""
     print("=" * 60)
@@ -108,13 +181,35 @@ def validate_environment():
 
 
 def load_agent_prompt(prompt_file: str) -> str:
-    """Load agent prompt from file."""
-    # In a real deployment, this would load from actual prompt files
-    # For this demo, we return a placeholder
-    return f"# Agent prompt would be loaded from {prompt_file}"
+    """Load agent prompt from file (a placeholder until the prompt file exists); read once per run."""
+    prompt = PROMPT_CACHE.get(prompt_file)
+    if prompt is None:
+        path = Path(prompt_file)
+        if path.exists():
+            prompt = path.read_text(encoding="utf-8")
+        else:
+            prompt = f"# Agent prompt would be loaded from {prompt_file}"
+        PROMPT_CACHE[prompt_file] = prompt
+    return prompt
+
+
+def build_agent_definition(agent_config: Dict) -> Dict:
+    """Build the definition sent to the agent management API."""
+    return {
+        "id": agent_config["id"],
+        "name": agent_config["name"],
+        "description": agent_config["description"],
+        "toolkits": list(agent_config["toolkits"]),
+        "prompt": load_agent_prompt(agent_config["prompt_file"]),
+    }
 
 
-def deploy_agent(agent_config: Dict) -> bool:
+def fetch_deployed(backend: AgentBackend) -> Dict[str, Dict]:
+    """List every deployed agent in one bulk query, indexed by id."""
+    return {agent["id"]: agent for agent in backend.list_agents()}
+
+
+def deploy_agent(agent_config: Dict, backend: AgentBackend, deployed: Dict = None) -> bool:
     """
     Deploy a single agent.
     
@@ -123,26 +218,36 @@ def deploy_agent(agent_config: Dict) -> bool:
     2. Configure the agent with prompts and tools
     3. Verify deployment success
     
-    For this demo script, we simulate the deployment.
+    ``deployed`` is the agent's current definition on the backend, if any.
+    The agent is only created when missing and only updated when a field
+    differs; an up-to-date agent costs no API call.
     """
-    print(f"  📦 Deploying: {agent_config['name']}")
+    action = plan_agent(build_agent_definition(agent_config), deployed)
+    if action.action == NOOP:
+        print(f"  ⏭️  Up to date: {agent_config['name']}")
+        return True
+    
+    if action.action == UPDATE:
+        print(f"  🔄 Updating: {agent_config['name']}")
+        print(f"     Changed: {', '.join(action.changes)}")
+    else:
+        print(f"  📦 Deploying: {agent_config['name']}")
     print(f"     ID: {agent_config['id']}")
     print(f"     Tools: {', '.join(agent_config['toolkits'])}")
     
-    # Simulate deployment (in real implementation, call manage_agents here)
-    # Example:
-    # manage_agents(
-    #     action="create",
-    #     name=agent_config["name"],
-    #     description=agent_config["description"],
-    #     selected_toolkits=agent_config["toolkits"]
-    # )
+    # Equivalent to manage_agents(action="create", ...) for a new agent, or
+    # manage_agents(action="update", agent_id=...) with the changed fields
+    try:
+        apply_action(action, backend)
+    except Exception as e:
+        print(f"  ❌ Failed: {agent_config['name']} ({type(e).__name__}: {e})")
+        return False
     
-    print(f"  ✅ Deployed: {agent_config['name']}")
+    print(f"  ✅ {'Updated' if action.action == UPDATE else 'Deployed'}: {agent_config['name']}")
     return True
 
 
-def deploy_phase(phase: str) -> bool:
+def deploy_phase(phase: str, backend: AgentBackend, deployed: Dict[str, Dict] = None) -> bool:
     """Deploy a specific phase of agents."""
     agents = AGENT_CONFIGS.get(phase, [])
     
@@ -150,13 +255,16 @@ def deploy_phase(phase: str) -> bool:
         print(f"❌ Error: Unknown phase '{phase}'")
         return False
     
+    if deployed is None:
+        deployed = fetch_deployed(backend)
+    
     print(f"\n🚀 Deploying Phase {phase[-1]}...")
     print(f"   Agents to deploy: {len(agents)}")
     print()
     
     success_count = 0
     for agent in agents:
-        if deploy_agent(agent):
+        if deploy_agent(agent, backend, deployed.get(agent["id"])):
             success_count += 1
         print()
     
@@ -171,16 +279,18 @@ def deploy_phase(phase: str) -> bool:
         return False
 
 
-def deploy_all():
+def deploy_all(backend: AgentBackend, deployed: Dict[str, Dict] = None):
     """Deploy all agents in sequence."""
     print("\n🚀 Deploying ALL agents...")
     print()
     
     phases = ["phase1", "phase2", "phase3"]
     results = []
+    if deployed is None:
+        deployed = fetch_deployed(backend)
     
     for phase in phases:
-        result = deploy_phase(phase)
+        result = deploy_phase(phase, backend, deployed)
         results.append(result)
         print()
     
@@ -200,7 +310,7 @@ def deploy_all():
         print()
         print("Next steps:")
         print("1. Run tests: python scripts/test-suite.py --all")
-        print("2. Verify agents: Check agent management dashboard")
+        print("2. Verify agents: python scripts/deploy-agents.py --all --plan (expect no changes)")
         print("3. Test usage: Try sample queries")
         return True
     else:
@@ -209,6 +319,169 @@ def deploy_all():
         return False
 
 
+def show_plan(phases: List[str], backend: AgentBackend, prune: bool = False) -> bool:
+    """Print the actions a deployment of ``phases`` would take."""
+    desired = [build_agent_definition(agent) for phase in phases for agent in AGENT_CONFIGS[phase]]
+    actions = build_plan(desired, fetch_deployed(backend).values(), prune=prune)
+    print("\n📋 Deployment plan:")
+    print()
+    print(format_plan(actions))
+    return True
+
+
+def prune_agents(phases: List[str], backend: AgentBackend, deployed: Dict[str, Dict] = None) -> bool:
+    """Delete deployed agents that are not part of ``phases``.
+
+    ``deployed`` is the listing taken before the deployment, reused so
+    pruning does not list the agents a second time.
+    """
+    desired = [build_agent_definition(agent) for phase in phases for agent in AGENT_CONFIGS[phase]]
+    if deployed is None:
+        deployed = fetch_deployed(backend)
+    stale = [a for a in build_plan(desired, deployed.values(), prune=True) if a.action == DELETE]
+    failed = 0
+    for action in stale:
+        print(f"  🗑️  Deleting: {action.agent_id}")
+        try:
+            apply_action(action, backend)
+        except Exception as e:
+            print(f"  ❌ Failed: {action.agent_id} ({type(e).__name__}: {e})")
+            failed += 1
+    return failed == 0
+
+
+def load_canary_traffic(traffic_file: str) -> List[str]:
+    """Read replay messages: a JSONL file with "input"/"message" fields, or one message per line."""
+    messages = []
+    with open(traffic_file, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith("{"):
+                record = json.loads(line)
+                line = record.get("input") or record.get("message") or ""
+            if line:
+                messages.append(line)
+    return messages
+
+
+def deploy_canary(agent_id: str, backend: AgentBackend, traffic_share: float = DEFAULT_TRAFFIC_SHARE,
+                  latency_threshold: float = DEFAULT_LATENCY_THRESHOLD, min_samples: int = DEFAULT_MIN_SAMPLES,
+                  traffic_file: str = None) -> bool:
+    """Deploy a new agent version as a canary and promote it only if it is not slower."""
+    agent_config = get_agent_config(agent_id)
+    definition = build_agent_definition(agent_config)
+    deployed = fetch_deployed(backend).get(agent_id)
+
+    print(f"\n🐤 Canary: {agent_config['name']}")
+    if deployed is None:
+        print("   Not deployed yet; deploying directly")
+        return deploy_agent(agent_config, backend)
+    action = plan_agent(definition, deployed)
+    if action.action == NOOP:
+        print("   ⏭️  Already up to date; nothing to canary")
+        return True
+
+    print(f"   Changed: {', '.join(action.changes)}")
+    print(f"   Traffic share: {traffic_share:.0%}, latency threshold: +{latency_threshold:.0%}")
+    canary = CanaryDeployment(backend, definition, traffic_share=traffic_share,
+                              latency_threshold=latency_threshold, min_samples=min_samples)
+    canary.start()
+    try:
+        messages = load_canary_traffic(traffic_file) if traffic_file else CANARY_SAMPLE_REQUESTS
+        sent = canary.replay(messages)
+    except BaseException:
+        canary.rollback()
+        raise
+    verdict = canary.finish()
+
+    print(f"   Replayed {sent} requests")
+    print()
+    print(verdict.summary())
+    print()
+    if verdict.promote:
+        print(f"✅ Canary promoted: {agent_config['name']}")
+    else:
+        print(f"❌ Canary rejected; {agent_config['name']} left on the current version")
+    return verdict.promote
+
+
+def environment_state_file(environment: FleetEnvironment) -> Path:
+    """Stand-in state file for one fleet environment, next to the default one."""
+    base = Path(os.getenv("AGENT_BACKEND_STATE_FILE", DEFAULT_STATE_FILE))
+    safe_name = re.sub(r"[^A-Za-z0-9._-]", "_", environment.name)
+    return base.with_name(f"{base.stem}.{safe_name}{base.suffix}")
+
+
+def create_environment_backend(environment: FleetEnvironment) -> AgentBackend:
+    """
+    Agent management backend for one fleet environment.
+
+    Each environment (validated by ``load_fleet`` to have a URL and a tenant)
+    gets its own stand-in with its own state file, so repeated fleet runs only
+    create or update what changed in that environment.
+    """
+    return create_backend(str(environment_state_file(environment)))
+
+
+def print_environment_result(result: EnvironmentResult):
+    """Print one line per finished environment."""
+    icon = "✅" if result.status == "succeeded" else "❌"
+    line = f"  {icon} {result.name}: {result.deployed} deployed, {result.unchanged} unchanged"
+    if result.failed or result.skipped:
+        line += f", {result.failed} failed, {result.skipped} skipped"
+    if result.retries:
+        line += f", {result.retries} retries"
+    print(f"{line} ({result.duration_seconds:.2f}s)")
+    for error in result.errors:
+        print(f"     {error}")
+
+
+def deploy_fleet(fleet_file: str, phases: List[str], max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                 per_environment: int = DEFAULT_PER_ENVIRONMENT, per_tenant: int = DEFAULT_PER_TENANT,
+                 tenant_rate: float = None, summary_file: str = None) -> bool:
+    """Deploy the selected phases to every environment in a fleet file."""
+    try:
+        environments = load_fleet(fleet_file)
+    except (OSError, ValueError) as e:
+        print(f"❌ Error: Invalid fleet file: {e}")
+        return False
+    print(f"\n🚀 Deploying to {len(environments)} environments...")
+    print(f"   Phases: {', '.join(p[-1] for p in phases)}")
+    print(f"   Concurrency: {max_concurrency} global, {per_environment} per environment, "
+          f"{per_tenant} per tenant")
+    print()
+
+    deployer = FleetDeployer(
+        {phase: [build_agent_definition(agent) for agent in AGENT_CONFIGS[phase]] for phase in phases},
+        create_environment_backend,
+        max_concurrency=max_concurrency,
+        per_environment=per_environment,
+        per_tenant=per_tenant,
+        tenant_rate=tenant_rate,
+        on_result=print_environment_result,
+    )
+    summary = deployer.deploy(environments)
+    totals = summary["totals"]
+
+    print()
+    print("=" * 60)
+    print("📊 FLEET DEPLOYMENT SUMMARY")
+    print("=" * 60)
+    print(f"Environments: {totals['succeeded']}/{totals['environments']} succeeded")
+    print(f"Agents Deployed: {totals['agents_deployed']}")
+    print(f"Duration: {summary['duration_seconds']:.2f}s")
+
+    if summary_file:
+        Path(summary_file).parent.mkdir(parents=True, exist_ok=True)
+        with open(summary_file, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+        print(f"Summary written to {summary_file}")
+
+    return totals["failed"] == 0
+
+
 def main():
     """Main deployment function."""
     parser = argparse.ArgumentParser(
@@ -225,8 +498,89 @@ def main():
         action="store_true",
         help="Deploy all phases"
     )
+    parser.add_argument(
+        "--plan",
+        action="store_true",
+        help="Show create/update/delete/no-op actions without deploying"
+    )
+    parser.add_argument(
+        "--prune",
+        action="store_true",
+        help="Also delete deployed agents that are not in the selected phases"
+    )
+    parser.add_argument(
+        "--canary",
+        metavar="AGENT_ID",
+        help="Deploy a new version of one agent as a canary and promote it only if it is not slower"
+    )
+    parser.add_argument(
+        "--canary-share",
+        type=traffic_share,
+        default=DEFAULT_TRAFFIC_SHARE,
+        help=f"Canary: share of traffic routed to the new version (default: {DEFAULT_TRAFFIC_SHARE})"
+    )
+    parser.add_argument(
+        "--canary-threshold",
+        type=float,
+        default=DEFAULT_LATENCY_THRESHOLD,
+        help=f"Canary: allowed p50/p95 slowdown as a fraction (default: {DEFAULT_LATENCY_THRESHOLD})"
+    )
+    parser.add_argument(
+        "--canary-samples",
+        type=int,
+        default=DEFAULT_MIN_SAMPLES,
+        help=f"Canary: successful requests required per variant (default: {DEFAULT_MIN_SAMPLES})"
+    )
+    parser.add_argument(
+        "--canary-traffic",
+        metavar="FILE",
+        help="Canary: messages to replay (JSONL with an \"input\" field, or one per line)"
+    )
+    parser.add_argument(
+        "--fleet",
+        metavar="FILE",
+        help="Deploy to every environment listed in a fleet file (JSON)"
+    )
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=DEFAULT_MAX_CONCURRENCY,
+        help=f"Fleet mode: API calls in flight across all environments (default: {DEFAULT_MAX_CONCURRENCY})"
+    )
+    parser.add_argument(
+        "--per-environment",
+        type=int,
+        default=DEFAULT_PER_ENVIRONMENT,
+        help=f"Fleet mode: API calls in flight per environment (default: {DEFAULT_PER_ENVIRONMENT})"
+    )
+    parser.add_argument(
+        "--per-tenant",
+        type=int,
+        default=DEFAULT_PER_TENANT,
+        help=f"Fleet mode: API calls in flight per tenant (default: {DEFAULT_PER_TENANT})"
+    )
+    parser.add_argument(
+        "--tenant-rate",
+        type=float,
+        help="Fleet mode: maximum API calls per second per tenant"
+    )
+    parser.add_argument(
+        "--summary",
+        metavar="FILE",
+        help="Fleet mode: write a JSON summary with per-environment timings"
+    )
     
     args = parser.parse_args()
+    if args.prune and args.phase:
+        parser.error("--prune deletes agents outside the selected phases; use it with --all, not --phase")
+    if args.plan and not (args.all or args.phase):
+        parser.error("--plan needs --all or --phase to select the agents to plan")
+    if args.plan and args.fleet:
+        parser.error("--plan is not supported with --fleet")
+    if args.prune and args.fleet:
+        parser.error("--prune is not supported with --fleet")
+    if args.canary and args.fleet:
+        parser.error("--canary is not supported with --fleet")
     
     print_banner()
     
@@ -234,12 +588,39 @@ def main():
     if not validate_environment():
         sys.exit(1)
     
+    backend = create_backend()
+    
     # Deploy based on arguments
-    if args.all:
-        success = deploy_all()
+    if args.plan:
+        phases = list(AGENT_CONFIGS) if args.all else [f"phase{args.phase}"]
+        success = show_plan(phases, backend, prune=args.prune)
+    elif args.canary:
+        success = deploy_canary(
+            args.canary,
+            backend,
+            traffic_share=args.canary_share,
+            latency_threshold=args.canary_threshold,
+            min_samples=args.canary_samples,
+            traffic_file=args.canary_traffic,
+        )
+    elif args.fleet and (args.all or args.phase):
+        phases = list(AGENT_CONFIGS) if args.all else [f"phase{args.phase}"]
+        success = deploy_fleet(
+            args.fleet, phases,
+            max_concurrency=args.max_concurrency,
+            per_environment=args.per_environment,
+            per_tenant=args.per_tenant,
+            tenant_rate=args.tenant_rate,
+            summary_file=args.summary,
+        )
+    elif args.all:
+        deployed = fetch_deployed(backend)
+        success = deploy_all(backend, deployed)
+        if success and args.prune:
+            success = prune_agents(list(AGENT_CONFIGS), backend, deployed)
     elif args.phase:
         phase_key = f"phase{args.phase}"
-        success = deploy_phase(phase_key)
+        success = deploy_phase(phase_key, backend)
     else:
         print("❌ Error: Must specify --phase or --all")
         parser.print_help()
@@ -249,4 +630,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    run_with_profiling(main)
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Microsoft Copilot Agent Team - Log Analyzer
+
+Queries the structured JSON-lines logs through an incremental index, so the
+Troubleshooter can ask "all NETWORK_TIMEOUT errors for agent X in the last
+hour" without re-reading gigabytes of logs.
+
+Usage:
+    python log-analyzer.py index
+    python log-analyzer.py query --code NETWORK_TIMEOUT --agent m365_agent --since 1h
+    python log-analyzer.py query --correlation-id <trace_id>
+    python log-analyzer.py stats --since 24h --group-by code
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+from utils.log_index import LogIndex
+from utils.log_writer import DEFAULT_LOG_FILE
+from utils.profiling import run_with_profiling
+
+DURATION_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_time(value: Optional[str]) -> Optional[float]:
+    """Epoch seconds from a relative age ("90m", "1h", "7d") or an ISO timestamp"""
+    if value is None:
+        return None
+    unit = DURATION_UNITS.get(value[-1:].lower())
+    if unit and value[:-1].replace(".", "", 1).isdigit():
+        return time.time() - float(value[:-1]) * unit
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def parse_interval(value: str) -> float:
+    """Seconds from a bucket size such as "15m", "1h" or "3600" (must be positive)"""
+    unit = DURATION_UNITS.get(value[-1:].lower())
+    seconds = float(value[:-1]) * unit if unit else float(value)
+    if not math.isfinite(seconds) or seconds <= 0:
+        raise ValueError(f"must be a positive duration: {value}")
+    return seconds
+
+
+def open_index(log_file: str) -> LogIndex:
+    """Load the index and bring it up to date with the log."""
+    started = time.perf_counter()
+    index = LogIndex(log_file)
+    added = index.update()
+    if added:
+        print(f"📇 Indexed {added:,} new line(s) in {time.perf_counter() - started:.2f}s", file=sys.stderr)
+    return index
+
+
+def show_index(index: LogIndex) -> int:
+    summary = index.summary()
+    print(f"📇 {summary['rows']:,} events, {summary['indexed_bytes'] / 1e6:.1f} MB indexed")
+    print(f"   From {summary['first']} to {summary['last']}")
+    print(f"   Correlation ids: {summary['correlation_ids']:,}")
+    if summary["skipped_lines"]:
+        print(f"   ⚠️  {summary['skipped_lines']:,} unparseable line(s) skipped")
+    if summary["error_codes"]:
+        print("\nError codes:")
+        for code, count in summary["error_codes"].items():
+            marker = "  (unknown)" if code in summary["unknown_error_codes"] else ""
+            print(f"  {code:30} {count:>10,}{marker}")
+    if summary["agents"]:
+        print("\nAgents:")
+        for agent, count in summary["agents"].items():
+            print(f"  {agent:30} {count:>10,}")
+    return 0
+
+
+def run_query(index: LogIndex, filters: dict, limit: int, as_json: bool) -> int:
+    started = time.perf_counter()
+    rows = list(index.rows(**filters))
+    events = list(index.read(rows[-limit:] if limit else rows))
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    for event in events:
+        if as_json:
+            print(json.dumps(event, ensure_ascii=False))
+            continue
+        details = {k: v for k, v in event.items() if k not in ("ts", "level", "event")}
+        print(f"{event.get('ts', ''):32} {event.get('level', ''):8} {event.get('event', ''):28} "
+              f"{json.dumps(details, ensure_ascii=False, default=str)}")
+    print(f"\n🔎 {len(rows):,} match(es), showing {len(events):,} ({elapsed_ms:.1f} ms)", file=sys.stderr)
+    return 0
+
+
+def show_stats(index: LogIndex, filters: dict, group_by: Optional[str], interval: float) -> int:
+    latency = index.latency_histogram(group_by=group_by, **filters)
+    if latency:
+        print("⏱️  Latency")
+        print(f"  {'Group':30} {'Count':>8} {'p50 ms':>10} {'p95 ms':>10} {'max ms':>10}")
+        for key, stats in latency.items():
+            print(f"  {key:30} {stats['count']:>8,} {stats['p50_ms']:>10.1f} "
+                  f"{stats['p95_ms']:>10.1f} {stats['max_ms']:>10.1f}")
+            total = max(stats["buckets"].values())
+            for label, count in stats["buckets"].items():
+                if count:
+                    print(f"      {label:>8} {'█' * max(1, round(count / total * 30)):30} {count:,}")
+
+    errors = index.error_histogram(interval_seconds=interval, **filters)
+    if errors:
+        print("\n❌ Errors")
+        for start, by_code in errors.items():
+            counts = ", ".join(f"{code}={count}" for code, count in sorted(by_code.items()))
+            print(f"  {start:32} {sum(by_code.values()):>6}  {counts}")
+    if not latency and not errors:
+        print("No latency or error events match")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query agent team logs through an incremental index")
+    parser.add_argument(
+        "--file",
+        default=os.getenv("LOG_FILE", DEFAULT_LOG_FILE),
+        help=f"JSON-lines log file (default: LOG_FILE or {DEFAULT_LOG_FILE})"
+    )
+    subparsers = parser.add_subparsers(dest="command")
+
+    subparsers.add_parser("index", help="Update the index and summarize the log")
+
+    filters = argparse.ArgumentParser(add_help=False)
+    filters.add_argument("--code", help="ToolErrorCode, e.g. NETWORK_TIMEOUT")
+    filters.add_argument("--agent", help="Agent id")
+    filters.add_argument("--correlation-id", help="Correlation / trace id")
+    filters.add_argument("--since", help="Start time: age (30m, 1h, 7d) or ISO timestamp")
+    filters.add_argument("--until", help="End time: age or ISO timestamp")
+    filters.add_argument("--level", help="Minimum level (DEBUG, INFO, WARNING, ERROR)")
+
+    query_parser = subparsers.add_parser("query", parents=[filters], help="Print matching log events")
+    query_parser.add_argument("--limit", type=int, default=50, help="Most recent matches to print (0 for all)")
+    query_parser.add_argument("--json", action="store_true", help="Print raw JSON lines")
+
+    stats_parser = subparsers.add_parser("stats", parents=[filters], help="Latency and error histograms")
+    stats_parser.add_argument("--group-by", choices=["agent", "code", "none"], default="agent")
+    stats_parser.add_argument("--interval", default="1h", help="Error histogram bucket size (default: 1h)")
+
+    args = parser.parse_args()
+
+    if not args.command:
+        parser.print_help()
+        return 1
+    if not Path(args.file).exists():
+        print(f"❌ Error: Log file not found: {args.file}")
+        return 1
+
+    index = open_index(args.file)
+    if args.command == "index":
+        return show_index(index)
+
+    try:
+        query_filters = {
+            "code": args.code,
+            "agent": args.agent,
+            "correlation_id": args.correlation_id,
+            "since": parse_time(args.since),
+            "until": parse_time(args.until),
+            "min_level": args.level,
+        }
+    except ValueError as e:
+        print(f"❌ Error: Invalid time: {e}")
+        return 1
+
+    if args.command == "query":
+        return run_query(index, query_filters, args.limit, args.json)
+
+    try:
+        seconds = parse_interval(args.interval)
+    except ValueError as e:
+        print(f"❌ Error: Invalid interval: {e}")
+        return 1
+    group_by = None if args.group_by == "none" else args.group_by
+    return show_stats(index, query_filters, group_by, seconds)
+
+
+if __name__ == "__main__":
+    sys.exit(run_with_profiling(main))
@@ -8,8 +8,14 @@ Description: Validates environment and prepares for deployment
 import os
 import sys
 import json
+import time
 from pathlib import Path
 
+from utils.profiling import run_with_profiling
+from utils.token_cache import get_provider
+
+GRAPH_SCOPE = "https://graph.microsoft.com/.default"
+
 def print_header(text):
     """Print formatted header"""
     print(f"\n{'='*60}")
@@ -81,7 +87,12 @@ def create_config_template():
             "orchestrator": {
                 "enabled": True,
                 "max_parallel_tasks": 6,
-                "timeout_seconds": 30
+                "timeout_seconds": 30,
+                "queue": {
+                    "interactive_max_depth": 200,
+                    "batch_max_depth": 2000,
+                    "reserved_interactive_slots": 2
+                }
             },
             "m365_agent": {
                 "enabled": True,
@@ -109,7 +120,9 @@ def create_config_template():
         "security": {
             "authentication": "EntraID",
             "mfa_required": True,
-            "session_timeout_minutes": 30
+            "session_timeout_minutes": 30,
+            "session_memory_limit_mb": 256,
+            "session_spill_file": "data/sessions-{pid}.db"
         },
         "monitoring": {
             "application_insights": True,
@@ -129,6 +142,25 @@ def create_config_template():
     
     return True
 
+def check_authentication():
+    """Acquire a Microsoft Graph token through the shared token cache"""
+    print("\n🔐 Checking authentication...")
+    if not os.getenv("TENANT_ID"):
+        print("⚠️  Skipped (TENANT_ID not set)")
+        return False
+    
+    provider = get_provider()
+    try:
+        token = provider.get_token(GRAPH_SCOPE)
+    except ImportError:
+        print("❌ azure-identity not installed. Install with:")
+        print("  pip install -r requirements.txt")
+        return False
+    
+    source = "shared token cache" if provider.stats()["disk_hits"] else "Entra ID"
+    print(f"✅ Microsoft Graph token from {source} (valid for {(token.expires_on - time.time()) / 60:.0f} min)")
+    return True
+
 def check_dependencies():
     """Check if required Python packages are installed"""
     print("\n📦 Checking Python dependencies...")
@@ -186,6 +218,7 @@ def main():
         ("Configuration Template", create_config_template),
         ("Python Dependencies", check_dependencies),
         ("Environment Variables", check_environment_variables),
+        ("Authentication", check_authentication),
     ]
     
     results = []
@@ -218,4 +251,4 @@ def main():
         return 1
 
 if __name__ == "__main__":
-    sys.exit(main())
+    sys.exit(run_with_profiling(main))
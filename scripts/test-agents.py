@@ -5,46 +5,71 @@ Version: 1.0.0
 Description: Comprehensive testing for agent deployment
 """
 
+import os
 import sys
+import argparse
 import json
 import time
 from datetime import datetime
 
+from utils.backend import DEFAULT_STATE_FILE, StandInBackend
+from utils.health import DEFAULT_INTERVAL, DEFAULT_TIMEOUT, HealthChecker, agent_probe, http_probe
+from utils.profiling import run_with_profiling
+from utils.replay import ORCHESTRATOR, NullRecorder, Recorder, Recording, Replayer
+from utils.routing import get_router
+from utils.tracing import DEFAULT_TRACE_FILE, configure_tracing, get_tracer
+
 def print_header(text):
     """Print formatted header"""
     print(f"\n{'='*60}")
     print(f"  {text}")
     print(f"{'='*60}\n")
 
-def test_orchestrator_agent():
+ORCHESTRATOR_TEST_CASES = [
+    {
+        "name": "Basic Routing",
+        "input": "What's on my calendar today?",
+        "expected_agent": "m365_agent"
+    },
+    {
+        "name": "Data Analysis",
+        "input": "Analyze last month's sales data",
+        "expected_agent": "data_agent"
+    },
+    {
+        "name": "IT Support",
+        "input": "Reset my password",
+        "expected_agent": "it_agent"
+    }
+]
+
+def test_orchestrator_agent(recorder=None):
     """Test orchestrator agent connectivity and routing"""
     print("🎯 Testing Orchestrator Agent...")
     
-    test_cases = [
-        {
-            "name": "Basic Routing",
-            "input": "What's on my calendar today?",
-            "expected_agent": "m365_agent"
-        },
-        {
-            "name": "Data Analysis",
-            "input": "Analyze last month's sales data",
-            "expected_agent": "data_agent"
-        },
-        {
-            "name": "IT Support",
-            "input": "Reset my password",
-            "expected_agent": "it_agent"
-        }
-    ]
+    test_cases = ORCHESTRATOR_TEST_CASES
     
+    tracer = get_tracer()
+    router = get_router("assistant")
+    recorder = recorder or NullRecorder()
+    backend = recorder.wrap(create_specialist_backend())
     passed = 0
     for test in test_cases:
         print(f"  • {test['name']}... ", end="")
-        # Simulate test
-        time.sleep(0.5)
-        print(f"✅ PASS")
-        passed += 1
+        with tracer.span("orchestrator.request", test_case=test["name"], user_input=test["input"]) as span, \
+                recorder.exchange(ORCHESTRATOR, test["input"]) as exchange:
+            with tracer.span("orchestrator.route") as route_span:
+                agent = router.route_one(test["input"])
+                route_span.set_attribute("agent", agent)
+            with tracer.span("specialist.call", agent=agent):
+                exchange.agent = agent
+                exchange.response = backend.invoke_agent(agent, test["input"])
+        trace_note = f"  (trace {span.trace_id})" if tracer.exporters else ""
+        if agent == test["expected_agent"]:
+            print(f"✅ PASS{trace_note}")
+            passed += 1
+        else:
+            print(f"❌ FAIL (routed to {agent}, expected {test['expected_agent']}){trace_note}")
     
     print(f"\n  Result: {passed}/{len(test_cases)} tests passed")
     return passed == len(test_cases)
@@ -132,37 +157,131 @@ def test_security():
     print(f"\n  Result: {passed}/{len(controls)} controls verified")
     return True
 
-def run_quick_check():
-    """Run quick connectivity check"""
+# Agents probed by the connectivity check (display name -> agent id)
+HEALTH_CHECK_AGENTS = {
+    "Orchestrator Agent": "orchestrator",
+    "M365 Agent": "m365_agent",
+    "Data Agent": "data_agent",
+    "IT Agent": "it_agent",
+    "Automation Agent": "automation_agent",
+    "Research Agent": "research_agent",
+    "Content Agent": "content_agent"
+}
+
+def create_specialist_backend(latency_ms=0.0):
+    """Stand-in backend simulating the deployed specialists (no added latency by default)"""
+    backend = StandInBackend()
+    for name, agent_id in HEALTH_CHECK_AGENTS.items():
+        backend.create_agent({"id": agent_id, "name": name})
+    backend.latency_ms = latency_ms
+    return backend
+
+def create_health_checker(timeout=DEFAULT_TIMEOUT, endpoint=None):
+    """
+    Health checker for every agent.
+
+    With an endpoint, each agent is probed with GET <endpoint>/<agent_id>;
+    otherwise agents are invoked through the configured agent backend (the
+    stand-in state that deploy-agents.py writes), so agents that are not
+    deployed report unhealthy.
+    """
+    if endpoint:
+        base = endpoint.rstrip("/")
+        probes = {name: http_probe(f"{base}/{agent_id}", timeout) for name, agent_id in HEALTH_CHECK_AGENTS.items()}
+    else:
+        backend = StandInBackend(state_file=os.getenv("AGENT_BACKEND_STATE_FILE", DEFAULT_STATE_FILE))
+        probes = {name: agent_probe(backend, agent_id) for name, agent_id in HEALTH_CHECK_AGENTS.items()}
+    return HealthChecker(probes, timeout=timeout)
+
+def run_quick_check(timeout=DEFAULT_TIMEOUT, endpoint=None):
+    """Run quick connectivity check (all agents probed concurrently)"""
     print_header("Quick Connectivity Check")
     
-    agents = [
-        "Orchestrator Agent",
-        "M365 Agent",
-        "Data Agent",
-        "IT Agent",
-        "Automation Agent",
-        "Research Agent",
-        "Content Agent"
-    ]
-    
+    checker = create_health_checker(timeout, endpoint)
     print("Checking agent connectivity...\n")
-    for agent in agents:
-        print(f"  • {agent:25}... ", end="")
-        time.sleep(0.2)
-        print(f"✅ Connected")
+    started = time.perf_counter()
+    results = checker.check()
+    elapsed = time.perf_counter() - started
+    checker.close()
     
-    print(f"\n✅ All {len(agents)} agents responding")
-    return True
+    for name, result in results.items():
+        if result.healthy:
+            print(f"  • {name:25}... ✅ Connected ({result.latency_ms:.0f} ms)")
+        else:
+            print(f"  • {name:25}... ❌ {result.status}: {result.error}")
+    
+    healthy = sum(1 for result in results.values() if result.healthy)
+    if healthy == len(results):
+        print(f"\n✅ All {len(results)} agents responding ({elapsed:.2f}s)")
+        return True
+    print(f"\n⚠️  {healthy}/{len(results)} agents responding ({elapsed:.2f}s)")
+    return False
+
+def run_health_daemon(host, port, interval, timeout=DEFAULT_TIMEOUT, endpoint=None):
+    """Probe continuously and serve /health and /metrics until interrupted"""
+    print_header("Agent Health Daemon")
+    checker = create_health_checker(timeout, endpoint).start(interval)
+    checker.serve(host, port)
+    print(f"Probing {len(HEALTH_CHECK_AGENTS)} agents every {interval:g}s")
+    print(f"Serving http://{host}:{port}/health and http://{host}:{port}/metrics (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        print("\nStopping health daemon")
+    finally:
+        checker.close()
+    return 0
+
+def replay_speed(value):
+    """argparse type for --replay-speed: a multiplier of zero or more"""
+    speed = float(value)
+    if not speed >= 0 or speed == float("inf"):
+        raise argparse.ArgumentTypeError(f"must be a finite number of zero or more, got {value}")
+    return speed
+
+def run_replay(path, speed=None, workers=8):
+    """Replay a recording through local routing, sessions and synthesis"""
+    print_header("Replay")
+    try:
+        recording = Recording(path)
+    except (OSError, ValueError) as e:
+        print(f"❌ Error: Cannot replay {path}: {e}")
+        return 1
+    pace = f"{speed:g}x" if speed else "as fast as possible"
+    print(f"Replaying {len(recording)} recorded exchanges from {path} ({pace})\n")
+    report = Replayer(recording, speed=speed, max_workers=workers).run()
+    
+    overhead = report["overhead_ms"]
+    print(f"  • Requests:            {report['requests']} ({report['specialist_calls']} specialist calls)")
+    print(f"  • Wall time:           {report['wall_seconds']:.3f}s (recorded {report['recorded_seconds']:.3f}s)")
+    print(f"  • Throughput:          {report['requests_per_second']:.1f} requests/s")
+    print(f"  • Local overhead (ms): mean {overhead['mean']:.3f}, p50 {overhead['p50']:.3f}, "
+          f"p95 {overhead['p95']:.3f}, max {overhead['max']:.3f}")
+    if report["route_mismatches"]:
+        print(f"  ❌ Routing changed for {report['route_mismatches']} request(s):")
+        for text, recorded, routed in report["route_mismatch_samples"]:
+            print(f"      '{text}' → {routed} (recorded {recorded})")
+    if report["response_mismatches"]:
+        print(f"  ⚠️  {report['response_mismatches']} response(s) differ from the recording")
+    if report["errors"]:
+        print(f"  ❌ {report['errors']} request(s) failed:")
+        for error in report["error_samples"]:
+            print(f"      {error}")
+    
+    if report["route_mismatches"] or report["errors"]:
+        return 1
+    print("\n✅ Replay matches the recording")
+    return 0
 
-def run_full_test_suite():
+def run_full_test_suite(recorder=None):
     """Run comprehensive test suite"""
     print_header("Microsoft Copilot Agent Team - Full Test Suite")
     
     print(f"Start Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
     
     test_suites = [
-        ("Orchestrator Agent", test_orchestrator_agent),
+        ("Orchestrator Agent", lambda: test_orchestrator_agent(recorder)),
         ("Microsoft 365 Agent", test_m365_agent),
         ("Data Analysis Agent", test_data_agent),
         ("Performance Metrics", test_performance),
@@ -200,38 +319,114 @@ def run_full_test_suite():
 
 def main():
     """Main test routine"""
-    import argparse
-    
     parser = argparse.ArgumentParser(description="Test Microsoft Copilot Agent Team")
     parser.add_argument(
         "--quick-check",
         action="store_true",
         help="Run quick connectivity check only"
     )
+    parser.add_argument(
+        "--health-daemon",
+        action="store_true",
+        help="Probe agents continuously and serve /health and /metrics over HTTP"
+    )
+    parser.add_argument(
+        "--health-interval",
+        type=float,
+        default=DEFAULT_INTERVAL,
+        help=f"Seconds between probe rounds in daemon mode (default: {DEFAULT_INTERVAL:g})"
+    )
+    parser.add_argument(
+        "--health-timeout",
+        type=float,
+        default=DEFAULT_TIMEOUT,
+        help=f"Seconds before a probe counts as timed out (default: {DEFAULT_TIMEOUT:g})"
+    )
+    parser.add_argument(
+        "--health-endpoint",
+        default=os.getenv("AGENT_HEALTH_ENDPOINT"),
+        metavar="URL",
+        help="Probe agents with GET URL/<agent_id> instead of through the agent backend "
+             "(default: AGENT_HEALTH_ENDPOINT)"
+    )
+    parser.add_argument(
+        "--health-host",
+        default="127.0.0.1",
+        help="Address for the health endpoints (default: 127.0.0.1)"
+    )
+    parser.add_argument(
+        "--health-port",
+        type=int,
+        default=8080,
+        help="Port for the health endpoints (default: 8080)"
+    )
     parser.add_argument(
         "--agent",
         choices=["orchestrator", "m365", "data", "all"],
         help="Test specific agent"
     )
+    parser.add_argument(
+        "--trace",
+        nargs="?",
+        const=DEFAULT_TRACE_FILE,
+        metavar="FILE",
+        help=f"Record spans to a JSONL file (default: {DEFAULT_TRACE_FILE}); "
+             "view with trace-viewer.py"
+    )
+    parser.add_argument(
+        "--record",
+        metavar="FILE",
+        help="Record orchestrator and specialist exchanges to FILE for --replay"
+    )
+    parser.add_argument(
+        "--replay",
+        metavar="FILE",
+        help="Replay a recording through local routing and the stand-in backend"
+    )
+    parser.add_argument(
+        "--replay-speed",
+        type=replay_speed,
+        default=0,
+        help="Replay pace: 1 = original timing, 10 = ten times faster, 0 = no waits (default: 0)"
+    )
+    parser.add_argument(
+        "--otlp-endpoint",
+        help="Also export spans to an OTLP/HTTP endpoint (e.g. http://127.0.0.1:4318/v1/traces)"
+    )
     
     args = parser.parse_args()
     
-    if args.quick_check:
-        run_quick_check()
-        return 0
+    if args.trace or args.otlp_endpoint:
+        configure_tracing(args.trace, args.otlp_endpoint)
     
-    if args.agent:
-        if args.agent == "orchestrator":
-            test_orchestrator_agent()
-        elif args.agent == "m365":
-            test_m365_agent()
-        elif args.agent == "data":
-            test_data_agent()
-        else:
-            return run_full_test_suite()
-        return 0
+    if args.replay:
+        return run_replay(args.replay, args.replay_speed or None)
+    
+    if args.health_daemon:
+        return run_health_daemon(args.health_host, args.health_port, args.health_interval, args.health_timeout,
+                                 args.health_endpoint)
+    
+    if args.quick_check:
+        return 0 if run_quick_check(args.health_timeout, args.health_endpoint) else 1
     
-    return run_full_test_suite()
+    recorder = Recorder(args.record) if args.record else None
+    try:
+        if args.agent:
+            if args.agent == "orchestrator":
+                test_orchestrator_agent(recorder)
+            elif args.agent == "m365":
+                test_m365_agent()
+            elif args.agent == "data":
+                test_data_agent()
+            else:
+                return run_full_test_suite(recorder)
+            return 0
+        
+        return run_full_test_suite(recorder)
+    finally:
+        if recorder:
+            recorder.close()
+            print(f"📼 Recorded {len(Recording(args.record))} exchanges to {args.record}")
 
 if __name__ == "__main__":
-    sys.exit(main())
+    sys.exit(run_with_profiling(main))
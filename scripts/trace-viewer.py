@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Microsoft Copilot Agent Team - Trace Viewer
+
+Prints a waterfall of the spans recorded for a trace, lists recent traces,
+or runs a local OTLP stand-in collector that writes received spans to JSONL.
+
+Usage:
+    python trace-viewer.py list
+    python trace-viewer.py show <trace_id>
+    python trace-viewer.py serve --port 4318
+"""
+
+import argparse
+import sys
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from utils.profiling import run_with_profiling
+from utils.tracing import DEFAULT_TRACE_FILE, OtlpStandInCollector, load_spans, render_waterfall
+
+
+def list_traces(trace_file: str, limit: int) -> int:
+    """List the most recent traces with their root span and duration."""
+    traces = OrderedDict()
+    for span in load_spans(trace_file):
+        traces.setdefault(span.trace_id, []).append(span)
+
+    print(f"{'Trace ID':34} {'Root Span':30} {'Spans':>6} {'Duration':>12}")
+    print("-" * 86)
+    for trace_id, spans in list(traces.items())[-limit:]:
+        root = next((s for s in spans if s.parent_id is None), spans[0])
+        duration_ms = (max(s.end_ns or s.start_ns for s in spans) - min(s.start_ns for s in spans)) / 1e6
+        status = "❌" if any(s.status == "error" for s in spans) else "  "
+        print(f"{trace_id:34} {root.name[:30]:30} {len(spans):>6} {duration_ms:>9.1f} ms {status}")
+    return 0
+
+
+def show_trace(trace_file: str, trace_id: str, width: int) -> int:
+    """Print the waterfall for one trace (a unique id prefix is enough)."""
+    spans = load_spans(trace_file, trace_id)
+    trace_ids = {span.trace_id for span in spans}
+    if not spans:
+        print(f"❌ Error: No spans found for trace '{trace_id}' in {trace_file}")
+        return 1
+    if len(trace_ids) > 1:
+        print(f"❌ Error: Trace id prefix '{trace_id}' is ambiguous ({len(trace_ids)} traces)")
+        return 1
+
+    print(f"Trace {spans[0].trace_id} ({len(spans)} spans)\n")
+    for line in render_waterfall(spans, width):
+        print(line)
+
+    errors = [span for span in spans if span.status == "error"]
+    if errors:
+        print(f"\n⚠️  {len(errors)} span(s) failed:")
+        for span in errors:
+            print(f"  • {span.name}: {span.status_message}")
+    return 0
+
+
+def serve(trace_file: str, host: str, port: int) -> int:
+    """Run the OTLP stand-in collector until interrupted."""
+    collector = OtlpStandInCollector(trace_file, host, port).start()
+    print(f"📡 OTLP stand-in collector listening on {collector.endpoint}")
+    print(f"   Writing spans to {trace_file} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        collector.stop()
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="View traces recorded by the agent team scripts")
+    parser.add_argument(
+        "--file",
+        default=DEFAULT_TRACE_FILE,
+        help=f"Trace JSONL file (default: {DEFAULT_TRACE_FILE})"
+    )
+    subparsers = parser.add_subparsers(dest="command")
+
+    list_parser = subparsers.add_parser("list", help="List recent traces")
+    list_parser.add_argument("--limit", type=int, default=20, help="Number of traces to show")
+
+    show_parser = subparsers.add_parser("show", help="Print a waterfall for a trace")
+    show_parser.add_argument("trace_id", help="Trace id or unique prefix")
+    show_parser.add_argument("--width", type=int, default=40, help="Waterfall bar width")
+
+    serve_parser = subparsers.add_parser("serve", help="Run a local OTLP/HTTP stand-in collector")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=4318)
+
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        return serve(args.file, args.host, args.port)
+
+    if not Path(args.file).exists():
+        print(f"❌ Error: Trace file not found: {args.file}")
+        return 1
+
+    if args.command == "list":
+        return list_traces(args.file, args.limit)
+    if args.command == "show":
+        return show_trace(args.file, args.trace_id, args.width)
+
+    parser.print_help()
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(run_with_profiling(main))
@@ -0,0 +1,7 @@
+"""
+Microsoft Copilot Agent Team - Shared Script Utilities
+
+Importable helpers used by the CLI scripts in scripts/. The scripts are run as
+``python scripts/<name>.py``, which puts scripts/ on sys.path, so modules here
+are imported as ``from utils.<module> import ...``.
+"""
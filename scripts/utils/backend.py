@@ -0,0 +1,148 @@
+"""
+Microsoft Copilot Agent Team - Agent Management Backends
+
+``AgentBackend`` is the interface the deployment scripts use to manage agents
+(the operations of the ``manage_agents`` / ``lookup_agents`` tools).
+``StandInBackend`` is an in-process stand-in with optional simulated latency,
+used for dry runs, benchmarks, canary rehearsals and local development. With
+a ``state_file`` its agents persist across runs, so successive deploy
+commands (plan, deploy, canary, prune) see each other's changes.
+"""
+
+import copy
+import json
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+DEFAULT_STATE_FILE = "data/stand-in-agents.json"
+
+
+class AgentNotFoundError(KeyError):
+    """Raised when an agent id does not exist on the backend"""
+
+
+class ThrottledError(Exception):
+    """Raised when the backend rejects a call with 429 / TooManyRequests"""
+
+    def __init__(self, message: str = "Too many requests", retry_after_seconds: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after_seconds = retry_after_seconds
+
+
+class AgentBackend(ABC):
+    """Agent management operations used by the deployment scripts"""
+
+    @abstractmethod
+    def list_agents(self) -> List[Dict[str, Any]]:
+        """Return all deployed agent definitions"""
+
+    @abstractmethod
+    def create_agent(self, config: Dict[str, Any]) -> Dict[str, Any]:
+        """Create an agent from a definition; ``config['id']`` identifies it"""
+
+    @abstractmethod
+    def update_agent(self, agent_id: str, config: Dict[str, Any]) -> Dict[str, Any]:
+        """Replace an existing agent definition"""
+
+    @abstractmethod
+    def delete_agent(self, agent_id: str) -> None:
+        """Remove an agent"""
+
+    @abstractmethod
+    def invoke_agent(self, agent_id: str, message: str) -> str:
+        """Send a message to an agent and return its reply"""
+
+
+class StandInBackend(AgentBackend):
+    """
+    In-memory backend that behaves like the agent management API.
+
+    Args:
+        latency_ms: Simulated round-trip time added to every call
+        invoke_latency_ms: Simulated ``invoke_agent`` processing time per reply
+        response_ms_per_kchar: Simulated ``invoke_agent`` processing time per
+                               1,000 prompt characters, so longer prompts
+                               answer more slowly
+        state_file: JSON file the deployed agents are loaded from and saved
+                    to after every change (None keeps them in memory only)
+    """
+
+    def __init__(self, latency_ms: float = 0.0, response_ms_per_kchar: float = 0.0,
+                 state_file: Optional[str] = None, invoke_latency_ms: float = 0.0):
+        self.latency_ms = latency_ms
+        self.invoke_latency_ms = invoke_latency_ms
+        self.response_ms_per_kchar = response_ms_per_kchar
+        self.state_file = Path(state_file) if state_file else None
+        self.calls: Dict[str, int] = {}
+        self._agents: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        if self.state_file is not None and self.state_file.exists():
+            with open(self.state_file, encoding="utf-8") as f:
+                self._agents = {agent["id"]: agent for agent in json.load(f).get("agents", [])}
+
+    def _save(self) -> None:
+        """Write the agents to the state file (caller holds the lock)"""
+        if self.state_file is None:
+            return
+        self.state_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.state_file.with_name(self.state_file.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"agents": list(self._agents.values())}, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+        os.replace(tmp_path, self.state_file)
+
+    def _call(self, operation: str) -> None:
+        with self._lock:
+            self.calls[operation] = self.calls.get(operation, 0) + 1
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+
+    def list_agents(self) -> List[Dict[str, Any]]:
+        self._call("list_agents")
+        with self._lock:
+            return [copy.deepcopy(agent) for agent in self._agents.values()]
+
+    def get_agent(self, agent_id: str) -> Optional[Dict[str, Any]]:
+        self._call("get_agent")
+        with self._lock:
+            agent = self._agents.get(agent_id)
+            return copy.deepcopy(agent) if agent is not None else None
+
+    def create_agent(self, config: Dict[str, Any]) -> Dict[str, Any]:
+        self._call("create_agent")
+        with self._lock:
+            self._agents[config["id"]] = copy.deepcopy(config)
+            self._save()
+            return copy.deepcopy(config)
+
+    def update_agent(self, agent_id: str, config: Dict[str, Any]) -> Dict[str, Any]:
+        self._call("update_agent")
+        with self._lock:
+            if agent_id not in self._agents:
+                raise AgentNotFoundError(agent_id)
+            self._agents[agent_id] = copy.deepcopy(dict(config, id=agent_id))
+            self._save()
+            return copy.deepcopy(self._agents[agent_id])
+
+    def delete_agent(self, agent_id: str) -> None:
+        self._call("delete_agent")
+        with self._lock:
+            if self._agents.pop(agent_id, None) is None:
+                raise AgentNotFoundError(agent_id)
+            self._save()
+
+    def invoke_agent(self, agent_id: str, message: str) -> str:
+        self._call("invoke_agent")
+        with self._lock:
+            agent = self._agents.get(agent_id)
+            if agent is None:
+                raise AgentNotFoundError(agent_id)
+            prompt_chars = len(agent.get("prompt", ""))
+        processing_ms = self.invoke_latency_ms + prompt_chars / 1000 * self.response_ms_per_kchar
+        if processing_ms:
+            time.sleep(processing_ms / 1000)
+        return f"[{agent['name']}] {message}"
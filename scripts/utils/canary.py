@@ -0,0 +1,237 @@
+"""
+Microsoft Copilot Agent Team - Canary Deployments
+
+Deploys a new version of an agent next to the current one under a separate
+canary id, sends a share of traffic to it, and promotes the new version only
+when it is not measurably worse:
+
+- p50 and p95 latency may not exceed the baseline by more than
+  ``latency_threshold`` (e.g. 0.2 = 20% slower)
+- the error rate may not exceed the baseline by more than
+  ``error_rate_threshold`` (absolute, e.g. 0.02 = two percentage points)
+- both variants need at least ``min_samples`` successful calls
+- at least one variant's p50 must reach ``min_latency_ms``; below that the
+  comparison measures timer noise, so the canary is not judged
+
+Traffic is split by a stable hash of a routing key (session or conversation
+id), so a conversation stays on one variant. ``replay()`` drives recorded or
+sample requests through the split when there is no live traffic.
+
+Usage:
+    from utils.canary import CanaryDeployment
+
+    canary = CanaryDeployment(backend, new_definition, traffic_share=0.2)
+    canary.start()
+    canary.replay(sample_requests)
+    verdict = canary.finish()       # promotes or rolls back
+    print(verdict.summary())
+"""
+
+import statistics
+import time
+import zlib
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional
+
+from utils.backend import AgentBackend
+
+DEFAULT_TRAFFIC_SHARE = 0.1
+DEFAULT_LATENCY_THRESHOLD = 0.2
+DEFAULT_ERROR_RATE_THRESHOLD = 0.02
+DEFAULT_MIN_SAMPLES = 20
+DEFAULT_MIN_LATENCY_MS = 1.0
+DEFAULT_MAX_REQUESTS = 2000
+CANARY_SUFFIX = "--canary"
+
+BASELINE = "baseline"
+CANARY = "canary"
+
+
+class VariantStats:
+    """Latency samples and error count for one variant"""
+
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.errors = 0
+
+    @property
+    def requests(self) -> int:
+        return len(self.latencies) + self.errors
+
+    @property
+    def error_rate(self) -> float:
+        return self.errors / self.requests if self.requests else 0.0
+
+    def percentile(self, q: float) -> float:
+        """Latency percentile in seconds (nearest rank)"""
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "error_rate": round(self.error_rate, 4),
+            "p50_ms": round(statistics.median(self.latencies) * 1000, 2) if self.latencies else 0.0,
+            "p95_ms": round(self.percentile(0.95) * 1000, 2),
+        }
+
+
+@dataclass
+class CanaryVerdict:
+    """Outcome of a canary comparison"""
+    agent_id: str
+    promote: bool
+    reasons: List[str] = field(default_factory=list)
+    baseline: Dict[str, Any] = field(default_factory=dict)
+    canary: Dict[str, Any] = field(default_factory=dict)
+
+    def summary(self) -> str:
+        lines = [f"{'Variant':<10}{'Requests':>10}{'Errors':>8}{'p50 ms':>10}{'p95 ms':>10}"]
+        for name, stats in ((BASELINE, self.baseline), (CANARY, self.canary)):
+            lines.append(
+                f"{name:<10}{stats['requests']:>10}{stats['errors']:>8}"
+                f"{stats['p50_ms']:>10.2f}{stats['p95_ms']:>10.2f}"
+            )
+        lines.append(("PROMOTE" if self.promote else "REJECT") + (": " + "; ".join(self.reasons) if self.reasons else ""))
+        return "\n".join(lines)
+
+
+class CanaryDeployment:
+    """
+    Side-by-side deployment of a new agent version with a traffic split.
+
+    Args:
+        backend: Agent management backend
+        definition: New agent definition; ``definition['id']`` must already be deployed
+        traffic_share: Fraction of traffic routed to the canary (0..1)
+        latency_threshold: Allowed relative p50/p95 slowdown
+        error_rate_threshold: Allowed absolute error-rate increase
+        min_samples: Successful calls required per variant before judging
+        min_latency_ms: p50 latency below which neither variant is judged
+    """
+
+    def __init__(
+        self,
+        backend: AgentBackend,
+        definition: Dict[str, Any],
+        traffic_share: float = DEFAULT_TRAFFIC_SHARE,
+        latency_threshold: float = DEFAULT_LATENCY_THRESHOLD,
+        error_rate_threshold: float = DEFAULT_ERROR_RATE_THRESHOLD,
+        min_samples: int = DEFAULT_MIN_SAMPLES,
+        min_latency_ms: float = DEFAULT_MIN_LATENCY_MS,
+    ):
+        if not 0 < traffic_share < 1:
+            raise ValueError("traffic_share must be between 0 and 1")
+        self.backend = backend
+        self.definition = definition
+        self.agent_id = definition["id"]
+        self.canary_id = self.agent_id + CANARY_SUFFIX
+        self.traffic_share = traffic_share
+        self.latency_threshold = latency_threshold
+        self.error_rate_threshold = error_rate_threshold
+        self.min_samples = min_samples
+        self.min_latency_ms = min_latency_ms
+        self.stats = {BASELINE: VariantStats(), CANARY: VariantStats()}
+        self._cutoff = int(traffic_share * 0xFFFFFFFF)
+
+    def start(self) -> None:
+        """Deploy the new version under the canary id"""
+        if not any(agent["id"] == self.agent_id for agent in self.backend.list_agents()):
+            raise KeyError(f"Agent '{self.agent_id}' is not deployed; deploy it normally instead")
+        self.backend.create_agent(dict(self.definition, id=self.canary_id))
+
+    def choose(self, routing_key: str) -> str:
+        """Variant for a routing key (stable for the same key)"""
+        return CANARY if zlib.crc32(routing_key.encode("utf-8")) < self._cutoff else BASELINE
+
+    def agent_for(self, routing_key: str) -> str:
+        """Agent id to send a request with this routing key to"""
+        return self.canary_id if self.choose(routing_key) == CANARY else self.agent_id
+
+    def record(self, variant: str, latency_seconds: Optional[float], error: bool = False) -> None:
+        """Record one live request outcome for a variant"""
+        stats = self.stats[variant]
+        if error:
+            stats.errors += 1
+        else:
+            stats.latencies.append(latency_seconds)
+
+    def invoke(self, routing_key: str, message: str) -> str:
+        """Route one request through the split, measuring it"""
+        variant = self.choose(routing_key)
+        agent_id = self.canary_id if variant == CANARY else self.agent_id
+        started = time.perf_counter()
+        try:
+            reply = self.backend.invoke_agent(agent_id, message)
+        except Exception:
+            self.record(variant, None, error=True)
+            raise
+        self.record(variant, time.perf_counter() - started)
+        return reply
+
+    def replay(self, messages: Iterable[str], max_requests: int = DEFAULT_MAX_REQUESTS) -> int:
+        """
+        Replay sample messages through the split, cycling through them until
+        both variants have ``min_samples`` successful calls (or
+        ``max_requests`` is reached). Returns the number of requests sent.
+        """
+        messages = list(messages)
+        if not messages:
+            return 0
+        sent = 0
+        while sent < max_requests and not self._enough_samples():
+            message = messages[sent % len(messages)]
+            try:
+                self.invoke(f"replay-{sent}", message)
+            except Exception:
+                pass  # counted as an error for its variant
+            sent += 1
+        return sent
+
+    def _enough_samples(self) -> bool:
+        return all(len(stats.latencies) >= self.min_samples for stats in self.stats.values())
+
+    def evaluate(self) -> CanaryVerdict:
+        """Compare the variants against the thresholds"""
+        baseline, canary = self.stats[BASELINE], self.stats[CANARY]
+        reasons = []
+        if not self._enough_samples():
+            reasons.append(
+                f"insufficient samples (baseline {len(baseline.latencies)}, canary {len(canary.latencies)}, "
+                f"need {self.min_samples})"
+            )
+        elif max(baseline.percentile(0.5), canary.percentile(0.5)) * 1000 < self.min_latency_ms:
+            reasons.append(f"latency below {self.min_latency_ms:g} ms on both variants is too small to compare")
+        else:
+            for label, q in (("p50", 0.5), ("p95", 0.95)):
+                base_value, canary_value = baseline.percentile(q), canary.percentile(q)
+                if canary_value > base_value * (1 + self.latency_threshold):
+                    slowdown = (canary_value / base_value - 1) * 100 if base_value else float("inf")
+                    reasons.append(f"{label} latency +{slowdown:.0f}% exceeds {self.latency_threshold:.0%}")
+        if canary.error_rate > baseline.error_rate + self.error_rate_threshold:
+            reasons.append(
+                f"error rate {canary.error_rate:.1%} vs {baseline.error_rate:.1%} "
+                f"exceeds +{self.error_rate_threshold:.1%}"
+            )
+        return CanaryVerdict(self.agent_id, not reasons, reasons, baseline.to_dict(), canary.to_dict())
+
+    def promote(self) -> None:
+        """Make the new version current and remove the canary"""
+        self.backend.update_agent(self.agent_id, self.definition)
+        self.backend.delete_agent(self.canary_id)
+
+    def rollback(self) -> None:
+        """Remove the canary, leaving the current version untouched"""
+        self.backend.delete_agent(self.canary_id)
+
+    def finish(self) -> CanaryVerdict:
+        """Evaluate, then promote or roll back accordingly"""
+        verdict = self.evaluate()
+        if verdict.promote:
+            self.promote()
+        else:
+            self.rollback()
+        return verdict
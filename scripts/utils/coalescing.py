@@ -0,0 +1,179 @@
+"""
+Microsoft Copilot Agent Team - Idempotent Tool Call Coalescing
+
+Invocation middleware for the standard ``ITool`` interface. For tools marked
+``metadata.idempotent`` (read-only: searches, page fetches, calendar reads):
+
+- concurrent identical calls share one in-flight invocation (singleflight)
+- successful results are memoized for a short TTL
+
+Calls are identical when tool, platform, parameters and caller identity
+(tenant and user) match, so one user's calendar is never served to another.
+Every caller gets its own deep copy of the shared result. Non-idempotent tools
+pass straight through.
+
+Usage:
+    from utils.coalescing import ToolCallCoalescer
+
+    coalescer = ToolCallCoalescer(ttl_seconds=30)
+    search = coalescer.wrap(registry.get_tool("web.search", "microsoft"))
+    result = await search.invoke({"query": "Copilot Studio topics"}, auth_context)
+    print(coalescer.stats())
+"""
+
+import asyncio
+import copy
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+DEFAULT_TTL_SECONDS = 30.0
+DEFAULT_MAX_ENTRIES = 1024
+
+CallKey = Tuple[str, str, str, str]
+
+
+def _caller_identity(auth_context: Optional[Dict[str, Any]]) -> str:
+    """Identify the caller without keeping raw credentials in cache keys"""
+    if not auth_context:
+        return ""
+    if auth_context.get("user_id"):
+        return f"{auth_context.get('tenant_id') or ''}/{auth_context['user_id']}"
+    material = json.dumps(auth_context, sort_keys=True, default=str)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class ToolCallCoalescer:
+    """
+    Singleflight + TTL memoization for idempotent tool calls.
+
+    Args:
+        ttl_seconds: How long successful results are reused (0 disables memoization)
+        max_entries: Memoized results kept (least recently used are evicted)
+        idempotent_tools: Extra tool names to treat as idempotent, for tools
+                          whose metadata does not declare it
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        idempotent_tools: Optional[Iterable[str]] = None,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.idempotent_tools = set(idempotent_tools or ())
+        self._inflight: Dict[CallKey, asyncio.Future] = {}
+        self._memo: "OrderedDict[CallKey, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def is_idempotent(self, tool: Any) -> bool:
+        metadata = tool.metadata
+        return getattr(metadata, "idempotent", False) or metadata.name in self.idempotent_tools
+
+    def wrap(self, tool: Any) -> "CoalescedTool":
+        """Return ``tool`` behind this coalescer, keeping the ITool interface"""
+        return CoalescedTool(tool, self)
+
+    async def invoke(
+        self,
+        tool: Any,
+        parameters: Dict[str, Any],
+        auth_context: Optional[Dict[str, Any]] = None,
+        execution_context: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Invoke ``tool``, sharing or reusing the result of an identical idempotent call"""
+        name = tool.metadata.name
+        counters = self._counters(name)
+        counters["calls"] += 1
+        if not self.is_idempotent(tool):
+            counters["executed"] += 1
+            return await tool.invoke(parameters, auth_context, execution_context)
+
+        key = (
+            name,
+            tool.metadata.platform,
+            json.dumps(parameters, sort_keys=True, default=str),
+            _caller_identity(auth_context),
+        )
+
+        memoized = self._memo.get(key)
+        if memoized is not None:
+            expires_at, result = memoized
+            if expires_at > time.monotonic():
+                self._memo.move_to_end(key)
+                counters["memo_hits"] += 1
+                return _tagged(result, "memoized")
+            del self._memo[key]
+
+        future = self._inflight.get(key)
+        if future is not None:
+            counters["coalesced"] += 1
+            return _tagged(await asyncio.shield(future), "coalesced")
+
+        counters["executed"] += 1
+        future = asyncio.ensure_future(tool.invoke(parameters, auth_context, execution_context))
+        self._inflight[key] = future
+        future.add_done_callback(lambda done: self._complete(key, done))
+        return _tagged(await asyncio.shield(future))
+
+    def _complete(self, key: CallKey, future: asyncio.Future) -> None:
+        self._inflight.pop(key, None)
+        if self.ttl_seconds <= 0 or future.cancelled() or future.exception() is not None:
+            return
+        result = future.result()
+        if not result.get("success"):
+            return
+        self._memo[key] = (time.monotonic() + self.ttl_seconds, result)
+        self._memo.move_to_end(key)
+        while len(self._memo) > self.max_entries:
+            self._memo.popitem(last=False)
+
+    def _counters(self, tool_name: str) -> Dict[str, int]:
+        counters = self._stats.get(tool_name)
+        if counters is None:
+            counters = self._stats[tool_name] = {"calls": 0, "executed": 0, "coalesced": 0, "memo_hits": 0}
+        return counters
+
+    def invalidate(self, tool_name: Optional[str] = None) -> None:
+        """Drop memoized results for one tool, or all of them"""
+        for key in [k for k in self._memo if tool_name is None or k[0] == tool_name]:
+            del self._memo[key]
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Per-tool counters: calls, executed, coalesced, memo_hits"""
+        return {name: dict(counters) for name, counters in self._stats.items()}
+
+
+def _tagged(result: Dict[str, Any], source: Optional[str] = None) -> Dict[str, Any]:
+    """Deep copy of a shared result, marking where it came from in its metadata"""
+    tagged = copy.deepcopy(result)
+    tagged["metadata"] = tagged.get("metadata") or {}
+    if source:
+        tagged["metadata"]["deduplicated"] = source
+    return tagged
+
+
+class CoalescedTool:
+    """An ``ITool`` routed through a :class:`ToolCallCoalescer`"""
+
+    def __init__(self, tool: Any, coalescer: ToolCallCoalescer):
+        self.tool = tool
+        self.metadata = tool.metadata
+        self.coalescer = coalescer
+
+    async def invoke(
+        self,
+        parameters: Dict[str, Any],
+        auth_context: Optional[Dict[str, Any]] = None,
+        execution_context: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        return await self.coalescer.invoke(self.tool, parameters, auth_context, execution_context)
+
+    async def validate_parameters(self, parameters: Dict[str, Any]):
+        return await self.tool.validate_parameters(parameters)
+
+    async def health_check(self) -> bool:
+        return await self.tool.health_check()
@@ -0,0 +1,52 @@
+"""
+Microsoft Copilot Agent Team - Configuration Loading
+
+Loads the agent team configuration (config/agents.json, created from the
+template written by setup.py) and expands ``${VAR}`` placeholders from the
+environment.
+"""
+
+import json
+import os
+import re
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional
+
+DEFAULT_CONFIG_FILE = "config/agents.json"
+EXAMPLE_CONFIG_FILE = "config/agents.example.json"
+
+_PLACEHOLDER = re.compile(r"\$\{([A-Za-z_][A-Za-z0-9_]*)\}")
+
+
+def expand_placeholders(value: Any, env: Mapping[str, str]) -> Any:
+    """Recursively replace ``${VAR}`` in strings; unknown variables are left as-is."""
+    if isinstance(value, str):
+        if "${" not in value:
+            return value
+        return _PLACEHOLDER.sub(lambda m: env.get(m.group(1), m.group(0)), value)
+    if isinstance(value, dict):
+        return {key: expand_placeholders(item, env) for key, item in value.items()}
+    if isinstance(value, list):
+        return [expand_placeholders(item, env) for item in value]
+    return value
+
+
+def load_config(path: Optional[str] = None, env: Optional[Mapping[str, str]] = None) -> Dict[str, Any]:
+    """
+    Load the agent team configuration.
+
+    Args:
+        path: Config file; defaults to CONFIG_FILE, then config/agents.json,
+              falling back to config/agents.example.json
+        env: Variables for placeholder expansion (default: os.environ)
+
+    Returns:
+        Parsed configuration with placeholders expanded
+    """
+    if path is None:
+        path = os.getenv("CONFIG_FILE", DEFAULT_CONFIG_FILE)
+        if not Path(path).exists() and Path(EXAMPLE_CONFIG_FILE).exists():
+            path = EXAMPLE_CONFIG_FILE
+    with open(path, encoding="utf-8") as f:
+        config = json.load(f)
+    return expand_placeholders(config, os.environ if env is None else env)
@@ -0,0 +1,495 @@
+"""
+Microsoft Copilot Agent Team - Document Cache
+
+Local HTTP page cache for the Documentation Researcher ("Web" toolkit):
+
+- pages are fetched once and kept with their ETag / Last-Modified; within
+  their freshness lifetime (Cache-Control max-age, else ``default_ttl``)
+  they are served without any request, afterwards they are revalidated with
+  a conditional request and a 304 costs no download
+- the HTML is reduced to clean text (scripts, styles and page chrome
+  removed, ``<main>`` preferred) once at fetch time, so cache hits skip the
+  parse as well as the download
+- text is stored zlib-compressed in a content-addressed object store
+  (``objects/<sha256>``), so identical pages share one object; page
+  metadata lives in a small SQLite index
+- when the network fails, a cached copy is served stale; ``offline=True``
+  never touches the network, and ``export_snapshot`` / ``import_snapshot``
+  move the whole cache to another machine (e.g. CI) as one zip file
+
+Usage:
+    from utils.doc_cache import get_document_cache
+
+    cache = get_document_cache()
+    page = cache.fetch("https://learn.microsoft.com/microsoft-copilot-studio/fundamentals-what-is-copilot-studio")
+    print(page.title, page.source, len(page.text))
+"""
+
+import asyncio
+import email.utils
+import hashlib
+import http.client
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import urllib.error
+import urllib.request
+import zipfile
+import zlib
+from dataclasses import dataclass
+from datetime import datetime
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from utils.tools import ITool, ToolError, ToolErrorCode, ToolMetadata, ToolType
+from utils.tool_registry import registry
+
+DEFAULT_CACHE_DIR = "data/doc-cache"
+DEFAULT_TTL_SECONDS = 3600
+DEFAULT_TIMEOUT = 15.0
+DEFAULT_USER_AGENT = "copilot-agent-team-doc-cache/1.0"
+MAX_PAGE_BYTES = 20 * 1024 * 1024
+
+# Where the page came from
+FRESH = "cache"               # served from cache, no request
+REVALIDATED = "revalidated"   # 304 Not Modified
+DOWNLOADED = "network"        # 200, text extracted and stored
+STALE = "stale"               # network failed, older copy served
+OFFLINE = "offline"           # offline mode / snapshot
+
+_SKIP_TAGS = {"script", "style", "noscript", "template", "svg", "nav", "header", "footer", "aside", "form"}
+_BLOCK_TAGS = {"p", "div", "section", "article", "main", "br", "li", "ul", "ol", "table", "tr", "pre",
+               "h1", "h2", "h3", "h4", "h5", "h6", "blockquote", "dt", "dd"}
+_VOID_TAGS = {"br", "img", "hr", "input", "meta", "link", "source", "wbr", "col", "area", "base"}
+_MAX_AGE = re.compile(r"max-age=(\d+)")
+
+
+class DocumentUnavailable(LookupError):
+    """Raised when a page cannot be fetched and there is no cached copy"""
+
+
+@dataclass
+class Document:
+    """A cached page"""
+    url: str
+    title: str
+    text: str
+    content_hash: str
+    fetched_at: float
+    source: str
+
+
+class _TextExtractor(HTMLParser):
+    """Collects readable text, preferring the ``<main>`` element when present"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.title = ""
+        self._in_title = False
+        self._skip_depth = 0
+        self._main_depth = 0
+        self._pre_depth = 0
+        self._all: List[str] = []
+        self._main: List[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _SKIP_TAGS:
+            if tag not in _VOID_TAGS:
+                self._skip_depth += 1
+            return
+        if tag == "title":
+            self._in_title = True
+        elif tag == "main":
+            self._main_depth += 1
+        elif tag == "pre":
+            self._pre_depth += 1
+        if tag in _BLOCK_TAGS:
+            self._emit("\n")
+        if tag == "li":
+            self._emit("- ")
+
+    def handle_endtag(self, tag):
+        if tag in _SKIP_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+            return
+        if tag == "title":
+            self._in_title = False
+        elif tag == "main":
+            self._main_depth = max(0, self._main_depth - 1)
+        elif tag == "pre":
+            self._pre_depth = max(0, self._pre_depth - 1)
+        if tag in _BLOCK_TAGS and tag != "li":
+            self._emit("\n")
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title += data
+            return
+        if self._skip_depth:
+            return
+        self._emit(data if self._pre_depth else re.sub(r"\s+", " ", data))
+
+    def _emit(self, text: str) -> None:
+        self._all.append(text)
+        if self._main_depth:
+            self._main.append(text)
+
+    def text(self) -> str:
+        chunks = self._main if "".join(self._main).strip() else self._all
+        lines = (line.strip() if not line.startswith((" ", "\t")) else line.rstrip()
+                 for line in "".join(chunks).split("\n"))
+        return re.sub(r"\n{3,}", "\n\n", "\n".join(lines)).strip()
+
+
+def extract_text(html: str) -> Tuple[str, str]:
+    """(title, clean text) of an HTML page"""
+    parser = _TextExtractor()
+    parser.feed(html)
+    parser.close()
+    return " ".join(parser.title.split()), parser.text()
+
+
+class DocumentCache:
+    """
+    Conditional-request page cache with a compressed content-addressed store.
+
+    Args:
+        cache_dir: Directory holding ``index.db`` and ``objects/``
+        default_ttl: Seconds a page is fresh when the server sends no max-age
+        offline: Never use the network; serve only cached pages
+        timeout: Request timeout in seconds
+        user_agent: User-Agent header sent with requests
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = DEFAULT_CACHE_DIR,
+        default_ttl: float = DEFAULT_TTL_SECONDS,
+        offline: bool = False,
+        timeout: float = DEFAULT_TIMEOUT,
+        user_agent: str = DEFAULT_USER_AGENT,
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.objects_dir = self.cache_dir / "objects"
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self.default_ttl = default_ttl
+        self.offline = offline
+        self.timeout = timeout
+        self.user_agent = user_agent
+        self._db = sqlite3.connect(str(self.cache_dir / "index.db"), check_same_thread=False,
+                                   isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS pages (url TEXT PRIMARY KEY, content_hash TEXT NOT NULL, "
+            "title TEXT, etag TEXT, last_modified TEXT, fetched_at REAL, validated_at REAL, max_age REAL)"
+        )
+        self._lock = threading.Lock()
+        self._url_locks: Dict[str, threading.Lock] = {}
+        self._counters = {FRESH: 0, REVALIDATED: 0, DOWNLOADED: 0, STALE: 0, OFFLINE: 0,
+                          "bytes_downloaded": 0, "errors": 0}
+
+    # Object store
+
+    def _object_path(self, content_hash: str) -> Path:
+        return self.objects_dir / content_hash[:2] / content_hash[2:]
+
+    def _store_text(self, text: str) -> str:
+        data = text.encode("utf-8")
+        content_hash = hashlib.sha256(data).hexdigest()
+        path = self._object_path(content_hash)
+        if not path.exists():
+            path.parent.mkdir(exist_ok=True)
+            tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_bytes(zlib.compress(data, 6))
+            os.replace(tmp, path)
+        return content_hash
+
+    def _load_text(self, content_hash: str) -> str:
+        return zlib.decompress(self._object_path(content_hash).read_bytes()).decode("utf-8")
+
+    # Fetching
+
+    def _entry(self, url: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT content_hash, title, etag, last_modified, fetched_at, validated_at, max_age "
+                "FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        keys = ("content_hash", "title", "etag", "last_modified", "fetched_at", "validated_at", "max_age")
+        return dict(zip(keys, row))
+
+    def _document(self, url: str, entry: Dict[str, Any], source: str) -> Document:
+        with self._lock:
+            self._counters[source] += 1
+        return Document(url, entry["title"] or "", self._load_text(entry["content_hash"]),
+                        entry["content_hash"], entry["fetched_at"], source)
+
+    def fetch(self, url: str, max_age: Optional[float] = None) -> Document:
+        """
+        Return the page's text, using the network only when the cached copy
+        is older than its freshness lifetime (or ``max_age`` when given).
+        """
+        with self._lock:
+            url_lock = self._url_locks.setdefault(url, threading.Lock())
+        with url_lock:  # concurrent fetches of one URL share a single request
+            entry = self._entry(url)
+            if self.offline:
+                if entry is None:
+                    raise DocumentUnavailable(f"{url} is not in the offline cache")
+                return self._document(url, entry, OFFLINE)
+
+            if entry is not None:
+                lifetime = entry["max_age"] if max_age is None else max_age
+                if time.time() - entry["validated_at"] < lifetime:
+                    return self._document(url, entry, FRESH)
+
+            try:
+                return self._request(url, entry)
+            except (urllib.error.URLError, http.client.HTTPException, OSError, ValueError) as e:
+                with self._lock:
+                    self._counters["errors"] += 1
+                if entry is None:
+                    raise DocumentUnavailable(f"{url}: {e}") from e
+                return self._document(url, entry, STALE)
+
+    def _request(self, url: str, entry: Optional[Dict[str, Any]]) -> Document:
+        headers = {"User-Agent": self.user_agent, "Accept": "text/html,text/plain;q=0.9,*/*;q=0.5"}
+        if entry is not None:
+            if entry["etag"]:
+                headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        request = urllib.request.Request(url, headers=headers)
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                body = response.read(MAX_PAGE_BYTES + 1)
+                if len(body) > MAX_PAGE_BYTES:
+                    raise ValueError(f"page exceeds {MAX_PAGE_BYTES} bytes")
+                response_headers = response.headers
+                expected = response_headers.get("Content-Length", "")
+                if expected.isdigit() and len(body) < int(expected):
+                    # read(amt) returns a cut-off body instead of raising IncompleteRead itself
+                    raise http.client.IncompleteRead(body, int(expected) - len(body))
+                charset = response_headers.get_content_charset() or "utf-8"
+                content_type = response_headers.get_content_type()
+        except urllib.error.HTTPError as e:
+            if e.code != 304 or entry is None:
+                raise
+            entry["validated_at"] = time.time()
+            entry["max_age"] = self._lifetime(e.headers, entry["max_age"])
+            with self._lock:
+                self._db.execute("UPDATE pages SET validated_at = ?, max_age = ? WHERE url = ?",
+                                 (entry["validated_at"], entry["max_age"], url))
+            return self._document(url, entry, REVALIDATED)
+
+        content = body.decode(charset, errors="replace")
+        if content_type in ("text/html", "application/xhtml+xml"):
+            title, text = extract_text(content)
+        else:
+            title, text = "", content.strip()
+        now = time.time()
+        entry = {
+            "content_hash": self._store_text(text),
+            "title": title,
+            "etag": response_headers.get("ETag"),
+            "last_modified": response_headers.get("Last-Modified"),
+            "fetched_at": now,
+            "validated_at": now,
+            "max_age": self._lifetime(response_headers, self.default_ttl),
+        }
+        with self._lock:
+            self._counters[DOWNLOADED] += 1
+            self._counters["bytes_downloaded"] += len(body)
+            self._db.execute(
+                "INSERT OR REPLACE INTO pages (url, content_hash, title, etag, last_modified, fetched_at, "
+                "validated_at, max_age) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, entry["content_hash"], title, entry["etag"], entry["last_modified"], now, now,
+                 entry["max_age"]),
+            )
+        return Document(url, title, text, entry["content_hash"], now, DOWNLOADED)
+
+    def _lifetime(self, headers, fallback: float) -> float:
+        """Freshness lifetime from Cache-Control / Expires (no-cache means revalidate every time)"""
+        cache_control = (headers.get("Cache-Control") or "").lower()
+        if "no-cache" in cache_control or "no-store" in cache_control:
+            return 0.0
+        match = _MAX_AGE.search(cache_control)
+        if match:
+            return float(match.group(1))
+        expires = headers.get("Expires")
+        if expires:
+            try:
+                return max(0.0, email.utils.parsedate_to_datetime(expires).timestamp() - time.time())
+            except (TypeError, ValueError):
+                return 0.0
+        return fallback
+
+    # Maintenance
+
+    def invalidate(self, url: str) -> None:
+        """Force the next fetch of ``url`` to revalidate"""
+        with self._lock:
+            self._db.execute("UPDATE pages SET validated_at = 0 WHERE url = ?", (url,))
+
+    def remove_orphans(self) -> int:
+        """Delete objects no page refers to; returns how many were removed"""
+        with self._lock:
+            referenced = {row[0] for row in self._db.execute("SELECT DISTINCT content_hash FROM pages")}
+        removed = 0
+        for path in self.objects_dir.glob("*/*"):
+            if path.parent.name + path.name not in referenced and not path.name.endswith(".tmp"):
+                path.unlink(missing_ok=True)
+                removed += 1
+        return removed
+
+    def export_snapshot(self, path: str) -> int:
+        """Write every cached page into one zip file; returns the page count"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT url, content_hash, title, etag, last_modified, fetched_at FROM pages"
+            ).fetchall()
+        pages = [dict(zip(("url", "content_hash", "title", "etag", "last_modified", "fetched_at"), row))
+                 for row in rows]
+        with zipfile.ZipFile(path, "w", zipfile.ZIP_STORED) as archive:  # objects are already compressed
+            archive.writestr("manifest.json", json.dumps({"created_at": time.time(), "pages": pages}))
+            for content_hash in {page["content_hash"] for page in pages}:
+                archive.write(self._object_path(content_hash), f"objects/{content_hash}")
+        return len(pages)
+
+    def import_snapshot(self, path: str) -> int:
+        """Load a snapshot written by ``export_snapshot``; returns the page count"""
+        with zipfile.ZipFile(path) as archive:
+            manifest = json.loads(archive.read("manifest.json"))
+            for name in archive.namelist():
+                if name.startswith("objects/"):
+                    content_hash = name.split("/", 1)[1]
+                    if not re.fullmatch(r"[0-9a-f]{64}", content_hash):
+                        continue
+                    target = self._object_path(content_hash)
+                    if not target.exists():
+                        target.parent.mkdir(exist_ok=True)
+                        target.write_bytes(archive.read(name))
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO pages (url, content_hash, title, etag, last_modified, fetched_at, "
+                "validated_at, max_age) VALUES (?, ?, ?, ?, ?, ?, 0, 0)",
+                [(p["url"], p["content_hash"], p["title"], p["etag"], p["last_modified"], p["fetched_at"])
+                 for p in manifest["pages"]],
+            )
+        return len(manifest["pages"])
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            pages, objects = self._db.execute(
+                "SELECT COUNT(*), COUNT(DISTINCT content_hash) FROM pages"
+            ).fetchone()
+            return dict(self._counters, pages=pages, objects=objects)
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+_cache: Optional[DocumentCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_document_cache() -> DocumentCache:
+    """Process-wide cache configured from DOC_CACHE_DIR / DOC_CACHE_OFFLINE"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = DocumentCache(
+                    os.getenv("DOC_CACHE_DIR", DEFAULT_CACHE_DIR),
+                    offline=os.getenv("DOC_CACHE_OFFLINE", "").lower() in ("1", "true", "yes"),
+                )
+    return _cache
+
+
+@registry.register
+class FetchDocumentTool(ITool):
+    """``web.fetch_document`` served through the local document cache"""
+
+    metadata = ToolMetadata(
+        name="web.fetch_document",
+        category="web",
+        description="Fetch a documentation page as clean text (cached, revalidated with conditional requests)",
+        tool_type=ToolType.SELF_BUILT,
+        platform="universal",
+        version="1.0.0",
+        parameters={
+            "type": "object",
+            "properties": {
+                "url": {"type": "string", "description": "http(s) URL of the page"},
+                "max_age_seconds": {"type": "number", "minimum": 0,
+                                    "description": "Accept a cached copy up to this old without revalidating"},
+            },
+            "required": ["url"],
+        },
+        authentication_required=False,
+        idempotent=True,
+    )
+
+    def configure_platform(self, platform: str) -> None:
+        self.platform = platform
+
+    async def validate_parameters(self, parameters: Dict[str, Any]):
+        url = parameters.get("url")
+        if not isinstance(url, str) or not url.startswith(("http://", "https://")):
+            return False, "url must be an http(s) URL"
+        max_age = parameters.get("max_age_seconds")
+        if max_age is not None and (not isinstance(max_age, (int, float)) or max_age < 0):
+            return False, "max_age_seconds must be a non-negative number"
+        return True, None
+
+    async def invoke(self, parameters, auth_context=None, execution_context=None) -> Dict[str, Any]:
+        started = time.perf_counter()
+        valid, message = await self.validate_parameters(parameters)
+        error = None
+        data = None
+        if not valid:
+            error = ToolError(ToolErrorCode.INVALID_PARAMETERS, message)
+        else:
+            try:
+                page = await asyncio.get_running_loop().run_in_executor(
+                    None, get_document_cache().fetch, parameters["url"], parameters.get("max_age_seconds")
+                )
+            except DocumentUnavailable as e:
+                cause = e.__cause__
+                if isinstance(cause, urllib.error.HTTPError) and cause.code == 404:
+                    error = ToolError(ToolErrorCode.RESOURCE_NOT_FOUND, str(e))
+                elif isinstance(cause, (TimeoutError, urllib.error.URLError)) and "timed out" in str(cause):
+                    error = ToolError(ToolErrorCode.NETWORK_TIMEOUT, str(e), is_retryable=True)
+                else:
+                    error = ToolError(ToolErrorCode.NETWORK_CONNECTION_ERROR, str(e), is_retryable=True)
+            else:
+                data = {
+                    "url": page.url,
+                    "title": page.title,
+                    "text": page.text,
+                    "content_hash": page.content_hash,
+                    "fetched_at": datetime.fromtimestamp(page.fetched_at).isoformat(),
+                    "source": page.source,
+                }
+        return {
+            "success": error is None,
+            "data": data,
+            "metadata": {
+                "tool_name": self.metadata.name,
+                "platform": getattr(self, "platform", self.metadata.platform),
+                "execution_time_ms": int((time.perf_counter() - started) * 1000),
+                "timestamp": datetime.now().isoformat(),
+            },
+            "error": error.to_dict() if error else None,
+        }
+
+    async def health_check(self) -> bool:
+        return os.access(get_document_cache().objects_dir, os.W_OK)
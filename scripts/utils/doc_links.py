@@ -0,0 +1,378 @@
+"""
+Microsoft Copilot Agent Team - Documentation Link & Freshness Checker
+
+Automates the link and staleness part of the quarterly documentation review
+(DOCS-MAINTENANCE.md):
+
+- each markdown file is parsed once (code blocks skipped) into its links,
+  headings, version references and "Last Updated" date; parse results are
+  keyed by the file's git blob hash, so only files that changed since the
+  last run are parsed again
+- relative links are checked locally, including ``#anchors`` against the
+  target file's GitHub-style heading slugs
+- external links are checked concurrently (HEAD, falling back to GET) with
+  a per-host concurrency cap and request spacing; results are kept in the
+  persistent state file and reused until they expire, so unchanged links are
+  not requested again on every run
+- files whose "Last Updated" date is older than ``stale_days`` are reported
+
+Usage:
+    from utils.doc_links import DocLinkChecker
+
+    checker = DocLinkChecker(repo_root)
+    report = checker.run()
+    for issue in report["broken_links"]:
+        print(issue["file"], issue["line"], issue["url"], issue["error"])
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import unicodedata
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import unquote, urlsplit
+
+DEFAULT_PATTERNS = ("docs/**/*.md", "README.md", "CONTRIBUTING.md")
+DEFAULT_STATE_FILE = "data/doc-check-cache.json"
+DEFAULT_MAX_WORKERS = 16
+DEFAULT_PER_HOST = 4
+DEFAULT_HOST_RATE = 5.0
+DEFAULT_TIMEOUT = 10.0
+DEFAULT_STALE_DAYS = 120
+# Seconds an external result is reused: working links for a week, failures for a day
+OK_TTL_SECONDS = 7 * 86400
+FAILED_TTL_SECONDS = 86400
+STATE_VERSION = 2
+
+_FENCE = re.compile(r"^\s*(```|~~~)")
+_INLINE_CODE = re.compile(r"`[^`]*`")
+_INLINE_LINK = re.compile(
+    r"!?\[(?:[^\[\]]|\[[^\]]*\])*\]\(\s*<?((?:[^()\s>]|\([^()\s>]*\))+)>?(?:\s+[\"'][^\"']*[\"'])?\s*\)"
+)
+_REFERENCE_DEF = re.compile(r"^\s{0,3}\[[^\]]+\]:\s*<?(\S+?)>?(?:\s+.*)?$")
+_AUTOLINK = re.compile(r"<(https?://[^>\s]+)>")
+# URLs may contain balanced parentheses (Wikipedia-style "a_(b)"), but not an unmatched ")"
+_BARE_URL = re.compile(r"(?<![(<\[\"'=])\bhttps?://(?:[^\s<>()\[\]\"'`|]|\([^\s<>()\[\]\"'`|]*\))+")
+_HEADING = re.compile(r"^\s{0,3}(#{1,6})\s+(.*?)\s*#*\s*$")
+_HTML_ANCHOR = re.compile(r"<a\s+(?:name|id)=[\"']([^\"']+)[\"']", re.IGNORECASE)
+_VERSION = re.compile(r"\b(?:[Vv]ersion\W{0,4}\s*|v)(\d+\.\d+(?:\.\d+)?)\b")
+_LAST_UPDATED = re.compile(r"(?:Last Updated|最後更新)\W{0,4}\s*([^|\n]+)", re.IGNORECASE)
+_MONTHS = {name: number for number, name in enumerate(
+    ["january", "february", "march", "april", "may", "june", "july", "august",
+     "september", "october", "november", "december"], start=1)}
+
+
+def git_blob_hash(data: bytes) -> str:
+    """Same id ``git hash-object`` gives the content"""
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+def github_slug(heading: str) -> str:
+    """Anchor GitHub generates for a heading"""
+    text = re.sub(r"\[([^\]]*)\]\([^)]*\)", r"\1", heading)  # keep link text only
+    text = re.sub(r"[`*~]", "", text).strip().lower()
+    # GitHub keeps letters, marks, numbers, "_", "-" and spaces
+    text = "".join(c for c in text if c in "-_ " or unicodedata.category(c)[0] in "LMN")
+    return text.replace(" ", "-")
+
+
+def _iso_date(year: Any, month: Any, day: Any = 1) -> Optional[str]:
+    try:
+        return date(int(year), int(month), int(day)).isoformat()
+    except ValueError:
+        return None
+
+
+def parse_date(text: str) -> Optional[str]:
+    """
+    ISO date (first of month when only month/year is given) from a "Last
+    Updated" value; None when there is no date or it does not exist (2025-13-40)
+    """
+    match = re.search(r"(\d{4})-(\d{1,2})(?:-(\d{1,2}))?", text)
+    if match:
+        return _iso_date(match.group(1), match.group(2), match.group(3) or 1)
+    match = re.search(r"(\d{4})\s*年\s*(\d{1,2})\s*月", text)
+    if match:
+        return _iso_date(match.group(1), match.group(2))
+    match = re.search(r"([A-Za-z]+)\s+(?:(\d{1,2}),\s*)?(\d{4})", text)
+    if match and match.group(1).lower() in _MONTHS:
+        return _iso_date(match.group(3), _MONTHS[match.group(1).lower()], match.group(2) or 1)
+    return None
+
+
+@dataclass
+class ParsedDoc:
+    """What the checker needs from one markdown file"""
+    blob: str
+    links: List[Tuple[int, str]] = field(default_factory=list)
+    anchors: List[str] = field(default_factory=list)
+    versions: List[Tuple[int, str]] = field(default_factory=list)
+    last_updated: Optional[str] = None
+
+
+def parse_markdown(text: str, blob: str = "") -> ParsedDoc:
+    """Extract links (with line numbers), heading anchors, versions and the last-updated date"""
+    doc = ParsedDoc(blob)
+    slugs: Dict[str, int] = {}
+    in_fence = False
+    for number, line in enumerate(text.splitlines(), start=1):
+        if _FENCE.match(line):
+            in_fence = not in_fence
+            continue
+        if in_fence:
+            continue
+        heading = _HEADING.match(line)
+        if heading:
+            slug = github_slug(heading.group(2))
+            count = slugs.get(slug, 0)
+            slugs[slug] = count + 1
+            doc.anchors.append(slug if count == 0 else f"{slug}-{count}")
+        doc.anchors.extend(_HTML_ANCHOR.findall(line))
+
+        line = _INLINE_CODE.sub("", line)
+        seen = set()
+        definition = _REFERENCE_DEF.match(line)
+        for url in ([definition.group(1)] if definition else []) + _INLINE_LINK.findall(line) \
+                + _AUTOLINK.findall(line) + _BARE_URL.findall(line):
+            url = url.rstrip(".,;:!?*")
+            if url and url not in seen:
+                seen.add(url)
+                doc.links.append((number, url))
+
+        for version in _VERSION.findall(line):
+            doc.versions.append((number, version))
+        if doc.last_updated is None:
+            updated = _LAST_UPDATED.search(line)
+            if updated:
+                doc.last_updated = parse_date(updated.group(1))
+    return doc
+
+
+class _HostLimiter:
+    """Caps concurrent requests per host and spaces them 1/rate seconds apart"""
+
+    def __init__(self, per_host: int, rate_per_second: float):
+        self.per_host = per_host
+        self.interval = 1.0 / rate_per_second if rate_per_second else 0.0
+        self._lock = threading.Lock()
+        self._slots: Dict[str, threading.Semaphore] = {}
+        self._next: Dict[str, float] = {}
+
+    def acquire(self, host: str) -> threading.Semaphore:
+        with self._lock:
+            slots = self._slots.setdefault(host, threading.Semaphore(self.per_host))
+        slots.acquire()
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next.get(host, now))
+            self._next[host] = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+        return slots
+
+
+class DocLinkChecker:
+    """
+    Incremental link and freshness checker for a repository's markdown.
+
+    Args:
+        root: Repository root
+        patterns: Glob patterns (relative to root) of files to check
+        state_file: Persistent parse/link cache (relative to root unless absolute)
+        max_workers: External link checks in flight
+        per_host: Concurrent requests per host
+        host_rate: Maximum requests per second per host (0 for no spacing)
+        timeout: Request timeout in seconds
+        stale_days: Age of "Last Updated" after which a file is reported stale
+    """
+
+    def __init__(
+        self,
+        root: str,
+        patterns: Iterable[str] = DEFAULT_PATTERNS,
+        state_file: str = DEFAULT_STATE_FILE,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        per_host: int = DEFAULT_PER_HOST,
+        host_rate: float = DEFAULT_HOST_RATE,
+        timeout: float = DEFAULT_TIMEOUT,
+        stale_days: int = DEFAULT_STALE_DAYS,
+    ):
+        self.root = Path(root).resolve()
+        self.patterns = tuple(patterns)
+        self.state_path = Path(state_file) if os.path.isabs(state_file) else self.root / state_file
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.stale_days = stale_days
+        self._limiter = _HostLimiter(per_host, host_rate)
+        self._state = self._load_state()
+
+    # State
+
+    def _load_state(self) -> Dict[str, Any]:
+        try:
+            state = json.loads(self.state_path.read_text(encoding="utf-8"))
+            if state.get("version") == STATE_VERSION:
+                return state
+        except (OSError, ValueError):
+            pass
+        return {"version": STATE_VERSION, "files": {}, "urls": {}}
+
+    def _save_state(self) -> None:
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.state_path.with_name(self.state_path.name + ".tmp")
+        tmp.write_text(json.dumps(self._state, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp, self.state_path)
+
+    # Parsing
+
+    def files(self) -> List[str]:
+        found = set()
+        for pattern in self.patterns:
+            found.update(str(p.relative_to(self.root).as_posix()) for p in self.root.glob(pattern) if p.is_file())
+        return sorted(found)
+
+    def _parse_changed(self, files: List[str]) -> Tuple[Dict[str, ParsedDoc], List[str]]:
+        cached = self._state["files"]
+        docs: Dict[str, ParsedDoc] = {}
+        changed = []
+        for name in files:
+            data = (self.root / name).read_bytes()
+            blob = git_blob_hash(data)
+            entry = cached.get(name)
+            if entry is not None and entry["blob"] == blob:
+                docs[name] = ParsedDoc(blob, [tuple(l) for l in entry["links"]], entry["anchors"],
+                                       [tuple(v) for v in entry["versions"]], entry["last_updated"])
+                continue
+            docs[name] = parse_markdown(data.decode("utf-8", errors="replace"), blob)
+            cached[name] = asdict(docs[name])
+            changed.append(name)
+        for name in set(cached) - set(files):
+            del cached[name]
+        return docs, changed
+
+    # Checking
+
+    def _check_local(self, source: str, url: str, docs: Dict[str, ParsedDoc]) -> Optional[str]:
+        parts = urlsplit(url)
+        path, fragment = unquote(parts.path), unquote(parts.fragment)
+        if path:
+            target = (self.root / source).parent / path
+            try:
+                relative = target.resolve().relative_to(self.root).as_posix()
+            except ValueError:
+                return "points outside the repository"
+            if not target.exists():
+                return "file not found"
+        else:
+            relative = source
+        if fragment and relative.endswith(".md"):
+            doc = docs.get(relative)
+            anchors = doc.anchors if doc else parse_markdown(
+                (self.root / relative).read_text(encoding="utf-8", errors="replace")).anchors
+            if fragment.lower() not in anchors and fragment not in anchors:
+                return f"anchor #{fragment} not found"
+        return None
+
+    def _check_url(self, url: str) -> Dict[str, Any]:
+        host = urlsplit(url).netloc.lower()
+        result: Dict[str, Any] = {"checked_at": time.time()}
+        slots = self._limiter.acquire(host)
+        try:
+            status = None
+            for method in ("HEAD", "GET"):
+                request = urllib.request.Request(url, method=method, headers={
+                    "User-Agent": "copilot-agent-team-doc-check/1.0", "Accept": "*/*"})
+                try:
+                    with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                        status = response.status
+                except urllib.error.HTTPError as e:
+                    status = e.code
+                if status not in (403, 405, 501):  # servers that refuse HEAD
+                    break
+            result.update(status=status, ok=status is not None and status < 400)
+            if not result["ok"]:
+                result["error"] = f"HTTP {status}"
+        except (urllib.error.URLError, OSError, ValueError) as e:
+            result.update(status=None, ok=False, error=str(getattr(e, "reason", e)))
+        finally:
+            slots.release()
+        return result
+
+    def _url_fresh(self, url: str, now: float) -> bool:
+        cached = self._state["urls"].get(url)
+        if cached is None:
+            return False
+        ttl = OK_TTL_SECONDS if cached["ok"] else FAILED_TTL_SECONDS
+        return now - cached["checked_at"] < ttl
+
+    def run(self, full: bool = False, external: bool = True) -> Dict[str, Any]:
+        """
+        Check every file and return a report.
+
+        Args:
+            full: Re-parse every file and re-request every external link
+            external: Check http(s) links (False for a local-only run)
+        """
+        started = time.perf_counter()
+        if full:
+            self._state = {"version": STATE_VERSION, "files": {}, "urls": {}}
+        files = self.files()
+        docs, changed = self._parse_changed(files)
+
+        broken: List[Dict[str, Any]] = []
+        external_refs: Dict[str, List[Tuple[str, int]]] = {}
+        for name, doc in docs.items():
+            for line, url in doc.links:
+                scheme = urlsplit(url).scheme.lower()
+                if scheme in ("http", "https"):
+                    external_refs.setdefault(url, []).append((name, line))
+                elif not scheme:
+                    error = self._check_local(name, url, docs)
+                    if error:
+                        broken.append({"file": name, "line": line, "url": url, "error": error})
+
+        now = time.time()
+        to_check = [url for url in external_refs if not self._url_fresh(url, now)] if external else []
+        if to_check:
+            with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="doc-check") as pool:
+                for url, result in zip(to_check, pool.map(self._check_url, to_check)):
+                    self._state["urls"][url] = result
+        for url in set(self._state["urls"]) - set(external_refs):
+            del self._state["urls"][url]
+        if external:
+            for url, refs in external_refs.items():
+                result = self._state["urls"].get(url)
+                if result and not result["ok"]:
+                    broken.extend({"file": name, "line": line, "url": url, "error": result["error"]}
+                                  for name, line in refs)
+        self._save_state()
+
+        today = datetime.now(timezone.utc).date()
+        stale = []
+        for name, doc in docs.items():
+            if doc.last_updated:
+                age = (today - datetime.fromisoformat(doc.last_updated).date()).days
+                if age > self.stale_days:
+                    stale.append({"file": name, "last_updated": doc.last_updated, "age_days": age})
+
+        return {
+            "files": len(files),
+            "changed_files": changed,
+            "links": sum(len(doc.links) for doc in docs.values()),
+            "external_urls": len(external_refs),
+            "external_checked": len(to_check),
+            "broken_links": sorted(broken, key=lambda issue: (issue["file"], issue["line"])),
+            "stale_files": sorted(stale, key=lambda item: -item["age_days"]),
+            "versions": {name: sorted({v for _, v in doc.versions}) for name, doc in docs.items() if doc.versions},
+            "missing_last_updated": sorted(name for name, doc in docs.items() if not doc.last_updated),
+            "duration_seconds": round(time.perf_counter() - started, 3),
+        }
@@ -0,0 +1,277 @@
+"""
+Microsoft Copilot Agent Team - Fleet Deployment
+
+Deploys the agent team to many Power Platform environments at once.
+
+Environments are deployed concurrently. Within an environment, phases run in
+order and the agents of a phase deploy in parallel. Every backend call holds a
+slot from three limits: a global cap, a per-environment cap and a per-tenant
+cap, optionally with a per-tenant call rate. Each environment is listed once
+and only agents that are missing or differ are created or updated (see
+``utils.plan``). Throttled calls
+(``ThrottledError``) and transient connection errors are retried with
+backoff. A failure stops the remaining phases of that environment only.
+
+Fleet file format (JSON):
+    {
+      "environments": [
+        {"name": "contoso-prod", "url": "https://contoso.crm.dynamics.com", "tenant_id": "..."},
+        "https://fabrikam.crm.dynamics.com"
+      ]
+    }
+A bare list of entries is also accepted; ``tenant_id`` defaults to TENANT_ID.
+Every environment needs an http(s) URL and a tenant.
+"""
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import urlparse
+
+from utils.backend import AgentBackend, ThrottledError
+from utils.plan import NOOP, apply_action, plan_agent
+
+DEFAULT_MAX_CONCURRENCY = 32
+DEFAULT_PER_ENVIRONMENT = 4
+DEFAULT_PER_TENANT = 8
+DEFAULT_MAX_RETRIES = 4
+DEFAULT_BACKOFF_SECONDS = 0.5
+
+TRANSIENT_ERRORS = (ThrottledError, ConnectionError, TimeoutError)
+
+
+@dataclass
+class FleetEnvironment:
+    """A Power Platform environment to deploy to"""
+    name: str
+    url: str
+    tenant_id: str = ""
+
+
+@dataclass
+class EnvironmentResult:
+    """Outcome of deploying the team to one environment"""
+    name: str
+    url: str
+    tenant_id: str
+    status: str = "pending"             # "succeeded", "failed"
+    deployed: int = 0
+    unchanged: int = 0
+    failed: int = 0
+    skipped: int = 0
+    retries: int = 0
+    duration_seconds: float = 0.0
+    phase_seconds: Dict[str, float] = field(default_factory=dict)
+    errors: List[str] = field(default_factory=list)
+
+
+def load_fleet(path: str) -> List[FleetEnvironment]:
+    """Read the environment list from a fleet file"""
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    entries = data.get("environments", []) if isinstance(data, dict) else data
+    default_tenant = os.getenv("TENANT_ID", "")
+
+    environments = []
+    for position, entry in enumerate(entries, 1):
+        if isinstance(entry, str):
+            entry = {"url": entry}
+        url = entry.get("url") or ""
+        if urlparse(url).scheme not in ("http", "https"):
+            raise ValueError(f"Environment {position} in {path} has no http(s) url: {url!r}")
+        environment = FleetEnvironment(
+            name=entry.get("name") or urlparse(url).hostname or url,
+            url=url,
+            tenant_id=entry.get("tenant_id") or default_tenant,
+        )
+        if not environment.tenant_id:
+            raise ValueError(f"Environment '{environment.name}' has no tenant_id and TENANT_ID is not set")
+        environments.append(environment)
+    names = [env.name for env in environments]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"Duplicate environment names in {path}: {', '.join(duplicates)}")
+    return environments
+
+
+class _RateLimiter:
+    """Spaces calls at least 1/rate seconds apart (thread-safe)"""
+
+    def __init__(self, rate_per_second: float):
+        self.interval = 1.0 / rate_per_second
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class FleetDeployer:
+    """
+    Concurrent multi-environment deployment with layered concurrency caps.
+
+    Args:
+        phases: Ordered mapping of phase name -> agent definitions to create
+        backend_factory: Returns the agent backend for an environment
+        max_concurrency: Backend calls in flight across the whole fleet
+        per_environment: Backend calls in flight per environment
+        per_tenant: Backend calls in flight per tenant
+        tenant_rate: Optional maximum calls per second per tenant
+        max_retries: Retries for throttled / transient failures per backend call
+    """
+
+    def __init__(
+        self,
+        phases: Dict[str, List[Dict[str, Any]]],
+        backend_factory: Callable[[FleetEnvironment], AgentBackend],
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        per_environment: int = DEFAULT_PER_ENVIRONMENT,
+        per_tenant: int = DEFAULT_PER_TENANT,
+        tenant_rate: Optional[float] = None,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        backoff_seconds: float = DEFAULT_BACKOFF_SECONDS,
+        on_result: Optional[Callable[[EnvironmentResult], None]] = None,
+    ):
+        self.phases = phases
+        self.backend_factory = backend_factory
+        self.max_concurrency = max_concurrency
+        self.per_environment = per_environment
+        self.per_tenant = per_tenant
+        self.tenant_rate = tenant_rate
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.on_result = on_result
+        self._global = threading.BoundedSemaphore(max_concurrency)
+        self._tenant_slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._tenant_rates: Dict[str, _RateLimiter] = {}
+        self._lock = threading.Lock()
+
+    def deploy(self, environments: List[FleetEnvironment]) -> Dict[str, Any]:
+        """Deploy to every environment and return a machine-readable summary"""
+        started_at = datetime.now(timezone.utc)
+        started = time.perf_counter()
+        # Each environment driver mostly waits on its agent workers, so the
+        # driver pool only needs to keep every environment able to make progress.
+        workers = max(1, min(len(environments), self.max_concurrency))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fleet-env") as pool:
+            results = list(pool.map(self._deploy_environment, environments))
+
+        succeeded = sum(1 for r in results if r.status == "succeeded")
+        return {
+            "started_at": started_at.isoformat(),
+            "duration_seconds": round(time.perf_counter() - started, 3),
+            "limits": {
+                "max_concurrency": self.max_concurrency,
+                "per_environment": self.per_environment,
+                "per_tenant": self.per_tenant,
+                "tenant_rate": self.tenant_rate,
+            },
+            "totals": {
+                "environments": len(results),
+                "succeeded": succeeded,
+                "failed": len(results) - succeeded,
+                "agents_deployed": sum(r.deployed for r in results),
+                "agents_unchanged": sum(r.unchanged for r in results),
+                "agents_failed": sum(r.failed for r in results),
+                "retries": sum(r.retries for r in results),
+            },
+            "environments": [asdict(r) for r in results],
+        }
+
+    def _deploy_environment(self, env: FleetEnvironment) -> EnvironmentResult:
+        result = EnvironmentResult(env.name, env.url, env.tenant_id)
+        started = time.perf_counter()
+        try:
+            backend = self.backend_factory(env)
+            existing = self._call(env, result, backend.list_agents)
+            existing = {agent["id"]: agent for agent in existing}
+            with ThreadPoolExecutor(max_workers=self.per_environment,
+                                    thread_name_prefix=f"fleet-{env.name}") as pool:
+                phase_names = list(self.phases)
+                for index, phase in enumerate(phase_names):
+                    phase_started = time.perf_counter()
+                    outcomes = list(pool.map(
+                        lambda agent: self._deploy_agent(env, backend, agent, existing.get(agent["id"]), result),
+                        self.phases[phase]
+                    ))
+                    result.phase_seconds[phase] = round(time.perf_counter() - phase_started, 3)
+                    result.deployed += outcomes.count("deployed")
+                    result.unchanged += outcomes.count("unchanged")
+                    result.failed += outcomes.count("failed")
+                    if "failed" in outcomes:
+                        result.skipped = sum(len(self.phases[p]) for p in phase_names[index + 1:])
+                        break
+        except Exception as e:
+            result.errors.append(f"{type(e).__name__}: {e}")
+
+        result.status = "succeeded" if not result.errors and not result.failed else "failed"
+        result.duration_seconds = round(time.perf_counter() - started, 3)
+        if self.on_result is not None:
+            self.on_result(result)
+        return result
+
+    def _deploy_agent(self, env: FleetEnvironment, backend: AgentBackend, agent: Dict[str, Any],
+                      deployed: Optional[Dict[str, Any]], result: EnvironmentResult) -> str:
+        action = plan_agent(agent, deployed)
+        if action.action == NOOP:
+            return "unchanged"
+        try:
+            self._call(env, result, apply_action, action, backend)
+            return "deployed"
+        except Exception as e:
+            with self._lock:
+                result.errors.append(f"{agent['id']}: {type(e).__name__}: {e}")
+            return "failed"
+
+    def _call(self, env: FleetEnvironment, result: EnvironmentResult, func: Callable, *args) -> Any:
+        """Run one backend call under the concurrency limits, retrying transient failures"""
+        for attempt in range(self.max_retries + 1):
+            try:
+                with self._slots(env.tenant_id):
+                    return func(*args)
+            except TRANSIENT_ERRORS as e:
+                if attempt == self.max_retries:
+                    raise
+                with self._lock:
+                    result.retries += 1
+                retry_after = getattr(e, "retry_after_seconds", None)
+                time.sleep(retry_after if retry_after is not None else self.backoff_seconds * 2 ** attempt)
+
+    def _slots(self, tenant_id: str) -> "_Slots":
+        with self._lock:
+            tenant_slot = self._tenant_slots.get(tenant_id)
+            if tenant_slot is None:
+                tenant_slot = self._tenant_slots[tenant_id] = threading.BoundedSemaphore(self.per_tenant)
+                if self.tenant_rate:
+                    self._tenant_rates[tenant_id] = _RateLimiter(self.tenant_rate)
+        return _Slots(tenant_slot, self._global, self._tenant_rates.get(tenant_id))
+
+
+class _Slots:
+    """Acquire the tenant slot, then a global slot, then wait for the rate limiter"""
+
+    def __init__(self, tenant_slot: threading.Semaphore, global_slot: threading.Semaphore,
+                 rate_limiter: Optional[_RateLimiter]):
+        self.tenant_slot = tenant_slot
+        self.global_slot = global_slot
+        self.rate_limiter = rate_limiter
+
+    def __enter__(self) -> None:
+        self.tenant_slot.acquire()
+        self.global_slot.acquire()
+        if self.rate_limiter is not None:
+            self.rate_limiter.wait()
+
+    def __exit__(self, *exc_info) -> None:
+        self.global_slot.release()
+        self.tenant_slot.release()
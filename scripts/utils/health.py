@@ -0,0 +1,242 @@
+"""
+Microsoft Copilot Agent Team - Health Probes
+
+Concurrent agent health checking:
+
+- every probe runs in parallel with a short timeout; a probe that hangs is
+  reported as a timeout and is not started again until it returns
+- results are cached for ``cache_ttl`` seconds, so frequent polling does not
+  multiply probe traffic
+- ``start()`` re-probes continuously every ``interval`` seconds
+- ``serve()`` exposes ``/health`` (JSON, 200 when everything is healthy,
+  503 otherwise) and Prometheus text ``/metrics`` from the cached results
+
+Probes are plain callables: ``agent_probe`` invokes an agent through an
+``AgentBackend``, ``http_probe`` expects a 2xx response from a URL.
+
+Usage:
+    from utils.health import HealthChecker, agent_probe
+
+    checker = HealthChecker({name: agent_probe(backend, name) for name in agents}, timeout=2.0)
+    checker.start(interval=30)
+    checker.serve(port=8080)
+"""
+
+import json
+import threading
+import time
+import urllib.request
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import asdict, dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Optional
+
+from utils.backend import AgentBackend
+
+DEFAULT_TIMEOUT = 2.0
+DEFAULT_INTERVAL = 30.0
+
+HEALTHY = "healthy"
+UNHEALTHY = "unhealthy"
+TIMEOUT = "timeout"
+
+
+@dataclass
+class ProbeResult:
+    """Outcome of one probe"""
+    name: str
+    status: str
+    latency_ms: float
+    checked_at: float
+    error: Optional[str] = None
+
+    @property
+    def healthy(self) -> bool:
+        return self.status == HEALTHY
+
+
+def agent_probe(backend: AgentBackend, agent_id: str, message: str = "ping") -> Callable[[], Any]:
+    """Probe that sends a message to an agent and expects a reply"""
+    def probe():
+        if not backend.invoke_agent(agent_id, message):
+            raise RuntimeError("empty reply")
+    return probe
+
+
+def http_probe(url: str, timeout: float = DEFAULT_TIMEOUT) -> Callable[[], Any]:
+    """Probe that requests a URL and expects a 2xx response (errors raise)"""
+    def probe():
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            response.read()
+    return probe
+
+
+class HealthChecker:
+    """
+    Runs named probes concurrently and caches their results.
+
+    Args:
+        probes: Probe name -> callable that raises (or returns False) when unhealthy
+        timeout: Seconds a probe may take before it counts as timed out
+        cache_ttl: Seconds results are reused (defaults to the timeout)
+    """
+
+    def __init__(self, probes: Dict[str, Callable[[], Any]], timeout: float = DEFAULT_TIMEOUT,
+                 cache_ttl: Optional[float] = None):
+        self.probes = dict(probes)
+        self.timeout = timeout
+        self.cache_ttl = timeout if cache_ttl is None else cache_ttl
+        self._executor = ThreadPoolExecutor(max_workers=max(1, len(self.probes)), thread_name_prefix="health")
+        self._inflight: Dict[str, Future] = {}
+        self._results: Dict[str, ProbeResult] = {}
+        self._checked_at = 0.0
+        self._counts: Dict[str, Dict[str, int]] = {name: {HEALTHY: 0, UNHEALTHY: 0, TIMEOUT: 0}
+                                                   for name in self.probes}
+        self._lock = threading.Lock()
+        self._check_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._loop: Optional[threading.Thread] = None
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    def _run_probe(self, name: str) -> ProbeResult:
+        started = time.perf_counter()
+        try:
+            ok = self.probes[name]()
+            status, error = (UNHEALTHY, "probe returned False") if ok is False else (HEALTHY, None)
+        except Exception as e:
+            status, error = UNHEALTHY, f"{type(e).__name__}: {e}"
+        return ProbeResult(name, status, round((time.perf_counter() - started) * 1000, 2), time.time(), error)
+
+    def check(self) -> Dict[str, ProbeResult]:
+        """Probe everything now (concurrently) and return the results"""
+        with self._check_lock:
+            started = time.time()
+            futures = {}
+            for name in self.probes:
+                future = self._inflight.get(name)
+                if future is None or future.done():
+                    future = self._inflight[name] = self._executor.submit(self._run_probe, name)
+                futures[name] = future
+            wait(futures.values(), timeout=self.timeout)
+
+            results = {}
+            for name, future in futures.items():
+                if future.done():
+                    results[name] = future.result()
+                else:
+                    results[name] = ProbeResult(name, TIMEOUT, round(self.timeout * 1000, 2), time.time(),
+                                                f"no response within {self.timeout:.1f}s")
+            with self._lock:
+                for name, result in results.items():
+                    self._counts[name][result.status] += 1
+                self._results = results
+                self._checked_at = started
+            return results
+
+    def results(self, max_age: Optional[float] = None) -> Dict[str, ProbeResult]:
+        """Cached results, re-probing when they are older than ``max_age`` (default: cache_ttl)"""
+        max_age = self.cache_ttl if max_age is None else max_age
+        with self._lock:
+            if self._results and time.time() - self._checked_at < max_age:
+                return dict(self._results)
+        return self.check()
+
+    def status(self) -> str:
+        """Overall status: healthy, degraded (some unhealthy) or unhealthy (none healthy)"""
+        return _overall(self.results())
+
+    # Continuous mode
+
+    def start(self, interval: float = DEFAULT_INTERVAL) -> "HealthChecker":
+        """Re-probe every ``interval`` seconds in the background"""
+        self.cache_ttl = max(self.cache_ttl, interval + self.timeout)
+
+        def loop():
+            while not self._stop.is_set():
+                self.check()
+                self._stop.wait(interval)
+
+        self._loop = threading.Thread(target=loop, name="health-loop", daemon=True)
+        self._loop.start()
+        return self
+
+    def serve(self, host: str = "127.0.0.1", port: int = 8080) -> ThreadingHTTPServer:
+        """Serve /health and /metrics in a background thread"""
+        checker = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == "/health":
+                    results = checker.results()
+                    overall = _overall(results)
+                    body = json.dumps({
+                        "status": overall,
+                        "checked_at": checker._checked_at,
+                        "agents": {name: asdict(result) for name, result in results.items()},
+                    }).encode("utf-8")
+                    self._reply(200 if overall == HEALTHY else 503, "application/json", body)
+                elif self.path == "/metrics":
+                    self._reply(200, "text/plain; version=0.0.4", checker.metrics().encode("utf-8"))
+                else:
+                    self.send_error(404)
+
+            def _reply(self, code: int, content_type: str, body: bytes):
+                self.send_response(code)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=self._server.serve_forever, name="health-http", daemon=True).start()
+        return self._server
+
+    def metrics(self) -> str:
+        """Prometheus text exposition of the cached results"""
+        results = self.results()
+        with self._lock:
+            counts = {name: dict(c) for name, c in self._counts.items()}
+        lines = [
+            "# HELP agent_up Whether the agent's last probe succeeded",
+            "# TYPE agent_up gauge",
+        ]
+        lines += [f'agent_up{{agent="{_label(n)}"}} {int(r.healthy)}' for n, r in results.items()]
+        lines += [
+            "# HELP agent_probe_latency_seconds Duration of the agent's last probe",
+            "# TYPE agent_probe_latency_seconds gauge",
+        ]
+        lines += [f'agent_probe_latency_seconds{{agent="{_label(n)}"}} {r.latency_ms / 1000:.6f}'
+                  for n, r in results.items()]
+        lines += [
+            "# HELP agent_probes_total Probes run, by result",
+            "# TYPE agent_probes_total counter",
+        ]
+        lines += [f'agent_probes_total{{agent="{_label(n)}",result="{status}"}} {count}'
+                  for n, by_status in counts.items() for status, count in by_status.items()]
+        lines += [
+            "# HELP agent_health_last_check_timestamp_seconds Time of the last probe round",
+            "# TYPE agent_health_last_check_timestamp_seconds gauge",
+            f"agent_health_last_check_timestamp_seconds {self._checked_at:.3f}",
+        ]
+        return "\n".join(lines) + "\n"
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _overall(results: Dict[str, ProbeResult]) -> str:
+    healthy = sum(1 for result in results.values() if result.healthy)
+    if healthy == len(results):
+        return HEALTHY
+    return "degraded" if healthy else UNHEALTHY
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"')
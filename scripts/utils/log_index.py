@@ -0,0 +1,425 @@
+"""
+Microsoft Copilot Agent Team - Log Index
+
+Fast queries over large JSON-lines logs (as written by ``utils.log_writer``):
+
+- the log file is memory-mapped and scanned once; each line becomes a row
+  in column arrays (offset, length, timestamp, level, error code, agent,
+  latency)
+- posting lists map each error code, agent and correlation id to its rows,
+  so a query only touches matching rows; time ranges are binary searches
+  over the timestamp column
+- the index is saved next to the log as a hidden ``.<log>.idx``, outside the
+  ``<log>.*`` pattern of rotated backups, and updated
+  incrementally: later runs only scan bytes appended since the last one, and
+  a rotated or truncated file is re-indexed from scratch
+- latency and error histograms are computed from the columns without
+  re-reading the log
+
+Fields are taken from the usual places: ``error_code`` / ``error.code``
+(``ToolErrorCode`` values), ``agent`` / ``agent_id``, ``correlation_id`` /
+``trace_id`` / ``request_id``, and ``duration_ms`` / ``latency_ms`` /
+``execution_time_ms`` (also inside ``metadata``).
+
+Usage:
+    from utils.log_index import LogIndex
+
+    index = LogIndex("logs/agent-team.log")
+    index.update()
+    events = index.query(code="NETWORK_TIMEOUT", agent="m365_agent", since=time.time() - 3600)
+"""
+
+import bisect
+import json
+import math
+import mmap
+import os
+import statistics
+import struct
+from array import array
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from utils.tools import ToolErrorCode
+
+INDEX_MAGIC = b"CLIX"
+INDEX_VERSION = 1
+FINGERPRINT_BYTES = 256
+LEVELS = ("", "DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL", "AUDIT")
+LEVEL_CODES = {name: code for code, name in enumerate(LEVELS)}
+KNOWN_ERROR_CODES = frozenset(code.value for code in ToolErrorCode)
+LATENCY_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+_COLUMNS = (("offsets", "Q"), ("lengths", "I"), ("timestamps", "d"), ("levels", "B"),
+            ("codes", "H"), ("agents", "H"), ("durations", "f"))
+
+
+def _timestamp(value: Any) -> float:
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return math.nan
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        return parsed.timestamp()
+    return math.nan
+
+
+def _error_code(record: Dict[str, Any]) -> Optional[str]:
+    code = record.get("error_code")
+    if code is None:
+        error = record.get("error")
+        if isinstance(error, dict):
+            code = error.get("code")
+    return code if isinstance(code, str) else None
+
+
+def _duration(record: Dict[str, Any]) -> float:
+    for source in (record, record.get("metadata")):
+        if isinstance(source, dict):
+            for key in ("duration_ms", "latency_ms", "execution_time_ms"):
+                value = source.get(key)
+                if isinstance(value, (int, float)):
+                    return float(value)
+    return math.nan
+
+
+class _Interner:
+    """String table: value <-> small integer (0 is reserved for "none")"""
+
+    def __init__(self, values: Sequence[str] = ()):
+        self.values: List[Optional[str]] = [None, *values]
+        self.codes: Dict[Optional[str], int] = {value: code for code, value in enumerate(self.values)}
+
+    def code(self, value: Optional[str]) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+class LogIndex:
+    """
+    Incremental column index over one JSON-lines log file.
+
+    Args:
+        log_path: Log file to index
+        index_path: Where the index is stored (default: ``.<log name>.idx`` next to the log)
+    """
+
+    def __init__(self, log_path: str, index_path: Optional[str] = None):
+        self.log_path = Path(log_path)
+        self.index_path = (Path(index_path) if index_path
+                           else self.log_path.with_name(f".{self.log_path.name}.idx"))
+        self._reset()
+        self._load()
+
+    def _reset(self) -> None:
+        for name, typecode in _COLUMNS:
+            setattr(self, name, array(typecode))
+        self.indexed_bytes = 0
+        self.fingerprint = b""
+        self.sorted = True
+        self.skipped = 0
+        self._codes = _Interner()
+        self._agents = _Interner()
+        self._by_code: Dict[int, array] = {}
+        self._by_agent: Dict[int, array] = {}
+        self._by_correlation: Dict[str, array] = {}
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    # Building
+
+    def update(self, save: bool = True) -> int:
+        """Index lines appended since the last update; returns the number of new rows"""
+        if not self.log_path.exists():
+            return 0
+        with open(self.log_path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size  # mmap fails on an empty file
+            head = f.read(FINGERPRINT_BYTES)
+            if size < self.indexed_bytes or not head.startswith(self.fingerprint[:len(head)]):
+                self._reset()  # rotated or truncated
+            if len(self.fingerprint) < FINGERPRINT_BYTES:
+                self.fingerprint = head
+            if size == self.indexed_bytes or size == 0:
+                return 0
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                added = self._scan(mm, self.indexed_bytes, size)
+        if save:
+            self.save()
+        return added
+
+    def _scan(self, mm: mmap.mmap, start: int, end: int) -> int:
+        offsets, lengths, timestamps = self.offsets, self.lengths, self.timestamps
+        levels, codes, agents, durations = self.levels, self.codes, self.agents, self.durations
+        last_ts = timestamps[-1] if timestamps else -math.inf
+        added = 0
+        position = start
+        while position < end:
+            newline = mm.find(b"\n", position, end)
+            if newline < 0:
+                break  # partial last line: picked up by the next update
+            line = mm[position:newline]
+            line_start, position = position, newline + 1
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                self.skipped += 1
+                continue
+            if not isinstance(record, dict):
+                self.skipped += 1
+                continue
+
+            row = len(offsets)
+            ts = _timestamp(record.get("ts", record.get("timestamp")))
+            if ts != ts or ts < last_ts:  # NaN rows break binary searches too
+                self.sorted = False
+            else:
+                last_ts = ts
+            code = self._codes.code(_error_code(record))
+            agent = self._agents.code(record.get("agent") or record.get("agent_id"))
+            offsets.append(line_start)
+            lengths.append(len(line))
+            timestamps.append(ts)
+            levels.append(LEVEL_CODES.get(str(record.get("level", "")).upper(), 0))
+            codes.append(code)
+            agents.append(agent)
+            durations.append(_duration(record))
+            if code:
+                self._by_code.setdefault(code, array("I")).append(row)
+            if agent:
+                self._by_agent.setdefault(agent, array("I")).append(row)
+            correlation = record.get("correlation_id") or record.get("trace_id") or record.get("request_id")
+            if correlation:
+                self._by_correlation.setdefault(str(correlation), array("I")).append(row)
+            added += 1
+        self.indexed_bytes = position
+        return added
+
+    # Persistence
+
+    def save(self) -> None:
+        """Write the index atomically next to the log"""
+        postings = []
+        blobs = []
+        for kind, table in (("code", self._by_code), ("agent", self._by_agent), ("correlation", self._by_correlation)):
+            for key, rows in table.items():
+                postings.append([kind, key, len(rows)])
+                blobs.append(rows.tobytes())
+        header = json.dumps({
+            "version": INDEX_VERSION,
+            "rows": len(self),
+            "indexed_bytes": self.indexed_bytes,
+            "fingerprint": self.fingerprint.hex(),
+            "sorted": self.sorted,
+            "skipped": self.skipped,
+            "codes": self._codes.values[1:],
+            "agents": self._agents.values[1:],
+            "postings": postings,
+        }).encode("utf-8")
+        tmp = self.index_path.with_name(self.index_path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            f.write(INDEX_MAGIC + struct.pack("<I", len(header)) + header)
+            for name, _ in _COLUMNS:
+                f.write(getattr(self, name).tobytes())
+            for blob in blobs:
+                f.write(blob)
+        os.replace(tmp, self.index_path)
+
+    def _load(self) -> None:
+        if not self.index_path.exists():
+            return
+        try:
+            data = self.index_path.read_bytes()
+            if data[:4] != INDEX_MAGIC:
+                return
+            header_length = struct.unpack_from("<I", data, 4)[0]
+            header = json.loads(data[8:8 + header_length])
+            if header["version"] != INDEX_VERSION:
+                return
+            position = 8 + header_length
+            rows = header["rows"]
+            for name, typecode in _COLUMNS:
+                column = array(typecode)
+                size = rows * column.itemsize
+                column.frombytes(data[position:position + size])
+                setattr(self, name, column)
+                position += size
+            self._codes = _Interner(header["codes"])
+            self._agents = _Interner(header["agents"])
+            for kind, key, count in header["postings"]:
+                rows_array = array("I")
+                size = count * rows_array.itemsize
+                rows_array.frombytes(data[position:position + size])
+                position += size
+                if kind == "code":
+                    self._by_code[key] = rows_array
+                elif kind == "agent":
+                    self._by_agent[key] = rows_array
+                else:
+                    self._by_correlation[key] = rows_array
+            self.indexed_bytes = header["indexed_bytes"]
+            self.fingerprint = bytes.fromhex(header["fingerprint"])
+            self.sorted = header["sorted"]
+            self.skipped = header["skipped"]
+        except (OSError, ValueError, KeyError, struct.error):
+            self._reset()  # unreadable index: rebuild on the next update
+
+    # Queries
+
+    def rows(
+        self,
+        code: Optional[str] = None,
+        agent: Optional[str] = None,
+        correlation_id: Optional[str] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        min_level: Optional[str] = None,
+    ) -> Iterator[int]:
+        """Row numbers matching every given filter, in log order"""
+        code_id = agent_id = None
+        postings: List[Sequence[int]] = []
+        if code is not None:
+            code_id = self._codes.codes.get(code, -1)
+            postings.append(self._by_code.get(code_id, ()))
+        if agent is not None:
+            agent_id = self._agents.codes.get(agent, -1)
+            postings.append(self._by_agent.get(agent_id, ()))
+        correlated = None
+        if correlation_id is not None:
+            correlated = self._by_correlation.get(correlation_id, ())
+            postings.append(correlated)
+
+        timed = since is not None or until is not None
+        low, high = 0, len(self)
+        if self.sorted and timed:
+            if since is not None:
+                low = bisect.bisect_left(self.timestamps, since)
+            if until is not None:
+                high = bisect.bisect_right(self.timestamps, until)
+            timed = False
+
+        # Walk the shortest posting list (or the time range) and check the
+        # remaining filters against the columns
+        if postings:
+            base = min(postings, key=len)
+            correlated = set(correlated) if correlated is not None and correlated is not base else None
+            base = base[bisect.bisect_left(base, low):bisect.bisect_left(base, high)]
+        else:
+            base = range(low, high)
+        level = LEVEL_CODES.get(min_level.upper(), 0) if min_level else 0
+        codes, agents, levels, timestamps = self.codes, self.agents, self.levels, self.timestamps
+        for row in base:
+            if code_id is not None and codes[row] != code_id:
+                continue
+            if agent_id is not None and agents[row] != agent_id:
+                continue
+            if correlated is not None and row not in correlated:
+                continue
+            if level and levels[row] < level:
+                continue
+            if timed:
+                ts = timestamps[row]
+                if (since is not None and not ts >= since) or (until is not None and not ts <= until):
+                    continue
+            yield row
+
+    def read(self, rows: Iterable[int]) -> Iterator[Dict[str, Any]]:
+        """Parse the log lines of the given rows (via one memory map)"""
+        with open(self.log_path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return  # truncated since indexing; mmap fails on an empty file
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                for row in rows:
+                    offset = self.offsets[row]
+                    yield json.loads(mm[offset:offset + self.lengths[row]])
+
+    def query(self, limit: Optional[int] = None, **filters) -> List[Dict[str, Any]]:
+        """Matching log records (see ``rows`` for filters), oldest first"""
+        rows = self.rows(**filters)
+        if limit is not None:
+            rows = list(rows)[-limit:]
+        return list(self.read(rows))
+
+    def count(self, **filters) -> int:
+        return sum(1 for _ in self.rows(**filters))
+
+    # Aggregations
+
+    def latency_histogram(self, group_by: Optional[str] = "agent", buckets: Sequence[float] = LATENCY_BUCKETS_MS,
+                          **filters) -> Dict[str, Dict[str, Any]]:
+        """Latency bucket counts and percentiles per agent / error code (or overall)"""
+        groups: Dict[str, List[float]] = {}
+        for row in self.rows(**filters):
+            duration = self.durations[row]
+            if duration != duration:  # NaN: no latency on this line
+                continue
+            groups.setdefault(self._group_key(row, group_by), []).append(duration)
+
+        result = {}
+        for key, values in sorted(groups.items()):
+            counts = [0] * (len(buckets) + 1)
+            for value in values:
+                counts[bisect.bisect_left(buckets, value)] += 1
+            values.sort()
+            labels = [f"<={bound:g}" for bound in buckets] + [f">{buckets[-1]:g}"]
+            result[key] = {
+                "count": len(values),
+                "p50_ms": round(statistics.median(values), 2),
+                "p95_ms": round(values[min(len(values) - 1, int(len(values) * 0.95))], 2),
+                "max_ms": round(values[-1], 2),
+                "buckets": dict(zip(labels, counts)),
+            }
+        return result
+
+    def error_histogram(self, interval_seconds: float = 3600, **filters) -> Dict[str, Dict[str, int]]:
+        """Error counts per time bucket (ISO start time) and error code"""
+        result: Dict[str, Dict[str, int]] = {}
+        for row in self.rows(**filters):
+            code = self._codes.values[self.codes[row]]
+            ts = self.timestamps[row]
+            if code is None or ts != ts:
+                continue
+            start = datetime.fromtimestamp(ts - ts % interval_seconds, timezone.utc).isoformat()
+            bucket = result.setdefault(start, {})
+            bucket[code] = bucket.get(code, 0) + 1
+        return dict(sorted(result.items()))
+
+    def _group_key(self, row: int, group_by: Optional[str]) -> str:
+        if group_by == "agent":
+            return self._agents.values[self.agents[row]] or "(none)"
+        if group_by == "code":
+            return self._codes.values[self.codes[row]] or "(none)"
+        return "all"
+
+    def summary(self) -> Dict[str, Any]:
+        """Row count, time span and per-code / per-agent counts"""
+        valid = [ts for ts in (self.timestamps[0], self.timestamps[-1]) if ts == ts] if len(self) else []
+        return {
+            "rows": len(self),
+            "indexed_bytes": self.indexed_bytes,
+            "skipped_lines": self.skipped,
+            "first": datetime.fromtimestamp(min(valid), timezone.utc).isoformat() if valid else None,
+            "last": datetime.fromtimestamp(max(valid), timezone.utc).isoformat() if valid else None,
+            "error_codes": {
+                self._codes.values[code]: len(rows)
+                for code, rows in sorted(self._by_code.items(), key=lambda item: -len(item[1]))
+            },
+            "unknown_error_codes": sorted(
+                code for code in self._codes.values[1:] if code not in KNOWN_ERROR_CODES
+            ),
+            "agents": {
+                self._agents.values[agent]: len(rows)
+                for agent, rows in sorted(self._by_agent.items(), key=lambda item: -len(item[1]))
+            },
+            "correlation_ids": len(self._by_correlation),
+        }
@@ -0,0 +1,343 @@
+"""
+Microsoft Copilot Agent Team - Structured Log Writer
+
+Application and audit logging that stays off the request path:
+
+- ``log()`` only builds a small dict and appends it to an in-memory ring
+  buffer (a ``deque``, whose appends are atomic, so producers take no lock)
+- a background thread serializes events to JSON lines and writes them in
+  batches, rotating the file by size and/or age and optionally gzipping
+  rotated files
+- under backpressure DEBUG events are sampled and then dropped, INFO events
+  are dropped when the buffer is full, and WARNING+ and audit events may
+  overfill the buffer up to ``OVERFLOW_FACTOR`` times its capacity before
+  they are dropped too; every drop is counted
+- events carry the current trace id (``utils.tracing``) when there is one
+
+Configured from LOG_FILE and LOG_LEVEL. ``configure_logging()`` also routes
+the standard ``logging`` module through the writer. Either way, buffered
+events are written at interpreter exit.
+
+Usage:
+    from utils.log_writer import audit, configure_logging, get_log_writer
+
+    configure_logging()
+    log = get_log_writer()
+    log.info("tool.invoke", tool="calendar.create_event", duration_ms=42)
+    audit("agent.deploy", user_id=user, agent_id="microsoft-troubleshooter")
+"""
+
+import atexit
+import gzip
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from utils.tracing import get_tracer
+
+DEFAULT_LOG_FILE = "logs/agent-team.log"
+DEFAULT_CAPACITY = 65536
+DEFAULT_BATCH_SIZE = 1024
+DEFAULT_FLUSH_INTERVAL = 0.5
+DEFAULT_MAX_BYTES = 50 * 1024 * 1024
+DEFAULT_BACKUP_COUNT = 10
+
+# Fill level above which DEBUG events are sampled (1 in DEBUG_SAMPLE_RATE kept)
+SAMPLE_WATERMARK = 0.5
+DEBUG_SAMPLE_RATE = 10
+# Audit and WARNING+ events may overfill the buffer up to this factor
+OVERFLOW_FACTOR = 2
+
+LEVELS = {"DEBUG": logging.DEBUG, "INFO": logging.INFO, "WARNING": logging.WARNING,
+          "ERROR": logging.ERROR, "CRITICAL": logging.CRITICAL}
+LEVEL_NAMES = {value: name for name, value in LEVELS.items()}
+AUDIT = "AUDIT"
+
+
+class LogWriter:
+    """
+    Buffered JSON-lines writer with a background flush thread.
+
+    Args:
+        path: Log file path
+        level: Minimum level name or number
+        capacity: Events buffered before backpressure applies
+        batch_size: Events written per batch
+        flush_interval: Seconds between flushes when the buffer is not filling up
+        max_bytes: Rotate when the file exceeds this size (0 disables)
+        rotate_seconds: Rotate when the file is older than this (None disables)
+        backup_count: Rotated files kept
+        compress: Gzip rotated files
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_LOG_FILE,
+        level: Any = "INFO",
+        capacity: int = DEFAULT_CAPACITY,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        rotate_seconds: Optional[float] = None,
+        backup_count: int = DEFAULT_BACKUP_COUNT,
+        compress: bool = False,
+    ):
+        self.path = Path(path)
+        self.level = LEVELS.get(str(level).upper(), logging.INFO) if isinstance(level, str) else level
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.rotate_seconds = rotate_seconds
+        self.backup_count = backup_count
+        self.compress = compress
+        self._buffer: deque = deque()
+        self._sample_counter = 0
+        self._counters = {"written": 0, "dropped": 0, "sampled_out": 0, "rotations": 0, "write_errors": 0}
+        self._counters_lock = threading.Lock()
+        self._draining = False
+        self._wake = threading.Event()
+        self._flushed = threading.Condition()
+        self._stopping = False
+        self._file = None
+        self._file_bytes = 0
+        self._opened_at = 0.0
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    # Producer side (request path)
+
+    def log(self, level: int, event: str, **fields) -> bool:
+        """Enqueue one event; returns False when it was filtered or dropped"""
+        if level < self.level:
+            return False
+        depth = len(self._buffer)
+        if level < logging.WARNING:
+            if depth >= self.capacity:
+                self._count("dropped")
+                return False
+            if level <= logging.DEBUG and depth >= self.capacity * SAMPLE_WATERMARK:
+                self._sample_counter += 1
+                if self._sample_counter % DEBUG_SAMPLE_RATE:
+                    self._count("sampled_out")
+                    return False
+        elif depth >= self.capacity * OVERFLOW_FACTOR:
+            self._count("dropped")
+            return False
+        return self._enqueue(level, event, fields, depth)
+
+    def _count(self, counter: str, amount: int = 1) -> None:
+        with self._counters_lock:
+            self._counters[counter] += amount
+
+    def _enqueue(self, level: Any, event: str, fields: Dict[str, Any], depth: int) -> bool:
+        fields["ts"] = time.time()
+        fields["level"] = level
+        fields["event"] = event
+        span = get_tracer().current_span()
+        if span is not None and "trace_id" not in fields:
+            fields["trace_id"] = span.trace_id
+        self._buffer.append(fields)
+        if depth + 1 >= self.batch_size:
+            self._wake.set()
+        return True
+
+    def debug(self, event: str, **fields) -> bool:
+        return self.log(logging.DEBUG, event, **fields)
+
+    def info(self, event: str, **fields) -> bool:
+        return self.log(logging.INFO, event, **fields)
+
+    def warning(self, event: str, **fields) -> bool:
+        return self.log(logging.WARNING, event, **fields)
+
+    def error(self, event: str, **fields) -> bool:
+        return self.log(logging.ERROR, event, **fields)
+
+    def audit(self, event: str, **fields) -> bool:
+        """Record an audit event (never filtered by level or sampled)"""
+        depth = len(self._buffer)
+        if depth >= self.capacity * OVERFLOW_FACTOR:
+            self._count("dropped")
+            return False
+        return self._enqueue(AUDIT, event, fields, depth)
+
+    # Writer thread
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self._drain()
+            with self._flushed:
+                self._flushed.notify_all()
+            if self._stopping and not self._buffer:
+                break
+        self._close_file()
+
+    def _drain(self) -> None:
+        # Batches popped from the buffer still count as pending for flush()
+        self._draining = True
+        try:
+            self._drain_batches()
+        finally:
+            self._draining = False
+
+    def _drain_batches(self) -> None:
+        while self._buffer:
+            batch: List[Dict[str, Any]] = []
+            popleft = self._buffer.popleft
+            try:
+                for _ in range(self.batch_size):
+                    batch.append(popleft())
+            except IndexError:
+                pass
+            self._write(batch)
+
+    def _write(self, batch: List[Dict[str, Any]]) -> None:
+        lines = []
+        for fields in batch:
+            timestamp, level = fields.pop("ts"), fields.pop("level")
+            record = {
+                "ts": datetime.fromtimestamp(timestamp, timezone.utc).isoformat(timespec="microseconds"),
+                "level": LEVEL_NAMES.get(level, level),
+                "event": fields.pop("event"),
+            }
+            record.update(fields)
+            lines.append(json.dumps(record, default=str, ensure_ascii=False))
+        data = ("\n".join(lines) + "\n").encode("utf-8")
+        try:
+            self._maybe_rotate(len(data))
+            self._file.write(data)
+            self._file.flush()
+            self._file_bytes += len(data)
+            self._count("written", len(batch))
+        except OSError:
+            self._count("write_errors")
+            self._count("dropped", len(batch))
+
+    def _open_file(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "ab")
+        self._file_bytes = self._file.tell()
+        self._opened_at = time.time()
+
+    def _close_file(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _maybe_rotate(self, incoming: int) -> None:
+        if self._file is None:
+            self._open_file()
+        too_big = self.max_bytes and self._file_bytes and self._file_bytes + incoming > self.max_bytes
+        too_old = self.rotate_seconds and time.time() - self._opened_at >= self.rotate_seconds
+        if not (too_big or too_old):
+            return
+        self._close_file()
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+        rotated = self.path.with_name(f"{self.path.name}.{stamp}")
+        os.replace(self.path, rotated)
+        if self.compress:
+            with open(rotated, "rb") as src, gzip.open(f"{rotated}.gz", "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            rotated.unlink()
+        self._count("rotations")
+        self._prune_backups()
+        self._open_file()
+
+    def _prune_backups(self) -> None:
+        backups = sorted(self.path.parent.glob(f"{self.path.name}.*"))
+        for old in backups[:-self.backup_count] if self.backup_count else backups:
+            old.unlink(missing_ok=True)
+
+    # Control
+
+    def flush(self, timeout: float = 5.0) -> None:
+        """Block until everything enqueued so far has been written"""
+        deadline = time.monotonic() + timeout
+        with self._flushed:
+            while (self._buffer or self._draining) and self._thread.is_alive():
+                self._wake.set()
+                if not self._flushed.wait(max(0.0, deadline - time.monotonic())):
+                    break
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Write remaining events and stop the writer thread"""
+        self._stopping = True
+        self._wake.set()
+        self._thread.join(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._counters_lock:
+            counters = dict(self._counters)
+        return dict(counters, buffered=len(self._buffer), capacity=self.capacity)
+
+
+class JsonLogHandler(logging.Handler):
+    """Routes standard ``logging`` records into a :class:`LogWriter`"""
+
+    def __init__(self, writer: LogWriter):
+        super().__init__()
+        self.writer = writer
+
+    def emit(self, record: logging.LogRecord) -> None:
+        fields = {"logger": record.name, "message": record.getMessage()}
+        if record.exc_info:
+            fields["exception"] = self.formatException(record.exc_info)
+        self.writer.log(record.levelno, "log", **fields)
+
+
+_writer: Optional[LogWriter] = None
+_writer_lock = threading.Lock()
+
+
+def get_log_writer() -> LogWriter:
+    """Process-wide writer, created from LOG_FILE / LOG_LEVEL on first use and closed at exit"""
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = LogWriter(
+                    os.getenv("LOG_FILE", DEFAULT_LOG_FILE),
+                    level=os.getenv("LOG_LEVEL", "INFO"),
+                    compress=os.getenv("LOG_COMPRESS", "").lower() in ("1", "true", "yes"),
+                )
+                atexit.register(_writer.close)
+    return _writer
+
+
+def configure_logging(log_file: Optional[str] = None, level: Optional[str] = None, **options) -> LogWriter:
+    """
+    Create the process-wide writer and attach it to the root logger.
+
+    Falls back to LOG_FILE / LOG_LEVEL. Buffered events are written at
+    interpreter exit.
+    """
+    global _writer
+    with _writer_lock:
+        if _writer is not None:
+            _writer.close()
+        _writer = LogWriter(
+            log_file or os.getenv("LOG_FILE", DEFAULT_LOG_FILE),
+            level=level or os.getenv("LOG_LEVEL", "INFO"),
+            **options,
+        )
+    root = logging.getLogger()
+    root.handlers = [h for h in root.handlers if not isinstance(h, JsonLogHandler)]
+    root.addHandler(JsonLogHandler(_writer))
+    root.setLevel(min(root.level or logging.WARNING, _writer.level))
+    atexit.register(_writer.close)
+    return _writer
+
+
+def audit(event: str, **fields) -> bool:
+    """Record an audit event on the process-wide writer"""
+    return get_log_writer().audit(event, **fields)
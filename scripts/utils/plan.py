@@ -0,0 +1,137 @@
+"""
+Microsoft Copilot Agent Team - Deployment Plans
+
+Diffs desired agent definitions against what a backend already has, from a
+single ``list_agents`` call, and turns the difference into create / update /
+delete / no-op actions. Applying a plan issues only the mutating calls that
+are actually needed.
+
+Usage:
+    from utils.plan import apply_plan, build_plan, format_plan
+
+    actions = build_plan(desired_definitions, backend.list_agents())
+    print(format_plan(actions))
+    apply_plan(actions, backend)
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from utils.backend import AgentBackend
+
+CREATE = "create"
+UPDATE = "update"
+DELETE = "delete"
+NOOP = "noop"
+
+ACTION_SYMBOLS = {CREATE: "+", UPDATE: "~", DELETE: "-", NOOP: "="}
+
+
+@dataclass
+class AgentAction:
+    """One planned change for an agent"""
+    action: str                                   # create, update, delete or noop
+    agent_id: str
+    definition: Optional[Dict[str, Any]] = None   # desired definition (None for delete)
+    changes: Dict[str, Tuple[Any, Any]] = field(default_factory=dict)  # field -> (deployed, desired)
+
+    @property
+    def mutating(self) -> bool:
+        return self.action != NOOP
+
+
+def diff_agent(desired: Dict[str, Any], deployed: Dict[str, Any]) -> Dict[str, Tuple[Any, Any]]:
+    """
+    Field-by-field differences between a desired and a deployed definition.
+
+    Only fields present in the desired definition are compared, so fields the
+    service adds on its own (timestamps, versions) never cause an update.
+    """
+    return {
+        key: (deployed.get(key), value)
+        for key, value in desired.items()
+        if key != "id" and deployed.get(key) != value
+    }
+
+
+def plan_agent(desired: Dict[str, Any], deployed: Optional[Dict[str, Any]]) -> AgentAction:
+    """Plan the action for one desired definition given its deployed counterpart"""
+    if deployed is None:
+        return AgentAction(CREATE, desired["id"], desired)
+    changes = diff_agent(desired, deployed)
+    return AgentAction(UPDATE if changes else NOOP, desired["id"], desired, changes)
+
+
+def build_plan(
+    desired: Iterable[Dict[str, Any]],
+    deployed: Iterable[Dict[str, Any]],
+    prune: bool = False,
+) -> List[AgentAction]:
+    """
+    Plan every action needed to make ``deployed`` match ``desired``.
+
+    Deployed agents that are not desired are only planned for deletion with
+    ``prune=True``; otherwise they are left alone.
+    """
+    deployed_by_id = {agent["id"]: agent for agent in deployed}
+    actions = []
+    desired_ids = set()
+    for definition in desired:
+        desired_ids.add(definition["id"])
+        actions.append(plan_agent(definition, deployed_by_id.get(definition["id"])))
+    if prune:
+        actions.extend(
+            AgentAction(DELETE, agent_id)
+            for agent_id in deployed_by_id
+            if agent_id not in desired_ids
+        )
+    return actions
+
+
+def apply_action(action: AgentAction, backend: AgentBackend) -> None:
+    """Issue the backend call for one action (nothing for no-ops)"""
+    if action.action == CREATE:
+        backend.create_agent(action.definition)
+    elif action.action == UPDATE:
+        backend.update_agent(action.agent_id, action.definition)
+    elif action.action == DELETE:
+        backend.delete_agent(action.agent_id)
+
+
+def apply_plan(actions: Iterable[AgentAction], backend: AgentBackend) -> int:
+    """Apply every mutating action; returns the number of backend calls issued"""
+    calls = 0
+    for action in actions:
+        if action.mutating:
+            apply_action(action, backend)
+            calls += 1
+    return calls
+
+
+def summarize_plan(actions: Iterable[AgentAction]) -> Dict[str, int]:
+    """Count actions by type"""
+    counts = {CREATE: 0, UPDATE: 0, DELETE: 0, NOOP: 0}
+    for action in actions:
+        counts[action.action] += 1
+    return counts
+
+
+def _short(value: Any, limit: int = 60) -> str:
+    text = repr(value)
+    return text if len(text) <= limit else text[:limit - 3] + "..."
+
+
+def format_plan(actions: List[AgentAction]) -> str:
+    """Render a plan as one line per agent plus changed fields"""
+    lines = []
+    for action in actions:
+        lines.append(f"  {ACTION_SYMBOLS[action.action]} {action.action:<6} {action.agent_id}")
+        for key, (old, new) in action.changes.items():
+            lines.append(f"        {key}: {_short(old)} → {_short(new)}")
+    counts = summarize_plan(actions)
+    lines.append("")
+    lines.append(
+        f"Plan: {counts[CREATE]} to create, {counts[UPDATE]} to update, "
+        f"{counts[DELETE]} to delete, {counts[NOOP]} unchanged"
+    )
+    return "\n".join(lines)
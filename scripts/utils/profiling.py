@@ -0,0 +1,175 @@
+"""
+Microsoft Copilot Agent Team - CLI Profiling Support
+
+Adds a common ``--profile`` option to every script without touching its own
+argument parsing: ``run_with_profiling(main)`` strips the profiling options
+from sys.argv, runs ``main`` under a profiler and writes the results.
+
+Options (also enabled by setting AGENT_PROFILE=1):
+    --profile                  Profile this run
+    --profile-mode MODE        deterministic (cProfile, default) or
+                               sampling (stack sampler, low overhead)
+    --profile-dir DIR          Output directory (default: logs/profiles)
+    --profile-top N            Hot spots to print (default: 25)
+    --profile-interval MS      Sampling interval in milliseconds (default: 5)
+
+Outputs:
+    <script>-<timestamp>.pstats     cProfile stats (deterministic mode), for
+                                    pstats / snakeviz
+    <script>-<timestamp>.collapsed  Collapsed stacks ("frame;frame;frame N",
+                                    sampling mode), for flamegraph.pl /
+                                    speedscope / inferno
+
+cProfile only instruments the main thread; the sampled collapsed stacks cover
+every thread, so use sampling mode for thread-pool work such as concurrent
+deploys.
+"""
+
+import argparse
+import cProfile
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Callable, List, Optional, Tuple
+
+DEFAULT_PROFILE_DIR = "logs/profiles"
+DEFAULT_TOP_N = 25
+DEFAULT_INTERVAL_MS = 5.0
+
+
+class StackSampler:
+    """
+    Samples the stacks of all other threads at a fixed interval.
+
+    Produces collapsed-stack counts suitable for flamegraph tooling. Stacks
+    are rooted at the thread name so concurrent workers stay distinguishable.
+    """
+
+    def __init__(self, interval_ms: float = DEFAULT_INTERVAL_MS):
+        self.interval = interval_ms / 1000.0
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    def start(self) -> "StackSampler":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        own_ident = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own_ident:
+                    continue
+                labels = []
+                while frame is not None:
+                    code = frame.f_code
+                    labels.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                labels.append(names.get(ident, f"thread-{ident}"))
+                self.stacks[";".join(reversed(labels))] += 1
+            self.samples += 1
+
+    def write_collapsed(self, path: Path) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+    def hot_spots(self, top_n: int) -> List[Tuple[str, int]]:
+        """Frames by inclusive sample count (each frame counted once per stack)"""
+        inclusive: Counter = Counter()
+        for stack, count in self.stacks.items():
+            for label in set(stack.split(";")[1:]):
+                inclusive[label] += count
+        return inclusive.most_common(top_n)
+
+
+def _parse_profile_options(argv: List[str]) -> Tuple[argparse.Namespace, List[str]]:
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument("--profile", action="store_true")
+    parser.add_argument("--profile-mode", choices=["deterministic", "sampling"], default="deterministic")
+    parser.add_argument("--profile-dir", default=os.getenv("AGENT_PROFILE_DIR", DEFAULT_PROFILE_DIR))
+    parser.add_argument("--profile-top", type=int, default=DEFAULT_TOP_N)
+    parser.add_argument("--profile-interval", type=float, default=DEFAULT_INTERVAL_MS)
+    options, remaining = parser.parse_known_args(argv)
+    if os.getenv("AGENT_PROFILE", "").lower() in ("1", "true", "yes"):
+        options.profile = True
+    return options, remaining
+
+
+def run_with_profiling(main: Callable[[], Any], name: Optional[str] = None) -> Any:
+    """
+    Run a script's ``main`` function, profiling it when requested.
+
+    Profiling options are removed from sys.argv before ``main`` parses its own
+    arguments. Results are written even if ``main`` exits via sys.exit().
+
+    Args:
+        main: The script's entry point
+        name: Output file prefix (defaults to the script file name)
+
+    Returns:
+        Whatever ``main`` returns
+    """
+    options, remaining = _parse_profile_options(sys.argv[1:])
+    sys.argv[1:] = remaining
+    if not options.profile:
+        return main()
+
+    name = name or Path(sys.argv[0]).stem
+    profiler, sampler = None, None
+    if options.profile_mode == "deterministic":
+        profiler = cProfile.Profile()
+    else:
+        sampler = StackSampler(options.profile_interval).start()
+    started = time.perf_counter()
+    if profiler is not None:
+        profiler.enable()
+    try:
+        return main()
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        elapsed = time.perf_counter() - started
+        if sampler is not None:
+            sampler.stop()
+        _write_report(name, options, profiler, sampler, elapsed)
+
+
+def _write_report(name: str, options: argparse.Namespace, profiler: Optional[cProfile.Profile],
+                  sampler: Optional[StackSampler], elapsed: float) -> None:
+    output_dir = Path(options.profile_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    stem = output_dir / f"{name}-{time.strftime('%Y%m%d-%H%M%S')}"
+
+    print(f"\n{'='*60}")
+    print(f"  Profile: {name} ({options.profile_mode}, {elapsed:.2f}s wall)")
+    print(f"{'='*60}\n")
+
+    if profiler is not None:
+        pstats_file = stem.with_suffix(".pstats")
+        profiler.dump_stats(str(pstats_file))
+        stats = pstats.Stats(profiler, stream=sys.stdout)
+        stats.strip_dirs().sort_stats("cumulative").print_stats(options.profile_top)
+        print(f"📄 pstats:    {pstats_file}")
+        return
+
+    collapsed_file = stem.with_suffix(".collapsed")
+    sampler.write_collapsed(collapsed_file)
+    total = max(sampler.samples, 1)
+    print(f"{'Samples':>8} {'%':>6}  Function (inclusive)")
+    for label, count in sampler.hot_spots(options.profile_top):
+        print(f"{count:>8} {count / total * 100:>5.1f}%  {label}")
+    print()
+    print(f"🔥 collapsed: {collapsed_file} ({sampler.samples} samples)")
+    print(f"   Flamegraph: flamegraph.pl {collapsed_file} > {stem.with_suffix('.svg')}")
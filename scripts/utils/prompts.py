@@ -0,0 +1,22 @@
+"""
+Microsoft Copilot Agent Team - Prompt Rendering
+
+Renders an agent's ``prompt_sections`` (create-agents.py) into the tagged
+system prompt format used in docs/agent-team-design.md.
+"""
+
+from typing import Any, Dict
+
+
+def render_section(name: str, content: Any) -> str:
+    """Render one section; lists become bullet lines."""
+    if isinstance(content, (list, tuple)):
+        body = "\n".join(f"• {item}" for item in content)
+    else:
+        body = str(content).strip()
+    return f"<{name}>\n{body}\n</{name}>"
+
+
+def render_prompt(prompt_sections: Dict[str, Any]) -> str:
+    """Render all sections in definition order, separated by blank lines."""
+    return "\n\n".join(render_section(name, content) for name, content in prompt_sections.items())
@@ -0,0 +1,395 @@
+"""
+Microsoft Copilot Agent Team - Python Execution Pool
+
+Local execution service for the "Python Execution" toolkit:
+
+- a pool of worker processes is started once and kept warm, with common
+  modules imported up front (workers are forked after the imports where the
+  platform allows, so they share those pages copy-on-write); replacements
+  started later, while other threads are running, come from a forkserver
+  preloaded with the same modules (or spawn), never from fork
+- each run executes in a fresh namespace inside a worker, with captured
+  stdout/stderr, an output cap and a per-run timeout; a worker that times out
+  or dies is killed and replaced
+- workers run under resource limits (address space, CPU seconds per run,
+  open files) in their own scratch directory with a minimal environment, and
+  are recycled after ``max_runs_per_worker`` runs
+- callers queue for an idle worker; beyond ``max_queue`` waiting callers new
+  runs are rejected instead of piling up
+
+Process isolation and resource limits contain runaway snippets; they are not
+a security boundary for hostile code.
+
+Usage:
+    from utils.python_exec import get_execution_pool
+
+    pool = get_execution_pool()
+    result = pool.run("import statistics\\nprint(statistics.mean([1, 2, 3]))")
+    print(result["stdout"])
+"""
+
+import asyncio
+import contextlib
+import io
+import multiprocessing
+import os
+import queue
+import shutil
+import tempfile
+import threading
+import time
+import traceback
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional
+
+from utils.tools import ITool, ToolError, ToolErrorCode, ToolMetadata, ToolType
+from utils.tool_registry import registry
+
+try:
+    import resource
+except ImportError:  # Windows: no rlimits
+    resource = None
+
+DEFAULT_PRELOAD = ("json", "re", "math", "statistics", "datetime", "collections",
+                   "itertools", "functools", "csv", "decimal", "random", "textwrap")
+DEFAULT_TIMEOUT = 10.0
+DEFAULT_MAX_RUNS = 100
+DEFAULT_MEMORY_LIMIT_MB = 512
+DEFAULT_MAX_OUTPUT_BYTES = 1024 * 1024
+DEFAULT_MAX_QUEUE = 256
+SAFE_ENV_KEYS = ("PATH", "LANG", "LC_ALL", "TZ", "PYTHONIOENCODING")
+_SAFE_ENV = {key: os.environ[key] for key in SAFE_ENV_KEYS if key in os.environ}
+
+
+class PoolBusyError(RuntimeError):
+    """Raised when too many runs are already waiting for a worker"""
+
+    code = ToolErrorCode.PLATFORM_RATE_LIMIT_EXCEEDED
+
+
+def _apply_limits(memory_limit_mb: Optional[int]) -> None:
+    if resource is None:
+        return
+    if memory_limit_mb:
+        limit = memory_limit_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (min(256, hard) if hard > 0 else 256, hard))
+
+
+def _limit_cpu(seconds: float) -> None:
+    """Allow ``seconds`` more CPU time from now (the rlimit is cumulative per process)"""
+    if resource is None:
+        return
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    allowed = int(usage.ru_utime + usage.ru_stime + seconds) + 1
+    hard = resource.getrlimit(resource.RLIMIT_CPU)[1]
+    resource.setrlimit(resource.RLIMIT_CPU, (allowed if hard < 0 else min(allowed, hard), hard))
+
+
+def _truncate(text: str, limit: int) -> str:
+    if len(text) <= limit:
+        return text
+    return text[:limit] + f"\n... [truncated {len(text) - limit} characters]"
+
+
+def _worker_main(conn, preload: Iterable[str], memory_limit_mb: Optional[int],
+                 max_output_bytes: int, scratch_dir: str) -> None:
+    """Worker loop: receive (code, timeout), execute, send back the result"""
+    for module in preload:
+        try:
+            __import__(module)
+        except ImportError:
+            pass
+    os.environ.clear()
+    os.environ.update(_SAFE_ENV)
+    os.chdir(scratch_dir)
+    _apply_limits(memory_limit_mb)
+
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            return
+        if message is None:
+            return
+        code, timeout = message
+        _limit_cpu(timeout)
+        stdout, stderr = io.StringIO(), io.StringIO()
+        namespace = {"__name__": "__main__", "__builtins__": __builtins__}
+        started = time.perf_counter()
+        error = None
+        try:
+            with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+                exec(compile(code, "<snippet>", "exec"), namespace)
+        except SystemExit as e:
+            if e.code not in (None, 0):
+                error = {"type": "SystemExit", "message": str(e.code)}
+        except BaseException as e:
+            error = {"type": type(e).__name__, "message": str(e),
+                     "traceback": _truncate(traceback.format_exc(), max_output_bytes)}
+        conn.send({
+            "success": error is None,
+            "stdout": _truncate(stdout.getvalue(), max_output_bytes),
+            "stderr": _truncate(stderr.getvalue(), max_output_bytes),
+            "error": error,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 3),
+        })
+
+
+class _Worker:
+    __slots__ = ("process", "conn", "runs", "scratch_dir")
+
+    def __init__(self, process, conn, scratch_dir: str):
+        self.process = process
+        self.conn = conn
+        self.runs = 0
+        self.scratch_dir = scratch_dir
+
+
+class PythonExecutionPool:
+    """
+    Pool of warm Python worker processes.
+
+    Args:
+        workers: Worker processes (default: CPU count)
+        preload: Modules imported in every worker before it takes work
+        timeout: Default per-run wall-clock timeout in seconds
+        max_runs_per_worker: Runs after which a worker is replaced
+        memory_limit_mb: Address-space limit per worker (None disables)
+        max_output_bytes: Captured stdout/stderr kept per run
+        max_queue: Callers allowed to wait for a worker before runs are rejected
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        preload: Iterable[str] = DEFAULT_PRELOAD,
+        timeout: float = DEFAULT_TIMEOUT,
+        max_runs_per_worker: int = DEFAULT_MAX_RUNS,
+        memory_limit_mb: Optional[int] = DEFAULT_MEMORY_LIMIT_MB,
+        max_output_bytes: int = DEFAULT_MAX_OUTPUT_BYTES,
+        max_queue: int = DEFAULT_MAX_QUEUE,
+    ):
+        self.size = workers or os.cpu_count() or 2
+        self.preload = tuple(preload)
+        self.timeout = timeout
+        self.max_runs_per_worker = max_runs_per_worker
+        self.memory_limit_mb = memory_limit_mb
+        self.max_output_bytes = max_output_bytes
+        self.max_queue = max_queue
+        for module in self.preload:  # imported before forking so workers inherit them
+            try:
+                __import__(module)
+            except ImportError:
+                pass
+        methods = multiprocessing.get_all_start_methods()
+        self._context = multiprocessing.get_context("fork" if "fork" in methods else "spawn")
+        if "forkserver" in methods:
+            self._replacement_context = multiprocessing.get_context("forkserver")
+            self._replacement_context.set_forkserver_preload(list(self.preload))
+        else:
+            self._replacement_context = multiprocessing.get_context("spawn")
+        self._idle: "queue.Queue[_Worker]" = queue.Queue()
+        self._waiting = 0
+        self._lock = threading.Lock()
+        self._closed = False
+        self._stats = {"runs": 0, "failures": 0, "timeouts": 0, "crashes": 0, "recycled": 0, "rejected": 0}
+        for _ in range(self.size):
+            self._idle.put(self._spawn())
+
+    def _spawn(self, context=None) -> _Worker:
+        context = context or self._context
+        scratch_dir = tempfile.mkdtemp(prefix="pyexec-")
+        parent_conn, child_conn = context.Pipe()
+        process = context.Process(
+            target=_worker_main,
+            args=(child_conn, self.preload, self.memory_limit_mb, self.max_output_bytes, scratch_dir),
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+        return _Worker(process, parent_conn, scratch_dir)
+
+    def _retire(self, worker: _Worker, kill: bool = False) -> None:
+        if kill:
+            worker.process.kill()
+        else:
+            try:
+                worker.conn.send(None)
+            except OSError:
+                pass
+        worker.process.join(1)
+        if worker.process.is_alive():
+            worker.process.kill()
+            worker.process.join()
+        worker.conn.close()
+        shutil.rmtree(worker.scratch_dir, ignore_errors=True)
+
+    def run(self, code: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Execute ``code`` in a warm worker and return stdout, stderr, error and timings
+
+        Raises:
+            PoolBusyError: ``max_queue`` callers are already waiting
+        """
+        if self._closed:
+            raise RuntimeError("Execution pool is closed")
+        timeout = self.timeout if timeout is None else timeout
+        queued_at = time.perf_counter()
+        with self._lock:
+            if self._idle.empty() and self._waiting >= self.max_queue:
+                self._stats["rejected"] += 1
+                raise PoolBusyError(f"{self._waiting} runs already waiting for a worker")
+            self._waiting += 1
+        try:
+            worker = self._idle.get()
+        finally:
+            with self._lock:
+                self._waiting -= 1
+        queue_ms = round((time.perf_counter() - queued_at) * 1000, 3)
+
+        replace = False
+        try:
+            worker.conn.send((code, timeout))
+            if worker.conn.poll(timeout):
+                result = worker.conn.recv()
+            else:
+                replace = True
+                self._count("timeouts")
+                result = self._failure("TimeoutError", f"Execution exceeded {timeout:g}s")
+        except (EOFError, OSError):
+            replace = True
+            self._count("crashes")
+            exit_code = worker.process.exitcode
+            result = self._failure("WorkerCrashed", f"Worker exited unexpectedly (exit code {exit_code}); "
+                                                    "the snippet may have exceeded its memory or CPU limit")
+        worker.runs += 1
+        self._count("runs")
+        if not result["success"]:
+            self._count("failures")
+
+        if replace or worker.runs >= self.max_runs_per_worker:
+            if not replace:
+                self._count("recycled")
+            self._retire(worker, kill=replace)
+            worker = None if self._closed else self._spawn(self._replacement_context)
+        if worker is not None:
+            self._idle.put(worker)
+
+        result["queue_ms"] = queue_ms
+        return result
+
+    async def run_async(self, code: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """``run`` without blocking the event loop"""
+        return await asyncio.get_running_loop().run_in_executor(None, self.run, code, timeout)
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._stats[name] += 1
+
+    @staticmethod
+    def _failure(error_type: str, message: str) -> Dict[str, Any]:
+        return {"success": False, "stdout": "", "stderr": "", "duration_ms": None,
+                "error": {"type": error_type, "message": message}}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._stats, workers=self.size, idle=self._idle.qsize(), waiting=self._waiting)
+
+    def close(self) -> None:
+        """Stop all idle workers (busy ones are stopped when their run returns)"""
+        self._closed = True
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._retire(worker)
+
+
+_pool: Optional[PythonExecutionPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_execution_pool() -> PythonExecutionPool:
+    """Process-wide pool, started on first use and sized by PYTHON_EXEC_WORKERS"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                import atexit
+
+                workers = int(os.getenv("PYTHON_EXEC_WORKERS") or 0) or None
+                _pool = PythonExecutionPool(workers=workers)
+                atexit.register(_pool.close)
+    return _pool
+
+
+@registry.register
+class PythonExecuteTool(ITool):
+    """``code.execute_python`` backed by the warm execution pool"""
+
+    metadata = ToolMetadata(
+        name="code.execute_python",
+        category="code",
+        description="Execute a Python snippet in a sandboxed worker and return its output",
+        tool_type=ToolType.SELF_BUILT,
+        platform="universal",
+        version="1.0.0",
+        parameters={
+            "type": "object",
+            "properties": {
+                "code": {"type": "string", "description": "Python source to execute"},
+                "timeout_seconds": {"type": "number", "minimum": 0.1, "maximum": 300},
+            },
+            "required": ["code"],
+        },
+        authentication_required=False,
+    )
+
+    def configure_platform(self, platform: str) -> None:
+        self.platform = platform
+
+    async def validate_parameters(self, parameters: Dict[str, Any]):
+        if not isinstance(parameters.get("code"), str):
+            return False, "Missing required parameter: code"
+        timeout = parameters.get("timeout_seconds")
+        if timeout is not None and not 0.1 <= timeout <= 300:
+            return False, "timeout_seconds must be between 0.1 and 300"
+        return True, None
+
+    async def invoke(self, parameters, auth_context=None, execution_context=None) -> Dict[str, Any]:
+        started = time.perf_counter()
+        valid, message = await self.validate_parameters(parameters)
+        error = None
+        data = None
+        if not valid:
+            error = ToolError(ToolErrorCode.INVALID_PARAMETERS, message)
+        else:
+            try:
+                result = await get_execution_pool().run_async(parameters["code"], parameters.get("timeout_seconds"))
+            except PoolBusyError as e:
+                error = ToolError(e.code, str(e), retry_after_ms=1000, is_retryable=True)
+            else:
+                data = result
+                if not result["success"]:
+                    # Snippet errors and timeouts recur on retry; details["type"] tells them apart
+                    failure = result["error"]
+                    error = ToolError(ToolErrorCode.TOOL_EXECUTION_FAILED, f"{failure['type']}: {failure['message']}",
+                                      details=failure, is_retryable=False)
+        return {
+            "success": error is None,
+            "data": data,
+            "metadata": {
+                "tool_name": self.metadata.name,
+                "platform": getattr(self, "platform", self.metadata.platform),
+                "execution_time_ms": int((time.perf_counter() - started) * 1000),
+                "timestamp": datetime.now().isoformat(),
+            },
+            "error": error.to_dict() if error else None,
+        }
+
+    async def health_check(self) -> bool:
+        result = await get_execution_pool().run_async("print('ok')", 5)
+        return result["success"] and result["stdout"].strip() == "ok"
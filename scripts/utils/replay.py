@@ -0,0 +1,498 @@
+"""
+Microsoft Copilot Agent Team - Record / Replay
+
+Captures agent interactions and replays them deterministically, so
+performance runs measure our own overhead instead of live agent variance:
+
+- ``Recorder`` captures orchestrator requests and the specialist calls made
+  while handling them (request, response, start offset, duration, error)
+  into a compact recording file: zlib-compressed blocks of records followed
+  by an index of block offsets, record counts, time ranges and agents, so a
+  reader can jump to a record or a time window without decompressing the
+  whole file (a recording cut short by a crash is still readable by
+  scanning its blocks)
+- ``ReplayBackend`` is a stand-in backend that answers each specialist call
+  with its recorded response, optionally waiting the recorded duration
+- ``Replayer`` feeds the recorded requests through the local pipeline
+  (keyword routing, session store, backend calls, reply synthesis) at the
+  original pace, an accelerated pace, or as fast as possible, and reports
+  routing and response mismatches plus per-request local overhead
+
+Usage:
+    from utils.replay import Recorder, Recording, Replayer
+
+    recorder = Recorder("data/recordings/orchestrator.rec")
+    backend = recorder.wrap(backend)
+    with recorder.exchange("orchestrator", text) as exchange:
+        exchange.agent = router.route_one(text)
+        exchange.response = backend.invoke_agent(exchange.agent, text)
+    recorder.close()
+
+    report = Replayer(Recording("data/recordings/orchestrator.rec"), speed=10).run()
+"""
+
+import bisect
+import json
+import statistics
+import struct
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from utils.backend import AgentBackend, StandInBackend
+from utils.routing import KeywordRouter, get_router
+from utils.sessions import SessionStore
+
+MAGIC = b"CREC"
+FORMAT_VERSION = 1
+DEFAULT_BLOCK_SIZE = 256
+DEFAULT_WORKERS = 8
+# Mismatches / errors listed individually in a replay report
+MAX_SAMPLES = 20
+
+ORCHESTRATOR = "orchestrator"
+SPECIALIST = "specialist"
+_KINDS = (ORCHESTRATOR, SPECIALIST)
+_BLOCK_HEADER = struct.Struct("<I")
+_TRAILER = struct.Struct("<Q4s")
+
+
+class Exchange(NamedTuple):
+    """One recorded request/response pair"""
+    seq: int
+    kind: str
+    agent: str
+    request: str
+    response: Optional[str]
+    offset_ms: float
+    duration_ms: float
+    error: Optional[str] = None
+    session_id: Optional[str] = None
+    parent: int = -1
+
+    def _encode(self) -> list:
+        return [self.seq, _KINDS.index(self.kind), self.agent, self.request, self.response,
+                round(self.offset_ms, 3), round(self.duration_ms, 3), self.error, self.session_id, self.parent]
+
+    @classmethod
+    def _decode(cls, row: list) -> "Exchange":
+        return cls(row[0], _KINDS[row[1]], *row[2:])
+
+
+class _Pending:
+    """Exchange being recorded; callers fill in ``agent`` / ``response``"""
+
+    def __init__(self, seq: int, kind: str, agent: str, request: str, session_id: Optional[str], parent: int):
+        self.seq = seq
+        self.kind = kind
+        self.agent = agent
+        self.request = request
+        self.session_id = session_id
+        self.parent = parent
+        self.response: Optional[str] = None
+        self.error: Optional[str] = None
+
+
+class Recorder:
+    """
+    Writes exchanges to a recording file.
+
+    Args:
+        path: Recording file (parent directories are created)
+        block_size: Records per compressed block
+    """
+
+    def __init__(self, path: str, block_size: int = DEFAULT_BLOCK_SIZE):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.block_size = block_size
+        self._file = open(self.path, "wb")
+        self._file.write(MAGIC + bytes([FORMAT_VERSION]))
+        self._started = time.perf_counter()
+        self._created_at = time.time()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._next_seq = 0
+        self._block: List[Exchange] = []
+        self._blocks: List[list] = []
+        self._agents: Dict[str, int] = {}
+        self._count = 0
+
+    def _seq(self) -> int:
+        with self._lock:
+            seq = self._next_seq
+            self._next_seq += 1
+            return seq
+
+    @contextmanager
+    def exchange(self, kind: str, request: str, agent: str = "",
+                 session_id: Optional[str] = None) -> Iterator[_Pending]:
+        """Record the request handled inside the block; specialist calls made inside become its children"""
+        stack = self._local.__dict__.setdefault("stack", [])
+        pending = _Pending(self._seq(), kind, agent, request, session_id, stack[-1] if stack else -1)
+        stack.append(pending.seq)
+        started = time.perf_counter()
+        try:
+            yield pending
+        except Exception as e:
+            pending.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            stack.pop()
+            finished = time.perf_counter()
+            self.add(Exchange(pending.seq, kind, pending.agent, request, pending.response,
+                              (started - self._started) * 1000, (finished - started) * 1000,
+                              pending.error, pending.session_id, pending.parent))
+
+    def add(self, exchange: Exchange) -> None:
+        with self._lock:
+            self._block.append(exchange)
+            self._agents[exchange.agent] = self._agents.get(exchange.agent, 0) + 1
+            self._count += 1
+            if len(self._block) >= self.block_size:
+                self._flush_block()
+
+    def wrap(self, backend: AgentBackend) -> "RecordingBackend":
+        """Backend whose ``invoke_agent`` calls are recorded as specialist exchanges"""
+        return RecordingBackend(backend, self)
+
+    def _flush_block(self) -> None:
+        if not self._block:
+            return
+        block = sorted(self._block, key=lambda exchange: exchange.offset_ms)
+        data = zlib.compress(
+            "\n".join(json.dumps(e._encode(), ensure_ascii=False, separators=(",", ":")) for e in block)
+            .encode("utf-8"), 6)
+        offset = self._file.tell()
+        self._file.write(_BLOCK_HEADER.pack(len(data)) + data)
+        self._file.flush()
+        self._blocks.append([offset, len(data), len(block), block[0].offset_ms, block[-1].offset_ms,
+                             sorted({e.agent for e in block})])
+        self._block = []
+
+    def close(self) -> None:
+        """Write the remaining records and the index"""
+        with self._lock:
+            if self._file.closed:
+                return
+            self._flush_block()
+            footer_offset = self._file.tell()
+            self._file.write(json.dumps({
+                "version": FORMAT_VERSION,
+                "created_at": self._created_at,
+                "records": self._count,
+                "agents": self._agents,
+                "blocks": self._blocks,
+            }, ensure_ascii=False).encode("utf-8"))
+            self._file.write(_TRAILER.pack(footer_offset, MAGIC))
+            self._file.close()
+
+    def __enter__(self) -> "Recorder":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class NullRecorder:
+    """Recorder that records nothing (the default when recording is off)"""
+
+    @contextmanager
+    def exchange(self, kind: str, request: str, agent: str = "",
+                 session_id: Optional[str] = None) -> Iterator[_Pending]:
+        yield _Pending(-1, kind, agent, request, session_id, -1)
+
+    def wrap(self, backend: AgentBackend) -> AgentBackend:
+        return backend
+
+    def close(self) -> None:
+        pass
+
+
+class RecordingBackend(AgentBackend):
+    """Delegating backend that records every ``invoke_agent`` call"""
+
+    def __init__(self, backend: AgentBackend, recorder: Recorder):
+        self.backend = backend
+        self.recorder = recorder
+
+    def list_agents(self) -> List[Dict[str, Any]]:
+        return self.backend.list_agents()
+
+    def create_agent(self, config: Dict[str, Any]) -> Dict[str, Any]:
+        return self.backend.create_agent(config)
+
+    def update_agent(self, agent_id: str, config: Dict[str, Any]) -> Dict[str, Any]:
+        return self.backend.update_agent(agent_id, config)
+
+    def delete_agent(self, agent_id: str) -> None:
+        self.backend.delete_agent(agent_id)
+
+    def invoke_agent(self, agent_id: str, message: str) -> str:
+        with self.recorder.exchange(SPECIALIST, message, agent_id) as exchange:
+            exchange.response = self.backend.invoke_agent(agent_id, message)
+        return exchange.response
+
+
+class Recording:
+    """
+    Read access to a recording file.
+
+    Blocks are decompressed on demand; the most recently used one is kept.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self._data = self.path.read_bytes()
+        if self._data[:4] != MAGIC:
+            raise ValueError(f"{path} is not a recording")
+        self.info = self._read_index()
+        self._starts = []
+        total = 0
+        for block in self.info["blocks"]:
+            self._starts.append(total)
+            total += block[2]
+        self._cached: Tuple[int, List[Exchange]] = (-1, [])
+
+    def _read_index(self) -> Dict[str, Any]:
+        if len(self._data) >= 5 + _TRAILER.size:
+            footer_offset, magic = _TRAILER.unpack_from(self._data, len(self._data) - _TRAILER.size)
+            if magic == MAGIC and footer_offset < len(self._data):
+                return json.loads(self._data[footer_offset:len(self._data) - _TRAILER.size])
+        # No index (recorder did not close): scan the blocks
+        blocks, agents, position = [], {}, 5
+        while position + _BLOCK_HEADER.size <= len(self._data):
+            length = _BLOCK_HEADER.unpack_from(self._data, position)[0]
+            start = position + _BLOCK_HEADER.size
+            try:
+                records = self._decode(self._data[start:start + length])
+            except (zlib.error, ValueError):
+                break
+            for exchange in records:
+                agents[exchange.agent] = agents.get(exchange.agent, 0) + 1
+            blocks.append([position, length, len(records), records[0].offset_ms, records[-1].offset_ms,
+                           sorted({e.agent for e in records})])
+            position = start + length
+        return {"version": FORMAT_VERSION, "created_at": None, "records": sum(b[2] for b in blocks),
+                "agents": agents, "blocks": blocks}
+
+    @staticmethod
+    def _decode(data: bytes) -> List[Exchange]:
+        return [Exchange._decode(json.loads(line)) for line in zlib.decompress(data).split(b"\n")]
+
+    def _block(self, number: int) -> List[Exchange]:
+        if self._cached[0] != number:
+            offset, length = self.info["blocks"][number][:2]
+            start = offset + _BLOCK_HEADER.size
+            self._cached = (number, self._decode(self._data[start:start + length]))
+        return self._cached[1]
+
+    def __len__(self) -> int:
+        return self.info["records"]
+
+    def __getitem__(self, index: int) -> Exchange:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        number = bisect.bisect_right(self._starts, index) - 1
+        return self._block(number)[index - self._starts[number]]
+
+    def __iter__(self) -> Iterator[Exchange]:
+        for number in range(len(self.info["blocks"])):
+            yield from self._block(number)
+
+    def window(self, start_ms: float = 0.0, end_ms: float = float("inf"),
+               agent: Optional[str] = None) -> Iterator[Exchange]:
+        """Exchanges that started within [start_ms, end_ms], skipping blocks outside the range"""
+        for number, block in enumerate(self.info["blocks"]):
+            if block[4] < start_ms or block[3] > end_ms or (agent is not None and agent not in block[5]):
+                continue
+            for exchange in self._block(number):
+                if start_ms <= exchange.offset_ms <= end_ms and (agent is None or exchange.agent == agent):
+                    yield exchange
+
+    @property
+    def agents(self) -> Dict[str, int]:
+        return dict(self.info["agents"])
+
+
+class ReplayBackend(StandInBackend):
+    """
+    Stand-in backend answering specialist calls from a recording.
+
+    Args:
+        recording: Source of the recorded responses
+        speed: Replay the recorded durations divided by this factor
+               (None: answer immediately)
+    """
+
+    def __init__(self, recording: Recording, speed: Optional[float] = None):
+        super().__init__()
+        self.speed = speed
+        self._responses: Dict[Tuple[str, str], List[Exchange]] = {}
+        self._cursor: Dict[Tuple[str, str], int] = {}
+        for exchange in recording:
+            if exchange.kind == SPECIALIST:
+                self._responses.setdefault((exchange.agent, exchange.request), []).append(exchange)
+        self._local = threading.local()
+
+    @property
+    def waited_seconds(self) -> float:
+        """Time the current thread spent in simulated backend calls"""
+        return getattr(self._local, "waited", 0.0)
+
+    def reset_wait(self) -> None:
+        self._local.waited = 0.0
+
+    def rewind(self) -> None:
+        """Start over from the first recorded response of every request and clear call counts"""
+        with self._lock:
+            self._cursor.clear()
+            self.calls.clear()
+
+    def invoke_agent(self, agent_id: str, message: str) -> str:
+        self._call("invoke_agent")
+        key = (agent_id, message)
+        with self._lock:
+            recorded = self._responses.get(key)
+            if recorded:
+                # Repeated requests get their recorded responses in order (the last one repeats)
+                position = self._cursor.get(key, 0)
+                exchange = recorded[min(position, len(recorded) - 1)]
+                self._cursor[key] = position + 1
+            else:
+                exchange = None
+        if exchange is not None and self.speed:
+            delay = exchange.duration_ms / 1000 / self.speed
+            time.sleep(delay)
+            self._local.waited = self.waited_seconds + delay
+        if exchange is None:
+            return f"[{agent_id}] {message}"
+        if exchange.error:
+            raise RuntimeError(exchange.error)
+        return exchange.response or ""
+
+
+def synthesize(replies: List[str]) -> str:
+    """Combine specialist replies into the orchestrator's answer"""
+    return replies[0] if len(replies) == 1 else "\n\n".join(replies)
+
+
+class Replayer:
+    """
+    Replays recorded orchestrator requests through the local pipeline.
+
+    Args:
+        recording: Recording to replay
+        speed: 1.0 for the original pace, >1 to accelerate, None for as fast as possible
+        router: Router used for the requests (default: the assistant router)
+        sessions: Session store updated with each turn (default: a private store)
+        max_workers: Requests handled concurrently when pacing overlaps them
+    """
+
+    def __init__(
+        self,
+        recording: Recording,
+        speed: Optional[float] = None,
+        router: Optional[KeywordRouter] = None,
+        sessions: Optional[SessionStore] = None,
+        max_workers: int = DEFAULT_WORKERS,
+    ):
+        self.recording = recording
+        self.speed = speed
+        self.router = router or get_router("assistant")
+        self._own_sessions = sessions is None
+        self.sessions = sessions or SessionStore(spill_file=":memory:")
+        self.max_workers = max_workers
+        self.backend = ReplayBackend(recording, speed)
+
+    def _requests(self) -> List[Tuple[Exchange, List[Exchange]]]:
+        top, children = [], {}
+        for exchange in self.recording:
+            if exchange.parent < 0:
+                top.append(exchange)
+            else:
+                children.setdefault(exchange.parent, []).append(exchange)
+        top.sort(key=lambda exchange: exchange.offset_ms)
+        return [(exchange, sorted(children.get(exchange.seq, ()), key=lambda c: c.offset_ms))
+                for exchange in top]
+
+    def handle(self, request: Exchange, calls: List[Exchange]) -> Dict[str, Any]:
+        """Run one recorded request through routing, sessions, backend calls and synthesis"""
+        self.backend.reset_wait()
+        started = time.perf_counter()
+        outcome = {"seq": request.seq, "route_mismatch": None, "response_mismatch": False, "error": None}
+        try:
+            if request.kind == SPECIALIST:
+                response = self.backend.invoke_agent(request.agent, request.request)
+            else:
+                agent = self.router.route_one(request.request)
+                if request.agent and agent != request.agent:
+                    outcome["route_mismatch"] = (request.request, request.agent, agent)
+                if request.session_id:
+                    self.sessions.get_or_create(request.session_id)
+                    self.sessions.append_turn(request.session_id, "user", request.request)
+                replies = [self.backend.invoke_agent(call.agent, call.request) for call in calls] \
+                    or [self.backend.invoke_agent(agent, request.request)]
+                response = synthesize(replies)
+                if request.session_id:
+                    self.sessions.append_turn(request.session_id, "assistant", response, agent=agent)
+            outcome["response_mismatch"] = request.response is not None and response != request.response
+        except Exception as e:
+            outcome["error"] = f"{type(e).__name__}: {e}"
+        elapsed = time.perf_counter() - started
+        outcome["overhead_ms"] = (elapsed - self.backend.waited_seconds) * 1000
+        return outcome
+
+    def run(self, limit: Optional[int] = None) -> Dict[str, Any]:
+        """Replay the recording and return a report (each run starts from the beginning)"""
+        self.backend.rewind()
+        requests = self._requests()[:limit]
+        started = time.perf_counter()
+        if self.speed:
+            with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="replay") as pool:
+                futures = []
+                first = requests[0][0].offset_ms if requests else 0.0
+                for request, calls in requests:
+                    due = started + (request.offset_ms - first) / 1000 / self.speed
+                    delay = due - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                    futures.append(pool.submit(self.handle, request, calls))
+                outcomes = [future.result() for future in futures]
+        else:
+            outcomes = [self.handle(request, calls) for request, calls in requests]
+        wall = time.perf_counter() - started
+
+        overhead = sorted(outcome["overhead_ms"] for outcome in outcomes)
+        route_mismatches = [o["route_mismatch"] for o in outcomes if o["route_mismatch"]]
+        errors = [o["error"] for o in outcomes if o["error"]]
+        recorded = (requests[-1][0].offset_ms + requests[-1][0].duration_ms - requests[0][0].offset_ms) / 1000 \
+            if requests else 0.0
+        report = {
+            "requests": len(outcomes),
+            "specialist_calls": self.backend.calls.get("invoke_agent", 0),
+            "speed": self.speed,
+            "recorded_seconds": round(recorded, 3),
+            "wall_seconds": round(wall, 3),
+            "requests_per_second": round(len(outcomes) / wall, 1) if wall else 0.0,
+            "route_mismatches": len(route_mismatches),
+            "route_mismatch_samples": route_mismatches[:MAX_SAMPLES],
+            "response_mismatches": sum(1 for o in outcomes if o["response_mismatch"]),
+            "errors": len(errors),
+            "error_samples": errors[:MAX_SAMPLES],
+            "overhead_ms": {
+                "mean": round(statistics.fmean(overhead), 4) if overhead else 0.0,
+                "p50": round(overhead[len(overhead) // 2], 4) if overhead else 0.0,
+                "p95": round(overhead[min(len(overhead) - 1, int(len(overhead) * 0.95))], 4) if overhead else 0.0,
+                "max": round(overhead[-1], 4) if overhead else 0.0,
+            },
+        }
+        if self._own_sessions:
+            self.sessions.close()  # drops the replayed sessions; the store stays usable
+        return report
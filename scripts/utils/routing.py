@@ -0,0 +1,80 @@
+"""
+Microsoft Copilot Agent Team - Keyword Routing
+
+Keyword-based request routing as described in the orchestrator's routing
+logic (docs/agent-team-design.md). All keywords of a table are compiled into
+a single regular expression, so routing a request is one scan of the text.
+"""
+
+import re
+from collections import Counter
+from typing import Dict, List, Optional
+
+# Specialist team routing (create-agents.py / agent-team-design.md)
+SPECIALIST_ROUTES: Dict[str, List[str]] = {
+    "architecture-specialist": ["設計", "架構", "Topics", "對話流程", "Entities"],
+    "integration-specialist": ["API", "Power Automate", "連接器", "Connector", "認證", "Graph"],
+    "knowledge-specialist": ["知識庫", "RAG", "SharePoint", "檢索", "索引", "Dataverse"],
+    "code-generator": ["腳本", "程式碼", "Python", "PowerShell", "自動化"],
+    "documentation-researcher": ["文檔", "最新", "範例", "官方"],
+    "troubleshooter": ["錯誤", "失敗", "問題", "診斷", "修復"],
+}
+
+# Enterprise assistant routing (agents in setup.py's config template)
+ASSISTANT_ROUTES: Dict[str, List[str]] = {
+    "m365_agent": ["calendar", "meeting", "schedule", "email", "mail", "inbox", "outlook", "teams", "onedrive"],
+    "data_agent": ["analyze", "analysis", "data", "sales", "report", "excel", "power bi", "dashboard", "chart"],
+    "it_agent": ["password", "reset", "vpn", "laptop", "printer", "login", "account", "ticket", "access"],
+    "automation_agent": ["automate", "automation", "workflow", "approval", "trigger", "recurring"],
+    "research_agent": ["research", "search", "latest", "documentation", "compare", "competitor"],
+    "content_agent": ["draft", "write", "presentation", "template", "proposal", "newsletter"],
+}
+
+
+class KeywordRouter:
+    """
+    Routes free-text requests to agents by keyword matches.
+
+    Args:
+        routes: Mapping of agent key -> keywords (earlier agents win ties)
+        default_agent: Agent returned when nothing matches
+    """
+
+    def __init__(self, routes: Dict[str, List[str]], default_agent: str = "orchestrator"):
+        self.default_agent = default_agent
+        self._order = {agent: index for index, agent in enumerate(routes)}
+        self._agent_for: Dict[str, str] = {}
+        for agent, keywords in routes.items():
+            for keyword in keywords:
+                self._agent_for.setdefault(keyword.lower(), agent)
+
+        alternatives = []
+        for keyword in sorted(self._agent_for, key=len, reverse=True):
+            pattern = re.escape(keyword)
+            if keyword.isascii():
+                # Whole words only for Latin keywords ("data" must not match "update")
+                pattern = rf"(?<![a-z0-9]){pattern}(?![a-z0-9])"
+            alternatives.append(pattern)
+        self._pattern = re.compile("|".join(alternatives), re.IGNORECASE)
+
+    def route(self, text: str) -> List[str]:
+        """Return all matching agents, best match first."""
+        scores = Counter(self._agent_for[match.lower()] for match in self._pattern.findall(text))
+        return sorted(scores, key=lambda agent: (-scores[agent], self._order[agent]))
+
+    def route_one(self, text: str) -> str:
+        """Return the single best agent, or the default agent."""
+        agents = self.route(text)
+        return agents[0] if agents else self.default_agent
+
+
+_routers: Dict[str, KeywordRouter] = {}
+
+
+def get_router(table: str = "assistant") -> KeywordRouter:
+    """Return a shared router for the "assistant" or "specialist" routing table."""
+    router: Optional[KeywordRouter] = _routers.get(table)
+    if router is None:
+        routes = {"assistant": ASSISTANT_ROUTES, "specialist": SPECIALIST_ROUTES}[table]
+        router = _routers[table] = KeywordRouter(routes)
+    return router
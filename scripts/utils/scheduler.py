@@ -0,0 +1,293 @@
+"""
+Microsoft Copilot Agent Team - Request Scheduler
+
+Admission control in front of the orchestrator. Requests are admitted into
+bounded per-priority queues and dispatched onto ``max_parallel_tasks``
+execution slots:
+
+- INTERACTIVE requests always dispatch before BATCH requests, and a number of
+  slots is reserved for interactive work so a batch flood cannot occupy all
+  of them
+- within a priority class, tenants are served round-robin, and users
+  round-robin within each tenant, so one noisy caller cannot starve others
+- requests are rejected up front when their queue is full or their expected
+  wait already exceeds their deadline, and shed as soon as their deadline
+  passes while queued
+- queue depth, wait time and rejection counters are available from
+  ``metrics()``
+
+Usage:
+    from utils.scheduler import Priority, RequestScheduler
+
+    scheduler = RequestScheduler.from_config(load_config())
+    result = await scheduler.run(
+        handle_request, request,
+        priority=Priority.INTERACTIVE, tenant_id=tenant, user_id=user, timeout=30,
+    )
+"""
+
+import asyncio
+import statistics
+import time
+from collections import OrderedDict, deque
+from enum import IntEnum
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+
+DEFAULT_MAX_PARALLEL_TASKS = 6
+DEFAULT_TIMEOUT_SECONDS = 30.0
+DEFAULT_QUEUE_LIMITS = {"interactive": 200, "batch": 2000}
+DEFAULT_RESERVED_INTERACTIVE_SLOTS = 2
+WAIT_SAMPLES = 1000
+
+
+class Priority(IntEnum):
+    """Request priority classes (lower value dispatches first)"""
+    INTERACTIVE = 0
+    BATCH = 1
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request is not admitted or is shed before it runs"""
+
+    def __init__(self, reason: str, message: str):
+        super().__init__(message)
+        self.reason = reason  # "queue_full", "deadline" or "expired"
+
+
+class _Ticket:
+    __slots__ = ("priority", "tenant_id", "user_id", "deadline", "enqueued_at", "granted", "timer")
+
+    def __init__(self, priority: Priority, tenant_id: str, user_id: str, deadline: float, granted: asyncio.Future):
+        self.priority = priority
+        self.tenant_id = tenant_id
+        self.user_id = user_id
+        self.deadline = deadline
+        self.enqueued_at = time.monotonic()
+        self.granted = granted
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+
+class _FairQueue:
+    """Two-level round-robin queue: tenants, then users within a tenant"""
+
+    def __init__(self):
+        self._tenants: "OrderedDict[str, OrderedDict[str, Deque[_Ticket]]]" = OrderedDict()
+        self.depth = 0
+
+    def push(self, ticket: _Ticket) -> None:
+        users = self._tenants.setdefault(ticket.tenant_id, OrderedDict())
+        users.setdefault(ticket.user_id, deque()).append(ticket)
+        self.depth += 1
+
+    def pop(self) -> Optional[_Ticket]:
+        """Take the next ticket and rotate its tenant and user to the back"""
+        while self._tenants:
+            tenant_id, users = next(iter(self._tenants.items()))
+            user_id, tickets = next(iter(users.items()))
+            ticket = tickets.popleft()
+            self.depth -= 1
+            if tickets:
+                users.move_to_end(user_id)
+            else:
+                del users[user_id]
+            if users:
+                self._tenants.move_to_end(tenant_id)
+            else:
+                del self._tenants[tenant_id]
+            return ticket
+        return None
+
+    def remove(self, ticket: _Ticket) -> bool:
+        """Take a specific ticket out of the queue (cancelled or expired while waiting)"""
+        users = self._tenants.get(ticket.tenant_id)
+        tickets = users.get(ticket.user_id) if users else None
+        if not tickets or ticket not in tickets:
+            return False
+        tickets.remove(ticket)
+        self.depth -= 1
+        if not tickets:
+            del users[ticket.user_id]
+            if not users:
+                del self._tenants[ticket.tenant_id]
+        return True
+
+
+class RequestScheduler:
+    """
+    Priority- and fairness-aware admission control for orchestrator requests.
+
+    Args:
+        max_parallel_tasks: Requests executing at once (orchestrator setting)
+        queue_limits: Maximum queued requests per priority name
+        reserved_interactive_slots: Slots batch requests may never occupy
+        default_timeout: Deadline in seconds for requests that do not set one
+    """
+
+    def __init__(
+        self,
+        max_parallel_tasks: int = DEFAULT_MAX_PARALLEL_TASKS,
+        queue_limits: Optional[Dict[str, int]] = None,
+        reserved_interactive_slots: int = DEFAULT_RESERVED_INTERACTIVE_SLOTS,
+        default_timeout: float = DEFAULT_TIMEOUT_SECONDS,
+    ):
+        self.max_parallel_tasks = max_parallel_tasks
+        self.queue_limits = dict(DEFAULT_QUEUE_LIMITS, **(queue_limits or {}))
+        self.reserved_interactive_slots = min(reserved_interactive_slots, max_parallel_tasks - 1)
+        self.default_timeout = default_timeout
+        self._queues = {priority: _FairQueue() for priority in Priority}
+        self._running = {priority: 0 for priority in Priority}
+        self._service_time = {priority: None for priority in Priority}
+        self._waits = {priority: deque(maxlen=WAIT_SAMPLES) for priority in Priority}
+        self._counters = {
+            priority: {"admitted": 0, "completed": 0, "queue_full": 0, "deadline": 0, "expired": 0}
+            for priority in Priority
+        }
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "RequestScheduler":
+        """Build from the agent team config (``agents.orchestrator`` section)"""
+        orchestrator = config.get("agents", {}).get("orchestrator", {})
+        queue = orchestrator.get("queue", {})
+        return cls(
+            max_parallel_tasks=orchestrator.get("max_parallel_tasks", DEFAULT_MAX_PARALLEL_TASKS),
+            queue_limits={
+                "interactive": queue.get("interactive_max_depth", DEFAULT_QUEUE_LIMITS["interactive"]),
+                "batch": queue.get("batch_max_depth", DEFAULT_QUEUE_LIMITS["batch"]),
+            },
+            reserved_interactive_slots=queue.get("reserved_interactive_slots", DEFAULT_RESERVED_INTERACTIVE_SLOTS),
+            default_timeout=orchestrator.get("timeout_seconds", DEFAULT_TIMEOUT_SECONDS),
+        )
+
+    async def run(
+        self,
+        func: Callable[..., Awaitable[Any]],
+        *args,
+        priority: Priority = Priority.INTERACTIVE,
+        tenant_id: str = "",
+        user_id: str = "",
+        timeout: Optional[float] = None,
+        **kwargs,
+    ) -> Any:
+        """
+        Wait for an execution slot, then run ``await func(*args, **kwargs)``.
+
+        Raises:
+            AdmissionRejected: Queue full, deadline unreachable, or deadline
+                passed while queued
+        """
+        ticket = self._admit(priority, tenant_id, user_id, timeout)
+        try:
+            await ticket.granted
+        except asyncio.CancelledError:
+            granted = ticket.granted
+            if granted.done() and not granted.cancelled() and granted.exception() is None:
+                self._release(ticket, started=None)
+            else:
+                self._withdraw(ticket)
+            raise
+
+        started = time.monotonic()
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            self._release(ticket, started)
+
+    def _admit(self, priority: Priority, tenant_id: str, user_id: str, timeout: Optional[float]) -> _Ticket:
+        counters = self._counters[priority]
+        queue = self._queues[priority]
+        name = priority.name.lower()
+        if queue.depth >= self.queue_limits[name]:
+            counters["queue_full"] += 1
+            raise AdmissionRejected("queue_full", f"{name} queue is full ({queue.depth} requests)")
+
+        timeout = self.default_timeout if timeout is None else timeout
+        expected_wait = self.expected_wait(priority)
+        if expected_wait is not None and expected_wait > timeout:
+            counters["deadline"] += 1
+            raise AdmissionRejected(
+                "deadline", f"expected wait {expected_wait:.1f}s exceeds the {timeout:.1f}s deadline"
+            )
+
+        loop = asyncio.get_running_loop()
+        ticket = _Ticket(priority, tenant_id, user_id, time.monotonic() + timeout, loop.create_future())
+        queue.push(ticket)
+        counters["admitted"] += 1
+        self._dispatch()
+        if not ticket.granted.done():
+            ticket.timer = loop.call_later(timeout, self._expire, ticket)
+        return ticket
+
+    def _expire(self, ticket: _Ticket) -> None:
+        """Deadline timer: shed a ticket that is still queued"""
+        if ticket.granted.done() or not self._queues[ticket.priority].remove(ticket):
+            return
+        self._counters[ticket.priority]["expired"] += 1
+        ticket.granted.set_exception(AdmissionRejected("expired", "deadline passed while queued"))
+
+    def _withdraw(self, ticket: _Ticket) -> None:
+        """Forget a ticket whose caller stopped waiting before it was granted"""
+        if ticket.timer is not None:
+            ticket.timer.cancel()
+        self._queues[ticket.priority].remove(ticket)
+
+    def expected_wait(self, priority: Priority) -> Optional[float]:
+        """Estimated queueing delay for a new request, or None without history"""
+        service_time = self._service_time[priority]
+        if service_time is None:
+            return None
+        slots = self._slots_for(priority)
+        ahead = sum(self._queues[p].depth for p in Priority if p <= priority)
+        if sum(self._running.values()) + ahead < slots:
+            return 0.0
+        return (ahead + 1) / max(slots, 1) * service_time
+
+    def _slots_for(self, priority: Priority) -> int:
+        if priority == Priority.INTERACTIVE:
+            return self.max_parallel_tasks
+        return self.max_parallel_tasks - self.reserved_interactive_slots
+
+    def _dispatch(self) -> None:
+        now = time.monotonic()
+        for priority in Priority:
+            queue = self._queues[priority]
+            while queue.depth and sum(self._running.values()) < self._slots_for(priority):
+                ticket = queue.pop()
+                if ticket.timer is not None:
+                    ticket.timer.cancel()
+                if ticket.granted.done():  # caller cancelled while queued
+                    continue
+                if ticket.deadline <= now:
+                    self._counters[priority]["expired"] += 1
+                    ticket.granted.set_exception(
+                        AdmissionRejected("expired", "deadline passed while queued")
+                    )
+                    continue
+                self._running[priority] += 1
+                self._waits[priority].append(now - ticket.enqueued_at)
+                ticket.granted.set_result(None)
+
+    def _release(self, ticket: _Ticket, started: Optional[float]) -> None:
+        priority = ticket.priority
+        self._running[priority] -= 1
+        if started is not None:
+            self._counters[priority]["completed"] += 1
+            duration = time.monotonic() - started
+            previous = self._service_time[priority]
+            self._service_time[priority] = duration if previous is None else 0.8 * previous + 0.2 * duration
+        self._dispatch()
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Queue depth, running count, wait-time percentiles and counters per priority"""
+        result = {}
+        for priority in Priority:
+            waits = sorted(self._waits[priority])
+            p95 = waits[min(len(waits) - 1, int(len(waits) * 0.95))] if waits else 0.0
+            result[priority.name.lower()] = dict(
+                self._counters[priority],
+                queue_depth=self._queues[priority].depth,
+                running=self._running[priority],
+                wait_p50_ms=round(statistics.median(waits) * 1000, 2) if waits else 0.0,
+                wait_p95_ms=round(p95 * 1000, 2),
+                service_time_ms=round((self._service_time[priority] or 0.0) * 1000, 2),
+            )
+        return result
@@ -0,0 +1,388 @@
+"""
+Microsoft Copilot Agent Team - Conversation Session Store
+
+In-process session state for the orchestrator:
+
+- sessions use ``__slots__`` and keep their turns column-wise in ``array``
+  buffers (role codes, timestamps, interned agent codes) next to a list of
+  message texts, instead of one dict per turn
+- idle sessions expire after ``security.session_timeout_minutes``; expiry is
+  tracked on a timer wheel, so finding expired sessions never scans the
+  whole store
+- above a memory budget the least recently used sessions spill to SQLite
+  and are loaded back transparently on their next access
+- ``stats()`` reports live and spilled sessions and bytes per session
+
+Usage:
+    from utils.sessions import SessionStore
+
+    store = SessionStore.from_config(load_config())
+    session = store.get_or_create(conversation_id, user_id=user, tenant_id=tenant)
+    store.append_turn(conversation_id, "user", text)
+    store.append_turn(conversation_id, "assistant", reply, agent="m365_agent")
+"""
+
+import json
+import math
+import os
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Set
+
+DEFAULT_TIMEOUT_MINUTES = 30
+DEFAULT_MEMORY_LIMIT_MB = 256
+DEFAULT_SPILL_FILE = "data/sessions-{pid}.db"
+WHEEL_SLOTS = 60
+
+ROLES = ("user", "assistant", "system", "tool")
+ROLE_CODES = {role: code for code, role in enumerate(ROLES)}
+
+# Fixed per-session overhead: slots object, arrays, list and bookkeeping
+SESSION_OVERHEAD_BYTES = 400
+TURN_OVERHEAD_BYTES = 8 + 1 + 2 + 8  # timestamp, role, agent, list slot
+
+
+class Turn(NamedTuple):
+    """Read-only view of one conversation turn"""
+    role: str
+    content: str
+    timestamp: float
+    agent: Optional[str]
+
+
+class Session:
+    """One conversation; turns are stored column-wise"""
+
+    __slots__ = (
+        "session_id", "user_id", "tenant_id", "created_at", "last_active",
+        "_roles", "_timestamps", "_agents", "_contents", "_content_bytes", "_slot",
+    )
+
+    def __init__(self, session_id: str, user_id: str = "", tenant_id: str = "",
+                 created_at: float = 0.0):
+        self.session_id = session_id
+        self.user_id = user_id
+        self.tenant_id = tenant_id
+        self.created_at = created_at
+        self.last_active = created_at
+        self._roles = array("B")
+        self._timestamps = array("d")
+        self._agents = array("H")
+        self._contents: List[str] = []
+        self._content_bytes = 0
+        self._slot = -1
+
+    def __len__(self) -> int:
+        return len(self._contents)
+
+    def turns(self, agent_names: List[Optional[str]]) -> Iterator[Turn]:
+        for role, content, timestamp, agent in zip(self._roles, self._contents, self._timestamps, self._agents):
+            yield Turn(ROLES[role], content, timestamp, agent_names[agent])
+
+    @property
+    def approx_bytes(self) -> int:
+        return SESSION_OVERHEAD_BYTES + len(self._contents) * TURN_OVERHEAD_BYTES + self._content_bytes
+
+    def _append(self, role_code: int, content: str, timestamp: float, agent_code: int) -> None:
+        self._roles.append(role_code)
+        self._timestamps.append(timestamp)
+        self._agents.append(agent_code)
+        self._contents.append(content)
+        self._content_bytes += sys.getsizeof(content)
+
+    def _to_record(self, agent_names: List[Optional[str]]) -> str:
+        return json.dumps({
+            "user_id": self.user_id,
+            "tenant_id": self.tenant_id,
+            "created_at": self.created_at,
+            "roles": self._roles.tolist(),
+            "timestamps": self._timestamps.tolist(),
+            "agents": [agent_names[code] for code in self._agents],
+            "contents": self._contents,
+        }, ensure_ascii=False)
+
+
+class SessionStore:
+    """
+    Session store with timer-wheel TTL eviction and LRU spill to SQLite.
+
+    Args:
+        timeout_minutes: Idle time after which a session expires
+        memory_limit_mb: In-memory budget; LRU sessions above it spill to disk
+        spill_file: SQLite file for spilled sessions; "{pid}" is replaced by the
+                    process id so workers never share one (":memory:" keeps
+                    them in-process)
+        clock: Wall-clock source (seconds), replaceable for simulations
+    """
+
+    def __init__(
+        self,
+        timeout_minutes: float = DEFAULT_TIMEOUT_MINUTES,
+        memory_limit_mb: float = DEFAULT_MEMORY_LIMIT_MB,
+        spill_file: str = DEFAULT_SPILL_FILE,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.timeout = timeout_minutes * 60
+        self.memory_limit = int(memory_limit_mb * 1024 * 1024)
+        self.spill_file = spill_file.format(pid=os.getpid())
+        self.clock = clock
+        self._sessions: "OrderedDict[str, Session]" = OrderedDict()  # LRU order, oldest first
+        self._bytes = 0
+        self._agent_names: List[Optional[str]] = [None]
+        self._agent_codes: Dict[Optional[str], int] = {None: 0}
+        self._tick = self.timeout / WHEEL_SLOTS
+        self._wheel: List[Set[str]] = [set() for _ in range(WHEEL_SLOTS + 1)]
+        self._wheel_tick = self._tick_of(clock())
+        self._db: Optional[sqlite3.Connection] = None
+        self._spilled = 0
+        self._lock = threading.RLock()
+        self._counters = {"created": 0, "expired": 0, "spilled": 0, "restored": 0, "deleted": 0}
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "SessionStore":
+        """Build from the agent team config (``security`` section)"""
+        security = config.get("security", {})
+        return cls(
+            timeout_minutes=security.get("session_timeout_minutes", DEFAULT_TIMEOUT_MINUTES),
+            memory_limit_mb=security.get("session_memory_limit_mb", DEFAULT_MEMORY_LIMIT_MB),
+            spill_file=security.get("session_spill_file", DEFAULT_SPILL_FILE),
+        )
+
+    # Session access
+
+    def create(self, session_id: Optional[str] = None, user_id: str = "", tenant_id: str = "") -> Session:
+        """Start a new session (replacing any existing one with the same id)"""
+        with self._lock:
+            now = self._advance()
+            session_id = session_id or uuid.uuid4().hex
+            self._remove(session_id)
+            session = Session(session_id, user_id, tenant_id, now)
+            self._sessions[session_id] = session
+            self._bytes += session.approx_bytes
+            self._schedule(session)
+            self._counters["created"] += 1
+            self._enforce_memory_limit()
+            return session
+
+    def get(self, session_id: str) -> Optional[Session]:
+        """Return a live session and mark it active, or None if unknown or expired"""
+        with self._lock:
+            now = self._advance()
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = self._restore(session_id, now)
+                if session is None:
+                    return None
+            else:
+                self._sessions.move_to_end(session_id)
+            session.last_active = now
+            self._schedule(session)
+            return session
+
+    def get_or_create(self, session_id: str, user_id: str = "", tenant_id: str = "") -> Session:
+        with self._lock:
+            session = self.get(session_id)
+            return session if session is not None else self.create(session_id, user_id, tenant_id)
+
+    def append_turn(self, session_id: str, role: str, content: str, agent: Optional[str] = None) -> Session:
+        """
+        Record a turn on a live session
+
+        Raises:
+            KeyError: Session is unknown or expired
+        """
+        with self._lock:
+            session = self.get(session_id)
+            if session is None:
+                raise KeyError(f"Session '{session_id}' not found or expired")
+            before = session.approx_bytes
+            session._append(ROLE_CODES[role], content, session.last_active, self._agent_code(agent))
+            self._bytes += session.approx_bytes - before
+            self._enforce_memory_limit()
+            return session
+
+    def turns(self, session_id: str) -> List[Turn]:
+        """Turns of a session in order (empty if unknown or expired)"""
+        with self._lock:
+            session = self.get(session_id)
+            return list(session.turns(self._agent_names)) if session is not None else []
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            removed = self._remove(session_id)
+            if removed:
+                self._counters["deleted"] += 1
+            return removed
+
+    def __len__(self) -> int:
+        return len(self._sessions) + self._spilled
+
+    # Expiry (timer wheel)
+
+    def _tick_of(self, timestamp: float) -> int:
+        return math.floor(timestamp / self._tick)
+
+    def _schedule(self, session: Session) -> None:
+        """Place a session in the wheel slot of its expiry tick"""
+        if session._slot >= 0:
+            self._wheel[session._slot].discard(session.session_id)
+        # Round up so a session never expires early
+        slot = (self._tick_of(session.last_active + self.timeout) + 1) % len(self._wheel)
+        self._wheel[slot].add(session.session_id)
+        session._slot = slot
+
+    def _advance(self) -> float:
+        """Move the wheel to the current time, evicting sessions in passed slots"""
+        now = self.clock()
+        current = self._tick_of(now)
+        if current <= self._wheel_tick:
+            return now
+        # One full revolution covers every slot; beyond that nothing new can expire
+        for tick in range(self._wheel_tick + 1, min(current, self._wheel_tick + len(self._wheel)) + 1):
+            slot = self._wheel[tick % len(self._wheel)]
+            for session_id in list(slot):
+                session = self._sessions[session_id]
+                if session.last_active + self.timeout <= now:
+                    slot.discard(session_id)
+                    self._drop(session)
+                    self._counters["expired"] += 1
+        self._wheel_tick = current
+        self._expire_spilled(now)
+        return now
+
+    def expire(self) -> int:
+        """Evict expired sessions now; returns the number evicted"""
+        with self._lock:
+            before = self._counters["expired"]
+            self._advance()
+            return self._counters["expired"] - before
+
+    # Memory limit and spill
+
+    def _enforce_memory_limit(self) -> None:
+        while self._bytes > self.memory_limit and len(self._sessions) > 1:
+            _, session = next(iter(self._sessions.items()))
+            self._spill(session)
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            if self.spill_file != ":memory:":
+                Path(self.spill_file).parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(self.spill_file, check_same_thread=False, isolation_level=None)
+            # Spilled sessions are a cache extension and do not outlive the process
+            self._db.execute("PRAGMA journal_mode=OFF")
+            self._db.execute("PRAGMA synchronous=OFF")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS sessions "
+                "(session_id TEXT PRIMARY KEY, last_active REAL NOT NULL, record TEXT NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS sessions_last_active ON sessions (last_active)")
+            self._db.execute("DELETE FROM sessions")
+        return self._db
+
+    def _spill(self, session: Session) -> None:
+        db = self._connect()
+        db.execute(
+            "INSERT OR REPLACE INTO sessions VALUES (?, ?, ?)",
+            (session.session_id, session.last_active, session._to_record(self._agent_names)),
+        )
+        self._drop(session)
+        self._spilled += 1
+        self._counters["spilled"] += 1
+
+    def _restore(self, session_id: str, now: float) -> Optional[Session]:
+        if not self._spilled:
+            return None
+        db = self._connect()
+        row = db.execute(
+            "SELECT last_active, record FROM sessions WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        db.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+        self._spilled -= 1
+        last_active, record = row
+        if last_active + self.timeout <= now:
+            self._counters["expired"] += 1
+            return None
+
+        data = json.loads(record)
+        session = Session(session_id, data["user_id"], data["tenant_id"], data["created_at"])
+        session.last_active = last_active
+        for role, timestamp, agent, content in zip(data["roles"], data["timestamps"], data["agents"], data["contents"]):
+            session._append(role, content, timestamp, self._agent_code(agent))
+        self._sessions[session_id] = session
+        self._bytes += session.approx_bytes
+        self._counters["restored"] += 1
+        self._enforce_memory_limit()
+        return session
+
+    def _expire_spilled(self, now: float) -> None:
+        if not self._spilled:
+            return
+        cursor = self._connect().execute("DELETE FROM sessions WHERE last_active <= ?", (now - self.timeout,))
+        self._spilled -= cursor.rowcount
+        self._counters["expired"] += cursor.rowcount
+
+    # Bookkeeping
+
+    def _agent_code(self, agent: Optional[str]) -> int:
+        code = self._agent_codes.get(agent)
+        if code is None:
+            code = self._agent_codes[agent] = len(self._agent_names)
+            self._agent_names.append(agent)
+        return code
+
+    def _drop(self, session: Session) -> None:
+        """Remove a session from memory (not from the spill file)"""
+        del self._sessions[session.session_id]
+        if session._slot >= 0:
+            self._wheel[session._slot].discard(session.session_id)
+            session._slot = -1
+        self._bytes -= session.approx_bytes
+
+    def _remove(self, session_id: str) -> bool:
+        session = self._sessions.get(session_id)
+        if session is not None:
+            self._drop(session)
+            return True
+        if self._spilled:
+            cursor = self._connect().execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+            self._spilled -= cursor.rowcount
+            return cursor.rowcount > 0
+        return False
+
+    def stats(self) -> Dict[str, Any]:
+        """Live and spilled sessions, memory use and lifecycle counters"""
+        with self._lock:
+            self._advance()
+            live = len(self._sessions)
+            return dict(
+                self._counters,
+                live_sessions=live,
+                spilled_sessions=self._spilled,
+                memory_bytes=self._bytes,
+                memory_limit_bytes=self.memory_limit,
+                bytes_per_session=round(self._bytes / live, 1) if live else 0.0,
+                turns=sum(len(session) for session in self._sessions.values()),
+            )
+
+    def close(self) -> None:
+        """Drop all sessions and remove the spill file"""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+                if self.spill_file != ":memory:":
+                    Path(self.spill_file).unlink(missing_ok=True)
+            self._sessions.clear()
+            for slot in self._wheel:
+                slot.clear()
+            self._bytes = 0
+            self._spilled = 0
@@ -0,0 +1,414 @@
+"""
+Microsoft Copilot Agent Team - Application Insights Telemetry
+
+Telemetry that never adds network latency to a request:
+
+- metrics are pre-aggregated in memory: counters sum, histograms keep
+  count / sum / min / max / sum of squares per name and dimension set
+- custom events are queued in a bounded buffer
+- a background thread ships everything every ``interval`` seconds as one
+  gzip-compressed batch to the Application Insights track endpoint
+- when the endpoint is unreachable or throttling, batches are written to a
+  disk buffer (bounded in size) and resent oldest-first once it recovers
+- ``IngestionStandIn`` is a local ingestion endpoint for development and tests
+
+Configured from APPLICATION_INSIGHTS_KEY (an instrumentation key or a
+connection string) and ``monitoring.application_insights`` in the config.
+
+Usage:
+    from utils.telemetry import configure_telemetry
+
+    telemetry = configure_telemetry(load_config())
+    telemetry.increment("requests", agent="m365_agent")
+    telemetry.observe("request_duration_ms", 182.0, agent="m365_agent")
+    telemetry.track_event("agent.deployed", {"agent_id": "microsoft-troubleshooter"})
+"""
+
+import gzip
+import http.client
+import json
+import logging
+import math
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import deque
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INGESTION_ENDPOINT = "https://dc.services.visualstudio.com"
+TRACK_PATH = "/v2/track"
+DEFAULT_INTERVAL = 15.0
+DEFAULT_BUFFER_DIR = "data/telemetry-buffer"
+DEFAULT_MAX_BUFFER_BYTES = 50 * 1024 * 1024
+DEFAULT_MAX_EVENTS = 10000
+RETRYABLE_STATUS = {408, 429, 439, 500, 502, 503, 504}
+ROLE_NAME = "microsoft-copilot-agent-team"
+
+MetricKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+def parse_connection_string(value: str) -> Tuple[str, str]:
+    """Return (instrumentation_key, ingestion_endpoint) from a key or connection string"""
+    if "=" not in value:
+        return value, DEFAULT_INGESTION_ENDPOINT
+    parts = {}
+    for part in value.split(";"):
+        if "=" in part:
+            key, val = part.split("=", 1)
+            parts[key.strip().lower()] = val.strip()
+    endpoint = parts.get("ingestionendpoint", DEFAULT_INGESTION_ENDPOINT).rstrip("/")
+    return parts.get("instrumentationkey", ""), endpoint
+
+
+class TelemetryClient:
+    """
+    Pre-aggregating, batching Application Insights client.
+
+    Args:
+        instrumentation_key: Application Insights instrumentation key
+        endpoint: Ingestion endpoint base URL (``/v2/track`` is appended)
+        interval: Seconds between batch sends
+        buffer_dir: Where unsent batches are kept while offline
+        max_buffer_bytes: Disk buffer cap; the oldest batches are dropped beyond it
+        max_events: Events held in memory between sends
+        timeout: HTTP timeout for a send
+    """
+
+    def __init__(
+        self,
+        instrumentation_key: str,
+        endpoint: str = DEFAULT_INGESTION_ENDPOINT,
+        interval: float = DEFAULT_INTERVAL,
+        buffer_dir: str = DEFAULT_BUFFER_DIR,
+        max_buffer_bytes: int = DEFAULT_MAX_BUFFER_BYTES,
+        max_events: int = DEFAULT_MAX_EVENTS,
+        timeout: float = 5.0,
+        start: bool = True,
+    ):
+        self.instrumentation_key = instrumentation_key
+        self.url = endpoint.rstrip("/") + TRACK_PATH
+        self.interval = interval
+        self.buffer_dir = Path(buffer_dir)
+        self.max_buffer_bytes = max_buffer_bytes
+        self.timeout = timeout
+        self._counters: Dict[MetricKey, float] = {}
+        self._histograms: Dict[MetricKey, List[float]] = {}
+        self._events: Deque[Dict[str, Any]] = deque(maxlen=max_events)
+        self._lock = threading.Lock()
+        self._sequence = 0
+        self._stats = {"batches_sent": 0, "batches_buffered": 0, "batches_dropped": 0, "send_failures": 0}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        if start:
+            self._thread = threading.Thread(target=self._run, name="telemetry", daemon=True)
+            self._thread.start()
+
+    # Recording (request path: dictionary updates only)
+
+    @staticmethod
+    def _key(name: str, dimensions: Dict[str, Any]) -> MetricKey:
+        return name, tuple(sorted((k, str(v)) for k, v in dimensions.items()))
+
+    def increment(self, name: str, value: float = 1, **dimensions) -> None:
+        """Add to a counter"""
+        key = self._key(name, dimensions)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **dimensions) -> None:
+        """Record a histogram observation (e.g. a duration)"""
+        key = self._key(name, dimensions)
+        with self._lock:
+            aggregate = self._histograms.get(key)
+            if aggregate is None:
+                self._histograms[key] = [1, value, value, value, value * value]
+            else:
+                aggregate[0] += 1
+                aggregate[1] += value
+                if value < aggregate[2]:
+                    aggregate[2] = value
+                if value > aggregate[3]:
+                    aggregate[3] = value
+                aggregate[4] += value * value
+
+    def track_event(self, name: str, properties: Optional[Dict[str, Any]] = None,
+                    measurements: Optional[Dict[str, float]] = None) -> None:
+        """Queue a custom event"""
+        self._events.append({
+            "time": time.time(), "name": name,
+            "properties": {k: str(v) for k, v in (properties or {}).items()},
+            "measurements": dict(measurements or {}),
+        })
+
+    # Batching
+
+    def _collect(self) -> List[Dict[str, Any]]:
+        """Swap out the current aggregates and turn them into envelopes"""
+        with self._lock:
+            counters, self._counters = self._counters, {}
+            histograms, self._histograms = self._histograms, {}
+        events = []
+        while self._events:
+            events.append(self._events.popleft())
+
+        now = _iso(time.time())
+        items = []
+        for (name, dims), value in counters.items():
+            items.append(self._metric_envelope(now, name, dims, {"value": value, "count": 1, "kind": 0}))
+        for (name, dims), (count, total, low, high, squares) in histograms.items():
+            variance = max(0.0, squares / count - (total / count) ** 2)
+            items.append(self._metric_envelope(now, name, dims, {
+                "value": total, "count": count, "min": low, "max": high,
+                "stdDev": math.sqrt(variance), "kind": 1,
+            }))
+        for event in events:
+            items.append(self._envelope(_iso(event["time"]), "Event", "EventData", {
+                "ver": 2, "name": event["name"],
+                "properties": event["properties"], "measurements": event["measurements"],
+            }))
+        return items
+
+    def _metric_envelope(self, now: str, name: str, dims, point: Dict[str, Any]) -> Dict[str, Any]:
+        return self._envelope(now, "Metric", "MetricData", {
+            "ver": 2,
+            "metrics": [dict(point, name=name)],  # kind 0 = measurement, 1 = aggregation
+            "properties": dict(dims),
+        })
+
+    def _envelope(self, timestamp: str, item_type: str, base_type: str, base_data: Dict[str, Any]) -> Dict[str, Any]:
+        ikey = self.instrumentation_key.replace("-", "")
+        return {
+            "name": f"Microsoft.ApplicationInsights.{ikey}.{item_type}",
+            "time": timestamp,
+            "iKey": self.instrumentation_key,
+            "tags": {"ai.cloud.role": ROLE_NAME},
+            "data": {"baseType": base_type, "baseData": base_data},
+        }
+
+    def flush(self) -> bool:
+        """Send everything aggregated so far plus any buffered batches; True if all were delivered"""
+        items = self._collect()
+        payload = gzip.compress("\n".join(json.dumps(item) for item in items).encode("utf-8")) if items else None
+        delivered = self._send_buffered()
+        if payload is None:
+            return delivered
+        if delivered and self._post(payload):
+            self._stats["batches_sent"] += 1
+            return True
+        self._buffer(payload)
+        return False
+
+    def _post(self, payload: bytes) -> bool:
+        try:
+            request = urllib.request.Request(
+                self.url, data=payload, method="POST",
+                headers={"Content-Type": "application/x-json-stream", "Content-Encoding": "gzip"},
+            )
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                response.read()
+            return True
+        except urllib.error.HTTPError as e:
+            self._stats["send_failures"] += 1
+            if e.code not in RETRYABLE_STATUS:
+                # Rejected as malformed: resending would fail the same way
+                logger.warning("Telemetry batch rejected by %s: HTTP %s", self.url, e.code)
+                return True
+            return False
+        except (OSError, http.client.HTTPException) as e:
+            self._stats["send_failures"] += 1
+            logger.debug("Telemetry endpoint %s unavailable: %s", self.url, e)
+            return False
+        except ValueError as e:
+            # Malformed endpoint URL: keep the batch buffered until the configuration is fixed
+            self._stats["send_failures"] += 1
+            logger.warning("Telemetry endpoint %s is invalid: %s", self.url, e)
+            return False
+
+    # Disk buffer
+
+    def _buffer(self, payload: bytes) -> None:
+        self.buffer_dir.mkdir(parents=True, exist_ok=True)
+        self._sequence += 1
+        path = self.buffer_dir / f"{time.time_ns():020d}-{os.getpid()}-{self._sequence}.json.gz"
+        tmp = path.with_suffix(".tmp")
+        tmp.write_bytes(payload)
+        os.replace(tmp, path)
+        self._stats["batches_buffered"] += 1
+
+        files = self._buffered_files()
+        total = sum(f.stat().st_size for f in files)
+        for old in files:
+            if total <= self.max_buffer_bytes:
+                break
+            total -= old.stat().st_size
+            old.unlink(missing_ok=True)
+            self._stats["batches_dropped"] += 1
+
+    def _buffered_files(self) -> List[Path]:
+        if not self.buffer_dir.exists():
+            return []
+        return sorted(self.buffer_dir.glob("*.json.gz"))
+
+    def _send_buffered(self) -> bool:
+        for path in self._buffered_files():
+            try:
+                payload = path.read_bytes()
+            except OSError:
+                continue
+            if not self._post(payload):
+                return False
+            path.unlink(missing_ok=True)
+            self._stats["batches_sent"] += 1
+        return True
+
+    # Lifecycle
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.flush()
+            except Exception as e:  # never let the exporter thread die
+                logger.warning("Telemetry flush failed: %s", e)
+
+    def close(self) -> None:
+        """Stop the background thread and send (or buffer) what is left"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(self.timeout)
+            if self._thread.is_alive():
+                # Still sending; a second flush would race it for the same data
+                logger.warning("Telemetry thread did not stop within %.1fs; skipping final flush", self.timeout)
+                return
+        self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        return dict(self._stats, buffered_batches=len(self._buffered_files()))
+
+
+def _iso(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+class NullTelemetry:
+    """Drop-in client used when telemetry is disabled"""
+
+    def increment(self, name: str, value: float = 1, **dimensions) -> None:
+        pass
+
+    def observe(self, name: str, value: float, **dimensions) -> None:
+        pass
+
+    def track_event(self, name: str, properties=None, measurements=None) -> None:
+        pass
+
+    def flush(self) -> bool:
+        return True
+
+    def close(self) -> None:
+        pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {}
+
+
+_telemetry: Any = NullTelemetry()
+
+
+def get_telemetry() -> Any:
+    """Process-wide telemetry client (a no-op until ``configure_telemetry``)"""
+    return _telemetry
+
+
+def configure_telemetry(config: Optional[Dict[str, Any]] = None, **options) -> Any:
+    """
+    Create the process-wide client from APPLICATION_INSIGHTS_KEY.
+
+    Telemetry stays disabled when the key is missing or the config sets
+    ``monitoring.application_insights`` to false. APPLICATION_INSIGHTS_ENDPOINT
+    overrides the ingestion endpoint (e.g. the local stand-in). Remaining
+    data is sent at interpreter exit.
+    """
+    import atexit
+
+    global _telemetry
+    enabled = (config or {}).get("monitoring", {}).get("application_insights", True)
+    key = os.getenv("APPLICATION_INSIGHTS_KEY", "")
+    if not enabled or not key or key.startswith("your-"):
+        _telemetry = NullTelemetry()
+        return _telemetry
+
+    instrumentation_key, endpoint = parse_connection_string(key)
+    endpoint = os.getenv("APPLICATION_INSIGHTS_ENDPOINT") or endpoint
+    _telemetry = TelemetryClient(instrumentation_key, endpoint, **options)
+    atexit.register(_telemetry.close)
+    return _telemetry
+
+
+class IngestionStandIn:
+    """
+    Local stand-in for the Application Insights ingestion endpoint.
+
+    Accepts gzip or plain JSON (array or newline-delimited) on ``/v2/track``
+    and keeps received envelopes in ``items``. Set ``available = False`` to
+    answer 503 and exercise offline buffering.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.items: List[Dict[str, Any]] = []
+        self.requests = 0
+        self.available = True
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                if self.path != TRACK_PATH:
+                    self.send_error(404)
+                    return
+                stand_in.requests += 1
+                if not stand_in.available:
+                    self.send_error(503)
+                    return
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                if self.headers.get("Content-Encoding") == "gzip":
+                    body = gzip.decompress(body)
+                text = body.decode("utf-8").strip()
+                try:
+                    items = json.loads(text) if text.startswith("[") else [
+                        json.loads(line) for line in text.splitlines() if line.strip()
+                    ]
+                except ValueError as e:
+                    self.send_error(400, str(e))
+                    return
+                stand_in.items.extend(items)
+                response = json.dumps({"itemsReceived": len(items), "itemsAccepted": len(items), "errors": []})
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.end_headers()
+                self.wfile.write(response.encode("utf-8"))
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def endpoint(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "IngestionStandIn":
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,427 @@
+"""
+Microsoft Copilot Agent Team - Cached Entra ID Token Provider
+
+Caches access tokens per (tenant, client, scope) in memory and in an encrypted
+on-disk cache shared by every script process on the machine. Tokens are
+refreshed in the background before they expire, and concurrent requests for
+the same token share a single acquisition, so parallel deploys and test
+workers do not each pay for a token round trip.
+
+Usage:
+    from utils.token_cache import get_provider
+
+    provider = get_provider()          # reads TENANT_ID / CLIENT_ID / CLIENT_SECRET
+    token = provider.get_token("https://graph.microsoft.com/.default")
+    headers = {"Authorization": f"Bearer {token.token}"}
+
+The provider implements the azure-core ``TokenCredential`` protocol, so it can
+be passed anywhere azure-identity credentials are accepted (e.g. msgraph-sdk).
+"""
+
+import base64
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterator, Optional, Set, Tuple
+
+try:
+    from azure.core.credentials import AccessToken
+except ImportError:  # azure-identity not installed; keep the same shape
+    AccessToken = namedtuple("AccessToken", ["token", "expires_on"])
+
+try:
+    from cryptography.fernet import Fernet, InvalidToken
+except ImportError:
+    Fernet = None
+    InvalidToken = Exception
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_FILE = "data/.token-cache.bin"
+DEFAULT_REFRESH_MARGIN_SECONDS = 300
+DEFAULT_MIN_VALIDITY_SECONDS = 30
+# Floor for the refresh delay, so short-lived tokens are not refreshed in a tight loop
+MIN_REFRESH_DELAY_SECONDS = 1.0
+
+_FILE_MAGIC = b"CTC1"
+_SALT_SIZE = 16
+_KDF_ITERATIONS = 100_000
+
+TokenKey = Tuple[str, str, str]
+Acquirer = Callable[..., AccessToken]
+
+
+class EncryptedTokenStore:
+    """
+    Encrypted token file shared between processes.
+
+    The file holds a JSON map of cache key -> token, encrypted with a Fernet
+    key derived from a secret (the client secret or ``TOKEN_CACHE_KEY``).
+    Readers and writers serialize on an advisory lock file next to it.
+    """
+
+    def __init__(self, path: Path, secret: str):
+        self.path = Path(path)
+        self._lock_path = self.path.with_name(self.path.name + ".lock")
+        self._secret = secret.encode("utf-8")
+        self._fernets: Dict[bytes, "Fernet"] = {}
+
+    def _fernet(self, salt: bytes) -> "Fernet":
+        fernet = self._fernets.get(salt)
+        if fernet is None:
+            key = hashlib.pbkdf2_hmac("sha256", self._secret, salt, _KDF_ITERATIONS, 32)
+            fernet = Fernet(base64.urlsafe_b64encode(key))
+            self._fernets[salt] = fernet
+        return fernet
+
+    @contextmanager
+    def locked(self) -> Iterator[None]:
+        """Hold the cross-process lock for a read-modify-write cycle."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(str(self._lock_path), os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            _lock_fd(fd)
+            try:
+                yield
+            finally:
+                _unlock_fd(fd)
+        finally:
+            os.close(fd)
+
+    def load(self) -> Dict[str, AccessToken]:
+        """Read and decrypt all entries. Unreadable files yield an empty cache."""
+        try:
+            blob = self.path.read_bytes()
+        except FileNotFoundError:
+            return {}
+        if not blob.startswith(_FILE_MAGIC):
+            return {}
+        salt = blob[len(_FILE_MAGIC):len(_FILE_MAGIC) + _SALT_SIZE]
+        try:
+            payload = self._fernet(salt).decrypt(blob[len(_FILE_MAGIC) + _SALT_SIZE:])
+            raw = json.loads(payload.decode("utf-8"))
+        except (InvalidToken, ValueError):
+            logger.warning("Token cache %s could not be decrypted; ignoring it", self.path)
+            return {}
+        return {key: AccessToken(entry["token"], int(entry["expires_on"])) for key, entry in raw.items()}
+
+    def save(self, entries: Dict[str, AccessToken]) -> None:
+        """Encrypt and atomically replace the cache file, dropping expired tokens."""
+        now = time.time()
+        raw = {
+            key: {"token": token.token, "expires_on": token.expires_on}
+            for key, token in entries.items()
+            if token.expires_on > now
+        }
+        salt = os.urandom(_SALT_SIZE)
+        blob = _FILE_MAGIC + salt + self._fernet(salt).encrypt(json.dumps(raw).encode("utf-8"))
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        fd = os.open(str(tmp_path), os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            f.write(blob)
+        os.replace(tmp_path, self.path)
+
+
+class _InflightCall:
+    """A token acquisition other threads can wait on."""
+
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Optional[AccessToken] = None
+        self.error: Optional[BaseException] = None
+
+
+class CachedTokenProvider:
+    """
+    Token provider with memory + shared disk caching and proactive refresh.
+
+    Args:
+        tenant_id: Entra ID tenant
+        client_id: App registration client ID
+        client_secret: Client secret; when absent, DefaultAzureCredential is used
+        cache_file: Encrypted shared cache location (None disables disk caching)
+        cache_key: Secret used to encrypt the cache; defaults to the client secret
+        refresh_margin: Seconds before expiry at which tokens are refreshed
+        acquirer: Callable ``(*scopes) -> AccessToken``; defaults to azure-identity
+    """
+
+    def __init__(
+        self,
+        tenant_id: str,
+        client_id: str,
+        client_secret: Optional[str] = None,
+        cache_file: Optional[str] = DEFAULT_CACHE_FILE,
+        cache_key: Optional[str] = None,
+        refresh_margin: float = DEFAULT_REFRESH_MARGIN_SECONDS,
+        acquirer: Optional[Acquirer] = None,
+    ):
+        self.tenant_id = tenant_id
+        self.client_id = client_id
+        self.refresh_margin = refresh_margin
+        self._client_secret = client_secret
+        self._acquirer = acquirer
+        self._lock = threading.Lock()
+        self._memory: Dict[TokenKey, AccessToken] = {}
+        self._inflight: Dict[TokenKey, _InflightCall] = {}
+        self._timers: Dict[TokenKey, threading.Timer] = {}
+        self._refresh_at: Dict[TokenKey, float] = {}
+        self._refreshing: Set[TokenKey] = set()
+        self._closed = False
+        self._stats = {"hits": 0, "disk_hits": 0, "acquisitions": 0, "coalesced": 0, "background_refreshes": 0}
+        self._store = self._open_store(cache_file, cache_key or client_secret)
+
+    @classmethod
+    def from_environment(cls, **kwargs) -> "CachedTokenProvider":
+        """Build a provider from TENANT_ID, CLIENT_ID, CLIENT_SECRET and TOKEN_CACHE_* variables."""
+        tenant_id = os.getenv("TENANT_ID")
+        if not tenant_id:
+            raise ValueError("TENANT_ID is not set")
+        kwargs.setdefault("cache_file", os.getenv("TOKEN_CACHE_FILE", DEFAULT_CACHE_FILE))
+        kwargs.setdefault("cache_key", os.getenv("TOKEN_CACHE_KEY"))
+        return cls(tenant_id, os.getenv("CLIENT_ID", ""), os.getenv("CLIENT_SECRET"), **kwargs)
+
+    def _open_store(self, cache_file: Optional[str], secret: Optional[str]) -> Optional[EncryptedTokenStore]:
+        if not cache_file:
+            return None
+        if Fernet is None:
+            logger.warning("cryptography is not installed; token cache is memory-only")
+            return None
+        if not secret:
+            logger.warning("No CLIENT_SECRET or TOKEN_CACHE_KEY; token cache is memory-only")
+            return None
+        return EncryptedTokenStore(Path(cache_file), secret)
+
+    # ------------------------------------------------------------------
+    # TokenCredential protocol
+    # ------------------------------------------------------------------
+
+    def get_token(self, *scopes: str, **kwargs) -> AccessToken:
+        """
+        Return a valid access token for the given scopes.
+
+        Served from memory when possible; a token inside the refresh margin is
+        returned immediately while a background refresh replaces it.
+        """
+        if not scopes:
+            raise ValueError("At least one scope is required")
+        key = self._key(scopes)
+        now = time.time()
+        with self._lock:
+            token = self._memory.get(key)
+            if token is not None and token.expires_on - now > DEFAULT_MIN_VALIDITY_SECONDS:
+                self._stats["hits"] += 1
+                if self._refresh_due(key, token, now):
+                    self._refresh_in_background(key, scopes)
+                return token
+        return self._acquire_coalesced(key, scopes)
+
+    def close(self) -> None:
+        """Cancel pending background refreshes."""
+        with self._lock:
+            self._closed = True
+            timers = list(self._timers.values())
+            self._timers.clear()
+        for timer in timers:
+            timer.cancel()
+
+    def __enter__(self) -> "CachedTokenProvider":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def stats(self) -> Dict[str, int]:
+        """Cache counters plus the number of tokens held in memory."""
+        with self._lock:
+            return dict(self._stats, cached_tokens=len(self._memory))
+
+    # ------------------------------------------------------------------
+    # Acquisition
+    # ------------------------------------------------------------------
+
+    def _key(self, scopes: Tuple[str, ...]) -> TokenKey:
+        return (self.tenant_id, self.client_id, " ".join(sorted(scopes)))
+
+    def _usable_shared(self, key: TokenKey, token: Optional[AccessToken]) -> bool:
+        """
+        A token from the shared cache is used while it is still valid and, when
+        refreshing, only if it is newer than the one held in memory. Its
+        refresh point is then scheduled like any other token's, so tokens that
+        live shorter than the refresh margin are reused too.
+        """
+        if token is None or token.expires_on - time.time() <= DEFAULT_MIN_VALIDITY_SECONDS:
+            return False
+        with self._lock:
+            current = self._memory.get(key)
+        return current is None or token.expires_on > current.expires_on
+
+    def _refresh_due(self, key: TokenKey, token: AccessToken, now: float) -> bool:
+        return now >= self._refresh_at.get(key, token.expires_on - self.refresh_margin)
+
+    def _acquire_coalesced(self, key: TokenKey, scopes: Tuple[str, ...]) -> AccessToken:
+        """Acquire a token, letting concurrent callers for the same key share one call."""
+        with self._lock:
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = self._inflight[key] = _InflightCall()
+            else:
+                self._stats["coalesced"] += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = self._acquire_shared(key, scopes)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+                if call.result is not None:
+                    self._memory[key] = call.result
+                    self._schedule_refresh(key, scopes, call.result)
+            call.done.set()
+
+    def _acquire_shared(self, key: TokenKey, scopes: Tuple[str, ...]) -> AccessToken:
+        """Use a token another process already cached, or acquire and publish one."""
+        if self._store is None:
+            return self._acquire(scopes)
+
+        # The file lock covers the read and the write only, never the network call
+        disk_key = "|".join(key)
+        with self._store.locked():
+            shared = self._store.load().get(disk_key)
+        if self._usable_shared(key, shared):
+            with self._lock:
+                self._stats["disk_hits"] += 1
+            return shared
+
+        token = self._acquire(scopes)
+        with self._store.locked():
+            entries = self._store.load()
+            published = entries.get(disk_key)
+            if published is None or published.expires_on < token.expires_on:
+                entries[disk_key] = token
+                self._store.save(entries)
+        return token
+
+    def _acquire(self, scopes: Tuple[str, ...]) -> AccessToken:
+        if self._acquirer is None:
+            self._acquirer = self._default_acquirer()
+        with self._lock:
+            self._stats["acquisitions"] += 1
+        token = self._acquirer(*scopes)
+        return AccessToken(token.token, int(token.expires_on))
+
+    def _default_acquirer(self) -> Acquirer:
+        from azure.identity import ClientSecretCredential, DefaultAzureCredential
+
+        if self._client_secret:
+            credential = ClientSecretCredential(self.tenant_id, self.client_id, self._client_secret)
+        else:
+            credential = DefaultAzureCredential()
+        return credential.get_token
+
+    # ------------------------------------------------------------------
+    # Background refresh (callers hold self._lock)
+    # ------------------------------------------------------------------
+
+    def _schedule_refresh(self, key: TokenKey, scopes: Tuple[str, ...], token: AccessToken) -> None:
+        if self._closed:
+            return
+        previous = self._timers.pop(key, None)
+        if previous is not None:
+            previous.cancel()
+        remaining = token.expires_on - time.time()
+        # Tokens that live shorter than the margin are refreshed halfway through their lifetime
+        delay = max(remaining - self.refresh_margin, remaining / 2, MIN_REFRESH_DELAY_SECONDS)
+        self._refresh_at[key] = time.time() + delay
+        timer = threading.Timer(delay, self._on_refresh_timer, args=(key, scopes))
+        timer.daemon = True
+        self._timers[key] = timer
+        timer.start()
+
+    def _refresh_in_background(self, key: TokenKey, scopes: Tuple[str, ...]) -> None:
+        if key in self._inflight or key in self._refreshing or self._closed:
+            return
+        self._refreshing.add(key)
+        thread = threading.Thread(target=self._background_refresh, args=(key, scopes), daemon=True)
+        thread.start()
+
+    def _on_refresh_timer(self, key: TokenKey, scopes: Tuple[str, ...]) -> None:
+        with self._lock:
+            if self._closed or key in self._refreshing:
+                return
+            self._refreshing.add(key)
+        self._background_refresh(key, scopes)
+
+    def _background_refresh(self, key: TokenKey, scopes: Tuple[str, ...]) -> None:
+        """Refresh one token; only one refresh per key runs at a time (see ``_refreshing``)."""
+        try:
+            with self._lock:
+                token = self._memory.get(key)
+                if self._closed or (token is not None and not self._refresh_due(key, token, time.time())):
+                    return
+                self._stats["background_refreshes"] += 1
+            self._acquire_coalesced(key, scopes)
+        except Exception as e:  # the cached token stays valid until expiry
+            logger.warning("Background token refresh failed for %s: %s", key[2], e)
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+
+_providers: Dict[Tuple[str, str], CachedTokenProvider] = {}
+_providers_lock = threading.Lock()
+
+
+def get_provider(tenant_id: Optional[str] = None, client_id: Optional[str] = None) -> CachedTokenProvider:
+    """
+    Return the process-wide provider for a tenant/client pair.
+
+    Defaults to TENANT_ID / CLIENT_ID from the environment, so every module in
+    a script run shares one in-memory cache.
+    """
+    tenant_id = tenant_id or os.getenv("TENANT_ID", "")
+    client_id = client_id or os.getenv("CLIENT_ID", "")
+    with _providers_lock:
+        provider = _providers.get((tenant_id, client_id))
+        if provider is None:
+            if (tenant_id, client_id) == (os.getenv("TENANT_ID", ""), os.getenv("CLIENT_ID", "")):
+                provider = CachedTokenProvider.from_environment()
+            else:
+                provider = CachedTokenProvider(tenant_id, client_id)
+            _providers[(tenant_id, client_id)] = provider
+        return provider
+
+
+if os.name == "nt":
+    import msvcrt
+
+    def _lock_fd(fd: int) -> None:
+        msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+
+    def _unlock_fd(fd: int) -> None:
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+else:
+    import fcntl
+
+    def _lock_fd(fd: int) -> None:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+
+    def _unlock_fd(fd: int) -> None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
@@ -0,0 +1,194 @@
+"""
+Microsoft Copilot Agent Team - Tool Registry
+
+Indexed implementation of the ``ToolRegistry`` from
+docs/TOOL-INVOCATION-STANDARD.md:
+
+- tools are keyed by (name, platform), so ``get_tool`` is a dict lookup
+  rather than string building and fallbacks over every registered class
+- (category, platform) indexes are maintained at registration time, so
+  ``list_tools`` never scans the full registry; each listing is built once
+  and cached until the next registration
+- one configured instance per (tool, platform) is created on first use and
+  reused, guarded by a lock for concurrent callers
+- platform implementation modules can be registered for lazy import; they are
+  imported the first time that platform is resolved
+
+Usage:
+    from utils.tool_registry import registry
+
+    @registry.register
+    class MicrosoftCalendarTool(CalendarCreateEventTool):
+        metadata = ToolMetadata(name="calendar.create_event", platform="microsoft", ...)
+
+    registry.add_platform_module("google_cloud", "tools.google_calendar")
+    tool = registry.get_tool("calendar.create_event", "microsoft")
+"""
+
+import importlib
+import threading
+from typing import Dict, List, Optional, Tuple, Type
+
+from utils.tools import ITool, ToolErrorCode, ToolMetadata
+
+UNIVERSAL_PLATFORM = "universal"
+
+ToolKey = Tuple[str, str]
+IndexKey = Tuple[Optional[str], Optional[str]]
+
+
+class ToolNotFoundError(ValueError):
+    """Raised when no implementation of a tool exists for a platform"""
+
+    code = ToolErrorCode.TOOL_NOT_FOUND
+
+    def __init__(self, tool_name: str, platform: str):
+        super().__init__(f"Tool {tool_name} not found for platform {platform}")
+        self.tool_name = tool_name
+        self.platform = platform
+
+
+def _index_keys(metadata: ToolMetadata) -> Tuple[IndexKey, ...]:
+    return (
+        (None, None),
+        (metadata.category, None),
+        (None, metadata.platform),
+        (metadata.category, metadata.platform),
+    )
+
+
+class ToolRegistry:
+    """Registry of tool classes with indexed lookups and cached instances"""
+
+    def __init__(self):
+        self._classes: Dict[ToolKey, Type[ITool]] = {}
+        self._index: Dict[IndexKey, List[ToolMetadata]] = {}
+        self._instances: Dict[ToolKey, ITool] = {}
+        self._listings: Dict[IndexKey, List[ToolMetadata]] = {}
+        self._pending_modules: Dict[str, List[str]] = {}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._classes)
+
+    def register(self, tool_class: Type[ITool]) -> Type[ITool]:
+        """
+        Decorator to register a tool class under its metadata name and platform
+
+        Usage:
+            @registry.register
+            class CalendarCreateEventTool(ITool):
+                ...
+        """
+        metadata = tool_class.metadata
+        key = (metadata.name, metadata.platform)
+        with self._lock:
+            previous = self._classes.get(key)
+            if previous is not None:
+                for index_key in _index_keys(previous.metadata):
+                    self._index[index_key] = [m for m in self._index[index_key] if m is not previous.metadata]
+            self._classes[key] = tool_class
+            self._instances.pop(key, None)
+            self._listings.clear()
+            for index_key in _index_keys(metadata):
+                self._index.setdefault(index_key, []).append(metadata)
+        return tool_class
+
+    def add_platform_module(self, platform: str, module_name: str) -> None:
+        """Import ``module_name`` (which registers tools) the first time ``platform`` is used"""
+        with self._lock:
+            self._pending_modules.setdefault(platform, []).append(module_name)
+
+    def _load_platform(self, platform: Optional[str]) -> None:
+        if not self._pending_modules:
+            return
+        with self._lock:
+            platforms = list(self._pending_modules) if platform is None else [platform, UNIVERSAL_PLATFORM]
+            for name in platforms:
+                pending = self._pending_modules.get(name, [])
+                # A module stays pending until its import succeeds, so a failed
+                # import is retried on the next lookup
+                while pending:
+                    importlib.import_module(pending[0])
+                    pending.pop(0)
+                self._pending_modules.pop(name, None)
+
+    def get_tool(self, tool_name: str, platform: str) -> ITool:
+        """
+        Get tool instance for platform
+
+        Returns the platform-specific implementation if registered, otherwise
+        the universal implementation configured for the platform. Instances
+        are created once and shared.
+
+        Raises:
+            ToolNotFoundError: Neither implementation exists
+        """
+        key = (tool_name, platform)
+        instance = self._instances.get(key)
+        if instance is not None:
+            return instance
+
+        self._load_platform(platform)
+        with self._lock:
+            instance = self._instances.get(key)
+            if instance is not None:
+                return instance
+            tool_class = self._classes.get(key)
+            if tool_class is not None:
+                instance = tool_class()
+            else:
+                tool_class = self._classes.get((tool_name, UNIVERSAL_PLATFORM))
+                if tool_class is None:
+                    raise ToolNotFoundError(tool_name, platform)
+                instance = tool_class()
+                configure = getattr(instance, "configure_platform", None)
+                if configure is not None:
+                    configure(platform)
+            self._instances[key] = instance
+            return instance
+
+    def get_tool_class(self, tool_name: str, platform: str) -> Optional[Type[ITool]]:
+        """Return the registered class for exactly (tool_name, platform), if any"""
+        self._load_platform(platform)
+        return self._classes.get((tool_name, platform))
+
+    def list_tools(
+        self,
+        category: Optional[str] = None,
+        platform: Optional[str] = None
+    ) -> List[ToolMetadata]:
+        """
+        List registered tools, optionally filtered
+
+        A platform filter also includes universal tools, as those can be
+        configured for any platform, unless the platform has its own
+        implementation of the same tool (which is what ``get_tool`` returns).
+        """
+        self._load_platform(platform)
+        listing = self._listings.get((category, platform))
+        if listing is None:
+            with self._lock:
+                listing = self._listings[(category, platform)] = self._build_listing(category, platform)
+        return list(listing)
+
+    def _build_listing(self, category: Optional[str], platform: Optional[str]) -> List[ToolMetadata]:
+        entries = self._index.get((category, platform), [])
+        if platform is None or platform == UNIVERSAL_PLATFORM:
+            return list(entries)
+        names = {metadata.name for metadata in entries}
+        universal = self._index.get((category, UNIVERSAL_PLATFORM), [])
+        return entries + [metadata for metadata in universal if metadata.name not in names]
+
+    def clear(self) -> None:
+        """Remove all tools, cached instances and pending modules"""
+        with self._lock:
+            self._classes.clear()
+            self._index.clear()
+            self._instances.clear()
+            self._listings.clear()
+            self._pending_modules.clear()
+
+
+# Process-wide registry; tools register with ``@registry.register``
+registry = ToolRegistry()
@@ -0,0 +1,122 @@
+"""
+Microsoft Copilot Agent Team - Standard Tool Interface
+
+Python definitions of the universal tool interface and error model from
+docs/TOOL-INVOCATION-STANDARD.md, shared by the tool registry, invocation
+middleware and diagnostics.
+"""
+
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Dict, Optional, Tuple
+
+
+class ToolType(Enum):
+    """Tool implementation type"""
+    PLATFORM_NATIVE = "platform_native"  # ⭐ Built into cloud platform
+    SELF_BUILT = "self_built"            # 🔧 Custom implementation
+    THIRD_PARTY = "third_party"          # 🔌 External service integration
+
+
+@dataclass
+class ToolMetadata:
+    """Standard metadata for all tools"""
+    name: str                           # Unique tool identifier (e.g., "calendar.create_event")
+    category: str                       # Tool category (e.g., "calendar", "email", "storage")
+    description: str                    # Human-readable description
+    tool_type: ToolType                 # Implementation type
+    platform: str                       # "microsoft", "google_cloud", "aws", "claude", "universal"
+    version: str                        # Semantic version (e.g., "1.0.0")
+    parameters: Dict[str, Any]          # Parameter schema (JSON Schema format)
+    authentication_required: bool       # Whether authentication is needed
+    rate_limits: Optional[Dict[str, int]] = None  # Rate limiting info
+    idempotent: bool = False            # Read-only; identical calls may be coalesced and memoized
+
+
+class ITool(ABC):
+    """
+    Universal tool interface
+    All platform-specific tools must implement this interface
+    """
+
+    metadata: ToolMetadata
+
+    @abstractmethod
+    async def invoke(
+        self,
+        parameters: Dict[str, Any],
+        auth_context: Optional[Dict[str, Any]] = None,
+        execution_context: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Invoke the tool with given parameters
+
+        Returns:
+            Standardized response with "success", "data", "metadata" and
+            "error" keys (see TOOL-INVOCATION-STANDARD.md)
+        """
+
+    async def validate_parameters(self, parameters: Dict[str, Any]) -> Tuple[bool, Optional[str]]:
+        """Validate parameters against schema, returning (is_valid, error_message)"""
+        return True, None
+
+    async def health_check(self) -> bool:
+        """Check if tool is operational"""
+        return True
+
+
+class ToolErrorCode(Enum):
+    """Standardized error codes across all platforms"""
+
+    # Authentication Errors (1xxx)
+    AUTHENTICATION_FAILED = "AUTHENTICATION_FAILED"
+    AUTHENTICATION_EXPIRED = "AUTHENTICATION_EXPIRED"
+    INSUFFICIENT_PERMISSIONS = "INSUFFICIENT_PERMISSIONS"
+
+    # Validation Errors (2xxx)
+    INVALID_PARAMETERS = "INVALID_PARAMETERS"
+    MISSING_REQUIRED_PARAMETER = "MISSING_REQUIRED_PARAMETER"
+    PARAMETER_OUT_OF_RANGE = "PARAMETER_OUT_OF_RANGE"
+
+    # Platform Errors (3xxx)
+    PLATFORM_SERVICE_UNAVAILABLE = "PLATFORM_SERVICE_UNAVAILABLE"
+    PLATFORM_RATE_LIMIT_EXCEEDED = "PLATFORM_RATE_LIMIT_EXCEEDED"
+    PLATFORM_QUOTA_EXCEEDED = "PLATFORM_QUOTA_EXCEEDED"
+
+    # Resource Errors (4xxx)
+    RESOURCE_NOT_FOUND = "RESOURCE_NOT_FOUND"
+    RESOURCE_ALREADY_EXISTS = "RESOURCE_ALREADY_EXISTS"
+    RESOURCE_CONFLICT = "RESOURCE_CONFLICT"
+
+    # Network Errors (5xxx)
+    NETWORK_TIMEOUT = "NETWORK_TIMEOUT"
+    NETWORK_CONNECTION_ERROR = "NETWORK_CONNECTION_ERROR"
+
+    # Tool Errors (6xxx)
+    TOOL_NOT_FOUND = "TOOL_NOT_FOUND"
+    TOOL_NOT_IMPLEMENTED = "TOOL_NOT_IMPLEMENTED"
+    TOOL_EXECUTION_FAILED = "TOOL_EXECUTION_FAILED"
+
+    # Unknown Errors (9xxx)
+    UNKNOWN_ERROR = "UNKNOWN_ERROR"
+
+
+@dataclass
+class ToolError:
+    """Standard error structure"""
+    code: ToolErrorCode
+    message: str
+    details: Optional[Dict[str, Any]] = None
+    retry_after_ms: Optional[int] = None
+    is_retryable: bool = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for JSON serialization"""
+        return {
+            "code": self.code.value,
+            "message": self.message,
+            "details": self.details,
+            "retry_after_ms": self.retry_after_ms,
+            "is_retryable": self.is_retryable
+        }
@@ -0,0 +1,479 @@
+"""
+Microsoft Copilot Agent Team - Lightweight Tracing
+
+Trace/span model for following a request through orchestrator routing,
+specialist calls, tool invocations and retries. Spans are exported to a local
+JSONL file and/or an OTLP/HTTP JSON endpoint; ``OtlpStandInCollector`` is a
+local receiver for that endpoint so no collector has to be installed.
+
+Usage:
+    from utils.tracing import configure_tracing, get_tracer
+
+    configure_tracing(jsonl_path="logs/traces.jsonl")
+    tracer = get_tracer()
+    with tracer.span("orchestrator.route", user_input=text) as span:
+        span.set_attribute("agent", "troubleshooter")
+
+View a trace with ``python scripts/trace-viewer.py show <trace_id>``.
+"""
+
+import asyncio
+import contextvars
+import functools
+import json
+import logging
+import os
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TRACE_FILE = "logs/traces.jsonl"
+SERVICE_NAME = "microsoft-copilot-agent-team"
+
+_current_span: contextvars.ContextVar = contextvars.ContextVar("current_span", default=None)
+
+
+@dataclass
+class Span:
+    """A timed operation within a trace"""
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str] = None
+    start_ns: int = 0
+    end_ns: Optional[int] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    status: str = "ok"
+    status_message: Optional[str] = None
+
+    @property
+    def duration_ms(self) -> float:
+        end_ns = self.end_ns if self.end_ns is not None else time.time_ns()
+        return (end_ns - self.start_ns) / 1e6
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_error(self, message: str, code: Optional[str] = None) -> None:
+        """Mark the span failed; ``code`` is a ToolErrorCode value when available"""
+        self.status = "error"
+        self.status_message = message
+        if code:
+            self.attributes["error.code"] = code
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": round(self.duration_ms, 3),
+            "attributes": self.attributes,
+            "status": self.status,
+            "status_message": self.status_message,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Span":
+        return cls(
+            name=data["name"],
+            trace_id=data["trace_id"],
+            span_id=data["span_id"],
+            parent_id=data.get("parent_id"),
+            start_ns=int(data["start_ns"]),
+            end_ns=int(data["end_ns"]) if data.get("end_ns") is not None else None,
+            attributes=data.get("attributes") or {},
+            status=data.get("status", "ok"),
+            status_message=data.get("status_message"),
+        )
+
+
+# ----------------------------------------------------------------------
+# Exporters
+# ----------------------------------------------------------------------
+
+class JsonlSpanExporter:
+    """Appends finished spans to a JSONL file, one span per line"""
+
+    def __init__(self, path: str = DEFAULT_TRACE_FILE):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    def export(self, spans: List[Span]) -> None:
+        lines = "".join(json.dumps(span.to_dict(), default=str) + "\n" for span in spans)
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(lines)
+
+
+class OtlpHttpExporter:
+    """Posts spans as OTLP/HTTP JSON (``/v1/traces``) to a collector or the local stand-in"""
+
+    def __init__(self, endpoint: str, timeout: float = 2.0, service_name: str = SERVICE_NAME):
+        self.endpoint = endpoint
+        self.timeout = timeout
+        self.service_name = service_name
+
+    def export(self, spans: List[Span]) -> None:
+        body = json.dumps(spans_to_otlp(spans, self.service_name), default=str).encode("utf-8")
+        request = urllib.request.Request(
+            self.endpoint, data=body, headers={"Content-Type": "application/json"}, method="POST"
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                response.read()
+        except OSError as e:
+            logger.warning("OTLP export to %s failed: %s", self.endpoint, e)
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _from_otlp_value(value: Dict[str, Any]) -> Any:
+    if "boolValue" in value:
+        return value["boolValue"]
+    if "intValue" in value:
+        return int(value["intValue"])
+    if "doubleValue" in value:
+        return value["doubleValue"]
+    return value.get("stringValue")
+
+
+def spans_to_otlp(spans: List[Span], service_name: str = SERVICE_NAME) -> Dict[str, Any]:
+    """Encode spans as an OTLP ExportTraceServiceRequest (JSON mapping)"""
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": service_name}}]},
+            "scopeSpans": [{
+                "scope": {"name": "utils.tracing"},
+                "spans": [
+                    {
+                        "traceId": span.trace_id,
+                        "spanId": span.span_id,
+                        "parentSpanId": span.parent_id or "",
+                        "name": span.name,
+                        "kind": 1,
+                        "startTimeUnixNano": str(span.start_ns),
+                        "endTimeUnixNano": str(span.end_ns or span.start_ns),
+                        "attributes": [
+                            {"key": key, "value": _otlp_value(value)} for key, value in span.attributes.items()
+                        ],
+                        "status": {"code": 2 if span.status == "error" else 1, "message": span.status_message or ""},
+                    }
+                    for span in spans
+                ],
+            }],
+        }]
+    }
+
+
+def spans_from_otlp(payload: Dict[str, Any]) -> List[Span]:
+    """Decode an OTLP JSON payload back into spans"""
+    spans = []
+    for resource_spans in payload.get("resourceSpans", []):
+        for scope_spans in resource_spans.get("scopeSpans", []):
+            for raw in scope_spans.get("spans", []):
+                status = raw.get("status") or {}
+                spans.append(Span(
+                    name=raw["name"],
+                    trace_id=raw["traceId"],
+                    span_id=raw["spanId"],
+                    parent_id=raw.get("parentSpanId") or None,
+                    start_ns=int(raw["startTimeUnixNano"]),
+                    end_ns=int(raw["endTimeUnixNano"]),
+                    attributes={a["key"]: _from_otlp_value(a["value"]) for a in raw.get("attributes", [])},
+                    status="error" if status.get("code") == 2 else "ok",
+                    status_message=status.get("message") or None,
+                ))
+    return spans
+
+
+class OtlpStandInCollector:
+    """
+    Local OTLP/HTTP JSON receiver that writes received spans to a JSONL file.
+
+    Stands in for an OpenTelemetry collector during development and tests.
+    """
+
+    def __init__(self, output_path: str = DEFAULT_TRACE_FILE, host: str = "127.0.0.1", port: int = 4318):
+        exporter = JsonlSpanExporter(output_path)
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                if self.path != "/v1/traces":
+                    self.send_error(404)
+                    return
+                length = int(self.headers.get("Content-Length", 0))
+                try:
+                    spans = spans_from_otlp(json.loads(self.rfile.read(length)))
+                except (ValueError, KeyError) as e:
+                    self.send_error(400, str(e))
+                    return
+                exporter.export(spans)
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.end_headers()
+                self.wfile.write(b"{}")
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def endpoint(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/v1/traces"
+
+    def start(self) -> "OtlpStandInCollector":
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+# ----------------------------------------------------------------------
+# Tracer
+# ----------------------------------------------------------------------
+
+class Tracer:
+    """
+    Creates spans, tracks the current span per context and batches exports.
+
+    The current span lives in a ContextVar, so nesting works across threads
+    started with copied contexts and across asyncio tasks.
+    """
+
+    def __init__(self, exporters: Optional[List[Any]] = None, batch_size: int = 64):
+        self.exporters = list(exporters or [])
+        self.batch_size = batch_size
+        self._pending: List[Span] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str, **attributes) -> Iterator[Span]:
+        """Open a child of the current span (or a new trace) for the duration of the block"""
+        parent = _current_span.get()
+        span = Span(
+            name=name,
+            trace_id=parent.trace_id if parent else os.urandom(16).hex(),
+            span_id=os.urandom(8).hex(),
+            parent_id=parent.span_id if parent else None,
+            start_ns=time.time_ns(),
+            attributes=attributes,
+        )
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            if span.status != "error":
+                span.set_error(f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end_ns = time.time_ns()
+            self._on_end(span)
+
+    def current_span(self) -> Optional[Span]:
+        return _current_span.get()
+
+    def _on_end(self, span: Span) -> None:
+        if not self.exporters:
+            return
+        with self._lock:
+            self._pending.append(span)
+            if len(self._pending) < self.batch_size:
+                return
+            batch, self._pending = self._pending, []
+        self._export(batch)
+
+    def flush(self) -> None:
+        """Export all buffered spans"""
+        with self._lock:
+            batch, self._pending = self._pending, []
+        if batch:
+            self._export(batch)
+
+    def _export(self, batch: List[Span]) -> None:
+        for exporter in self.exporters:
+            try:
+                exporter.export(batch)
+            except Exception as e:
+                logger.warning("Span export via %s failed: %s", type(exporter).__name__, e)
+
+
+_tracer = Tracer()
+
+
+def get_tracer() -> Tracer:
+    """Return the process-wide tracer (a no-export tracer until configured)"""
+    return _tracer
+
+
+def configure_tracing(jsonl_path: Optional[str] = None, otlp_endpoint: Optional[str] = None) -> Tracer:
+    """
+    Attach exporters to the process-wide tracer.
+
+    Falls back to TRACE_FILE / OTLP_ENDPOINT environment variables. Buffered
+    spans are flushed at interpreter exit.
+    """
+    import atexit
+
+    jsonl_path = jsonl_path or os.getenv("TRACE_FILE")
+    otlp_endpoint = otlp_endpoint or os.getenv("OTLP_ENDPOINT")
+    if jsonl_path:
+        _tracer.exporters.append(JsonlSpanExporter(jsonl_path))
+    if otlp_endpoint:
+        _tracer.exporters.append(OtlpHttpExporter(otlp_endpoint))
+    atexit.register(_tracer.flush)
+    return _tracer
+
+
+def traced(name: str, **attributes) -> Callable:
+    """Decorator that wraps a sync or async function in a span"""
+    def decorator(func: Callable) -> Callable:
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with _tracer.span(name, **attributes):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with _tracer.span(name, **attributes):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class TracedTool:
+    """
+    Wraps a tool implementing the standard ``ITool`` interface.
+
+    Each ``invoke`` becomes a ``tool.invoke`` span with one ``tool.attempt``
+    child per attempt. Retryable failures (``error.is_retryable``) are retried
+    up to ``max_attempts`` times, honoring ``retry_after_ms``. The trace and
+    span ids are passed on in ``execution_context`` as the standard expects.
+    """
+
+    def __init__(self, tool: Any, tracer: Optional[Tracer] = None, max_attempts: int = 1,
+                 backoff_seconds: float = 0.5):
+        self.tool = tool
+        self.metadata = tool.metadata
+        self.tracer = tracer or _tracer
+        self.max_attempts = max(1, max_attempts)
+        self.backoff_seconds = backoff_seconds
+
+    async def invoke(
+        self,
+        parameters: Dict[str, Any],
+        auth_context: Optional[Dict[str, Any]] = None,
+        execution_context: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        with self.tracer.span(
+            "tool.invoke", tool_name=self.metadata.name, platform=self.metadata.platform
+        ) as span:
+            context = dict(execution_context or {})
+            context["trace_id"] = span.trace_id
+            for attempt in range(1, self.max_attempts + 1):
+                with self.tracer.span("tool.attempt", attempt=attempt, retry=attempt > 1) as attempt_span:
+                    context["span_id"] = attempt_span.span_id
+                    result = await self.tool.invoke(parameters, auth_context, context)
+                    error = result.get("error") or {}
+                    execution_time_ms = (result.get("metadata") or {}).get("execution_time_ms")
+                    if execution_time_ms is not None:
+                        attempt_span.set_attribute("execution_time_ms", execution_time_ms)
+                    if not result.get("success"):
+                        attempt_span.set_error(error.get("message", "tool failed"), error.get("code"))
+                if result.get("success") or not error.get("is_retryable") or attempt == self.max_attempts:
+                    break
+                delay_ms = error.get("retry_after_ms")
+                await asyncio.sleep(delay_ms / 1000 if delay_ms else self.backoff_seconds * 2 ** (attempt - 1))
+
+            span.set_attribute("attempts", attempt)
+            if not result.get("success"):
+                span.set_error(error.get("message", "tool failed"), error.get("code"))
+            return result
+
+    async def validate_parameters(self, parameters: Dict[str, Any]):
+        return await self.tool.validate_parameters(parameters)
+
+    async def health_check(self) -> bool:
+        return await self.tool.health_check()
+
+
+# ----------------------------------------------------------------------
+# Reading traces back
+# ----------------------------------------------------------------------
+
+def load_spans(path: str = DEFAULT_TRACE_FILE, trace_id: Optional[str] = None) -> List[Span]:
+    """Read spans from a JSONL trace file, optionally for a single trace"""
+    spans = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            if trace_id and f'"trace_id": "{trace_id}' not in line:
+                continue
+            span = Span.from_dict(json.loads(line))
+            if trace_id is None or span.trace_id.startswith(trace_id):
+                spans.append(span)
+    return spans
+
+
+def render_waterfall(spans: List[Span], width: int = 40) -> List[str]:
+    """
+    Render spans of one trace as an indented waterfall.
+
+    Each line shows the span name (indented by depth), its duration and a bar
+    positioned relative to the trace start.
+    """
+    if not spans:
+        return []
+    trace_start = min(span.start_ns for span in spans)
+    trace_end = max(span.end_ns or span.start_ns for span in spans)
+    total = max(trace_end - trace_start, 1)
+
+    children: Dict[Optional[str], List[Span]] = {}
+    known_ids = {span.span_id for span in spans}
+    for span in sorted(spans, key=lambda s: s.start_ns):
+        parent = span.parent_id if span.parent_id in known_ids else None
+        children.setdefault(parent, []).append(span)
+
+    lines = []
+
+    def visit(span: Span, depth: int) -> None:
+        offset = int((span.start_ns - trace_start) / total * width)
+        length = max(1, int(((span.end_ns or span.start_ns) - span.start_ns) / total * width))
+        bar = " " * offset + "█" * min(length, width - offset)
+        marker = "❌" if span.status == "error" else "  "
+        label = f"{'  ' * depth}{span.name}"
+        lines.append(f"{marker} {label:<40} {span.duration_ms:>10.1f} ms |{bar:<{width}}|")
+        for child in children.get(span.span_id, []):
+            visit(child, depth + 1)
+
+    for root in children.get(None, []):
+        visit(root, 0)
+    return lines
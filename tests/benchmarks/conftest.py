@@ -0,0 +1,179 @@
+"""
+Benchmark harness with stored baselines.
+
+The ``benchmark`` fixture times a callable (auto-calibrated loop count,
+best of several rounds) and compares the best per-call time with the stored
+baseline in baselines.json. A benchmark fails when it is slower than its
+baseline by more than the threshold (``--benchmark-threshold``, default 50%).
+
+Timings are normalized by a fixed reference workload (stored with the
+baselines) that is re-measured next to every benchmark, so a slower or
+throttled machine does not read as a regression. A benchmark over the
+threshold is re-measured once before it fails.
+
+Benchmarks without a baseline pass and are reported as "new"; baselines.json
+is only written by ``pytest tests/benchmarks --benchmark-update``, run on a
+reference machine, which records new benchmarks and refreshes all others.
+"""
+
+import json
+import os
+import statistics
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+import pytest
+
+DEFAULT_BASELINES = Path(__file__).with_name("baselines.json")
+DEFAULT_THRESHOLD_PERCENT = 50.0
+CALIBRATION_SECONDS = 0.01
+ROUNDS = 7
+
+_results: Dict[str, Dict[str, Any]] = {}
+_new_baselines: Dict[str, Dict[str, float]] = {}
+_reference: Dict[str, float] = {}
+
+
+def _baselines_path(config) -> Path:
+    path = config.getoption("--benchmark-baselines")
+    return Path(path) if path else DEFAULT_BASELINES
+
+
+def _threshold(config) -> float:
+    threshold = config.getoption("--benchmark-threshold")
+    if threshold is None:
+        threshold = float(os.getenv("BENCHMARK_THRESHOLD", DEFAULT_THRESHOLD_PERCENT))
+    return threshold
+
+
+def _load_baselines(config) -> Dict[str, Any]:
+    path = _baselines_path(config)
+    if not path.exists():
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _reference_workload() -> None:
+    total = 0
+    for i in range(2000):
+        total += i * i
+    "-".join(str(i) for i in range(200))
+    sorted({str(i): i for i in range(200)}.items())
+
+
+def measure(func: Callable[[], Any], rounds: int = ROUNDS) -> Dict[str, float]:
+    """Time ``func``: calibrate a loop count, then return per-call seconds over rounds."""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= CALIBRATION_SECONDS or number >= 1 << 20:
+            break
+        number *= 2
+
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        timings.append((time.perf_counter() - start) / number)
+    return {"min": min(timings), "median": statistics.median(timings), "loops": number}
+
+
+@pytest.fixture(scope="session")
+def benchmark_baselines(request):
+    stored = _load_baselines(request.config)
+    _reference["current"] = measure(_reference_workload, rounds=15)["min"]
+    _reference["baseline"] = stored.get("reference") or _reference["current"]
+    return stored.get("benchmarks", {})
+
+
+def _slowdown(current: float, baseline: float) -> float:
+    """Percent slowdown vs. baseline, corrected by the reference workload measured now"""
+    speed_factor = measure(_reference_workload, rounds=5)["min"] / _reference["baseline"]
+    return (current / (baseline * speed_factor) - 1) * 100
+
+
+@pytest.fixture
+def benchmark(request, benchmark_baselines):
+    """
+    Benchmark a callable under the test's name and check it against its baseline.
+
+    Usage:
+        def test_bench_lookup(benchmark):
+            benchmark(lambda: registry.get("orchestrator"))
+    """
+    config = request.config
+    name = request.node.name
+
+    def run(func: Callable[[], Any], rounds: int = ROUNDS) -> Dict[str, float]:
+        result = measure(func, rounds)
+        baseline = benchmark_baselines.get(name)
+        result["baseline"] = baseline["min"] if baseline else None
+        _results[name] = result
+
+        if config.getoption("--benchmark-update"):
+            _new_baselines[name] = {"min": result["min"], "median": result["median"]}
+            return result
+        if baseline is None:
+            return result
+
+        threshold = _threshold(config)
+        slowdown = _slowdown(result["min"], baseline["min"])
+        if slowdown > threshold:
+            result = dict(measure(func, rounds), baseline=baseline["min"])
+            _results[name] = result
+            slowdown = _slowdown(result["min"], baseline["min"])
+        result["delta"] = slowdown
+        if slowdown > threshold:
+            pytest.fail(
+                f"{name} regressed {slowdown:.1f}% (> {threshold:.0f}%): "
+                f"{result['min'] * 1e6:.2f}µs vs baseline {baseline['min'] * 1e6:.2f}µs"
+            )
+        return result
+
+    return run
+
+
+def pytest_sessionfinish(session, exitstatus):
+    if not _new_baselines or not session.config.getoption("--benchmark-update"):
+        return
+    path = _baselines_path(session.config)
+    benchmarks = _load_baselines(session.config).get("benchmarks", {})
+    benchmarks.update(_new_baselines)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "unit": "seconds per call",
+                "reference": _reference["current"],
+                "benchmarks": dict(sorted(benchmarks.items())),
+            },
+            f,
+            indent=2,
+        )
+        f.write("\n")
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    if not _results:
+        return
+    terminalreporter.section("benchmarks")
+    if _reference:
+        speed_factor = _reference["current"] / _reference["baseline"]
+        terminalreporter.write_line(f"Machine speed vs. baseline reference: {1 / speed_factor:.2f}x (deltas normalized)")
+    terminalreporter.write_line(f"{'Benchmark':48} {'Min':>12} {'Median':>12} {'Baseline':>12} {'Delta':>8}")
+    for name, result in sorted(_results.items()):
+        baseline = result["baseline"]
+        if "delta" in result:
+            delta = f"{result['delta']:+.1f}%"
+        else:
+            delta = "updated" if config.getoption("--benchmark-update") else "new"
+        baseline_text = f"{baseline * 1e6:.2f}µs" if baseline else "-"
+        terminalreporter.write_line(
+            f"{name:48} {result['min'] * 1e6:>10.2f}µs {result['median'] * 1e6:>10.2f}µs "
+            f"{baseline_text:>12} {delta:>8}"
+        )
@@ -0,0 +1,98 @@
+"""Benchmarks for the agent team's hot paths."""
+
+import contextlib
+import io
+import json
+
+from tests.conftest import load_script
+from utils.backend import StandInBackend
+from utils.config import load_config
+from utils.prompts import render_prompt
+from utils.replay import ORCHESTRATOR, Recorder, Recording, Replayer
+from utils.routing import get_router
+
+create_agents = load_script("create-agents")
+deploy_agents = load_script("deploy-agents")
+test_agents = load_script("test-agents")
+setup_script = load_script("setup")
+
+
+def test_bench_agent_registry_lookup(benchmark):
+    agent_keys = list(create_agents.AGENTS)
+
+    def lookup():
+        for key in agent_keys:
+            create_agents.AGENTS[key]
+
+    benchmark(lookup)
+
+
+def test_bench_agent_config_lookup_by_id(benchmark):
+    agent_ids = list(deploy_agents.AGENTS_BY_ID)
+
+    def lookup():
+        for agent_id in agent_ids:
+            deploy_agents.get_agent_config(agent_id)
+
+    benchmark(lookup)
+
+
+def test_bench_render_prompt(benchmark):
+    sections = [agent["prompt_sections"] for agent in create_agents.AGENTS.values()]
+    assert "<identity>" in render_prompt(sections[0])
+
+    def render_all():
+        for prompt_sections in sections:
+            render_prompt(prompt_sections)
+
+    benchmark(render_all)
+
+
+def test_bench_route_orchestrator_cases(benchmark):
+    router = get_router("assistant")
+    cases = test_agents.ORCHESTRATOR_TEST_CASES
+    assert all(router.route_one(case["input"]) == case["expected_agent"] for case in cases)
+
+    def route_all():
+        for case in cases:
+            router.route_one(case["input"])
+
+    benchmark(route_all)
+
+
+def test_bench_load_config(benchmark, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with contextlib.redirect_stdout(io.StringIO()):
+        setup_script.create_config_template()
+    config_file = tmp_path / "config" / "agents.example.json"
+    env = {"TENANT_ID": "tenant", "ENVIRONMENT_URL": "https://example.crm.dynamics.com"}
+    assert load_config(str(config_file), env)["environment"]["tenant_id"] == "tenant"
+
+    benchmark(lambda: load_config(str(config_file), env))
+
+
+def test_bench_deploy_all_stand_in(benchmark):
+    def deploy():
+        backend = StandInBackend()
+        with contextlib.redirect_stdout(io.StringIO()):
+            assert deploy_agents.deploy_all(backend)
+
+    benchmark(deploy)
+
+
+def test_bench_replay_orchestrator_cases(benchmark, tmp_path):
+    router = get_router("assistant")
+    backend = test_agents.create_specialist_backend(latency_ms=0)
+    path = tmp_path / "orchestrator.rec"
+    with Recorder(str(path)) as recorder:
+        recording_backend = recorder.wrap(backend)
+        for case in test_agents.ORCHESTRATOR_TEST_CASES * 10:
+            with recorder.exchange(ORCHESTRATOR, case["input"], session_id=case["name"]) as exchange:
+                exchange.agent = router.route_one(case["input"])
+                exchange.response = recording_backend.invoke_agent(exchange.agent, case["input"])
+    replayer = Replayer(Recording(str(path)))
+    report = replayer.run()
+    assert report["requests"] == 30
+    assert not report["route_mismatches"] and not report["response_mismatches"] and not report["errors"]
+
+    benchmark(replayer.run)
@@ -0,0 +1,72 @@
+"""Benchmarks for tool registry lookups with thousands of registered tools."""
+
+import pytest
+
+from utils.tool_registry import ToolRegistry
+from utils.tools import ITool, ToolMetadata, ToolType
+
+PLATFORMS = ["microsoft", "google_cloud", "aws", "claude"]
+CATEGORIES = [f"category{i}" for i in range(50)]
+TOOLS_PER_CATEGORY = 20
+
+
+def _make_tool(name: str, category: str, platform: str):
+    metadata = ToolMetadata(
+        name=name,
+        category=category,
+        description=f"{name} on {platform}",
+        tool_type=ToolType.PLATFORM_NATIVE,
+        platform=platform,
+        version="1.0.0",
+        parameters={"type": "object"},
+        authentication_required=True,
+    )
+
+    def configure_platform(self, target_platform):
+        self.configured_platform = target_platform
+
+    async def invoke(self, parameters, auth_context=None, execution_context=None):
+        return {"success": True, "data": None, "metadata": {}, "error": None}
+
+    namespace = {"metadata": metadata, "configure_platform": configure_platform, "invoke": invoke}
+    return type(f"Tool_{name}_{platform}", (ITool,), namespace)
+
+
+@pytest.fixture(scope="module")
+def large_registry():
+    """4,000 platform-specific tools plus 1,000 universal tools."""
+    registry = ToolRegistry()
+    for category in CATEGORIES:
+        for i in range(TOOLS_PER_CATEGORY):
+            name = f"{category}.tool{i}"
+            for platform in PLATFORMS:
+                registry.register(_make_tool(name, category, platform))
+            registry.register(_make_tool(f"{category}.shared{i}", category, "universal"))
+    assert len(registry) == 5000
+    return registry
+
+
+def test_bench_registry_get_tool(benchmark, large_registry):
+    names = [f"{category}.tool{i}" for category in CATEGORIES[::10] for i in range(TOOLS_PER_CATEGORY)]
+    first = large_registry.get_tool(names[0], "microsoft")
+    assert large_registry.get_tool(names[0], "microsoft") is first
+
+    def lookup():
+        for name in names:
+            large_registry.get_tool(name, "microsoft")
+
+    benchmark(lookup)
+
+
+def test_bench_registry_get_universal_tool(benchmark, large_registry):
+    tool = large_registry.get_tool("category3.shared1", "aws")
+    assert tool.configured_platform == "aws"
+
+    benchmark(lambda: large_registry.get_tool("category3.shared1", "aws"))
+
+
+def test_bench_registry_list_tools_by_category_and_platform(benchmark, large_registry):
+    tools = large_registry.list_tools(category="category7", platform="google_cloud")
+    assert len(tools) == TOOLS_PER_CATEGORY * 2
+
+    benchmark(lambda: large_registry.list_tools(category="category7", platform="google_cloud"))
@@ -0,0 +1,48 @@
+"""
+Shared pytest configuration.
+
+Makes scripts/ importable (``utils.*``) and provides ``load_script`` for the
+hyphenated CLI scripts, which cannot be imported by name.
+"""
+
+import importlib.util
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+SCRIPTS_DIR = REPO_ROOT / "scripts"
+
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+
+def load_script(name: str):
+    """Import scripts/<name>.py as a module (e.g. ``load_script("deploy-agents")``)."""
+    module_name = name.replace("-", "_")
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    spec = importlib.util.spec_from_file_location(module_name, SCRIPTS_DIR / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("benchmark", "agent team benchmarks")
+    group.addoption(
+        "--benchmark-threshold",
+        type=float,
+        default=None,
+        help="Allowed slowdown vs. baseline in percent (default: $BENCHMARK_THRESHOLD or 50)",
+    )
+    group.addoption(
+        "--benchmark-update",
+        action="store_true",
+        help="Overwrite stored baselines with this run's results",
+    )
+    group.addoption(
+        "--benchmark-baselines",
+        default=None,
+        help="Baseline JSON file (default: tests/benchmarks/baselines.json)",
+    )
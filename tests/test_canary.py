@@ -0,0 +1,119 @@
+"""Tests for canary deployments against the stand-in backend."""
+
+import sys
+
+import pytest
+
+from tests.conftest import load_script
+from utils.backend import StandInBackend
+from utils.canary import BASELINE, CANARY, CanaryDeployment
+
+deploy_agents = load_script("deploy-agents")
+
+CURRENT = {"id": "microsoft-troubleshooter", "name": "Microsoft Troubleshooter", "prompt": "v1"}
+
+
+def make_backend(**kwargs):
+    backend = StandInBackend(**kwargs)
+    backend.create_agent(CURRENT)
+    return backend
+
+
+def deployed_ids(backend):
+    return sorted(agent["id"] for agent in backend.list_agents())
+
+
+def test_traffic_split_is_stable_and_close_to_the_share():
+    canary = CanaryDeployment(make_backend(), dict(CURRENT, prompt="v2"), traffic_share=0.2)
+    keys = [f"session-{i}" for i in range(5000)]
+    variants = [canary.choose(key) for key in keys]
+
+    assert variants == [canary.choose(key) for key in keys]
+    assert 0.17 < variants.count(CANARY) / len(keys) < 0.23
+    assert canary.agent_for(keys[variants.index(CANARY)]) == "microsoft-troubleshooter--canary"
+    assert canary.agent_for(keys[variants.index(BASELINE)]) == "microsoft-troubleshooter"
+
+
+def test_canary_requires_the_agent_to_be_deployed():
+    with pytest.raises(KeyError):
+        CanaryDeployment(StandInBackend(), dict(CURRENT, prompt="v2")).start()
+
+
+def test_equal_canary_is_promoted():
+    backend = make_backend(invoke_latency_ms=2.0)
+    canary = CanaryDeployment(backend, dict(CURRENT, prompt="v2"), traffic_share=0.5, min_samples=5)
+    canary.start()
+    assert deployed_ids(backend) == ["microsoft-troubleshooter", "microsoft-troubleshooter--canary"]
+
+    canary.replay(["hello"])
+    verdict = canary.finish()
+
+    assert verdict.promote, verdict.reasons
+    assert deployed_ids(backend) == ["microsoft-troubleshooter"]
+    assert backend.get_agent("microsoft-troubleshooter")["prompt"] == "v2"
+
+
+def test_slower_canary_is_rolled_back():
+    backend = make_backend(response_ms_per_kchar=1.0)
+    canary = CanaryDeployment(backend, dict(CURRENT, prompt="x" * 5000), traffic_share=0.5, min_samples=5)
+    canary.start()
+    canary.replay(["hello"])
+    verdict = canary.finish()
+
+    assert not verdict.promote
+    assert any("latency" in reason for reason in verdict.reasons)
+    assert deployed_ids(backend) == ["microsoft-troubleshooter"]
+    assert backend.get_agent("microsoft-troubleshooter")["prompt"] == "v1"
+
+
+def test_unmeasurably_fast_variants_are_not_judged():
+    backend = make_backend()
+    canary = CanaryDeployment(backend, dict(CURRENT, prompt="v2"), traffic_share=0.5, min_samples=5)
+    canary.start()
+    canary.replay(["hello"])
+    verdict = canary.finish()
+
+    assert not verdict.promote
+    assert "too small to compare" in verdict.reasons[0]
+    assert deployed_ids(backend) == ["microsoft-troubleshooter"]
+
+
+def test_insufficient_samples_rolls_back():
+    backend = make_backend()
+    canary = CanaryDeployment(backend, dict(CURRENT, prompt="v2"), traffic_share=0.5, min_samples=5)
+    canary.start()
+    verdict = canary.finish()
+
+    assert not verdict.promote
+    assert "insufficient samples" in verdict.reasons[0]
+    assert deployed_ids(backend) == ["microsoft-troubleshooter"]
+
+
+def test_stand_in_state_persists_across_instances(tmp_path):
+    state_file = tmp_path / "agents.json"
+    backend = make_backend(state_file=str(state_file))
+    CanaryDeployment(backend, dict(CURRENT, prompt="v2")).start()
+
+    reopened = StandInBackend(state_file=str(state_file))
+    assert deployed_ids(reopened) == ["microsoft-troubleshooter", "microsoft-troubleshooter--canary"]
+    reopened.delete_agent("microsoft-troubleshooter--canary")
+    assert deployed_ids(StandInBackend(state_file=str(state_file))) == ["microsoft-troubleshooter"]
+
+
+@pytest.mark.parametrize("share", ["0", "1", "1.5", "-0.1", "half"])
+def test_canary_share_outside_zero_to_one_is_rejected(monkeypatch, capsys, share):
+    monkeypatch.setattr(sys, "argv", ["deploy-agents.py", "--canary", CURRENT["id"], "--canary-share", share])
+    with pytest.raises(SystemExit) as exit_info:
+        deploy_agents.main()
+    assert exit_info.value.code == 2
+    assert "--canary-share" in capsys.readouterr().err
+
+
+def test_cli_stand_in_answers_slowly_enough_to_compare(tmp_path, monkeypatch):
+    monkeypatch.setenv("AGENT_BACKEND_STATE_FILE", str(tmp_path / "agents.json"))
+    backend = deploy_agents.create_backend()
+    backend.create_agent(CURRENT)
+    canary = CanaryDeployment(backend, dict(CURRENT, prompt="v2"), traffic_share=0.5, min_samples=5)
+    canary.start()
+    canary.replay(["hello"])
+    assert min(stats.percentile(0.5) for stats in canary.stats.values()) * 1000 >= canary.min_latency_ms
@@ -0,0 +1,83 @@
+"""Tests for idempotent tool call coalescing."""
+
+import asyncio
+from types import SimpleNamespace
+
+from utils.coalescing import ToolCallCoalescer
+
+
+class StubTool:
+    def __init__(self, idempotent=True, delay=0.01):
+        self.metadata = SimpleNamespace(name="web.search", platform="microsoft", idempotent=idempotent)
+        self.delay = delay
+        self.calls = 0
+
+    async def invoke(self, parameters, auth_context=None, execution_context=None):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return {"success": True, "data": {"call": self.calls}, "metadata": {"tool": "web.search"}, "error": None}
+
+
+def test_concurrent_identical_calls_share_one_invocation():
+    async def scenario():
+        tool = StubTool()
+        coalescer = ToolCallCoalescer()
+        results = await asyncio.gather(*(coalescer.invoke(tool, {"query": "q"}) for _ in range(5)))
+        return tool, coalescer, results
+
+    tool, coalescer, results = asyncio.run(scenario())
+    assert tool.calls == 1
+    assert [r["metadata"].get("deduplicated") for r in results] == [None] + ["coalesced"] * 4
+    assert coalescer.stats()["web.search"] == {"calls": 5, "executed": 1, "coalesced": 4, "memo_hits": 0}
+
+
+def test_leader_result_is_a_copy_of_the_memoized_result():
+    async def scenario():
+        tool = StubTool()
+        coalescer = ToolCallCoalescer()
+        first = await coalescer.invoke(tool, {"query": "q"})
+        first["metadata"]["mutated"] = True
+        first["success"] = False
+        second = await coalescer.invoke(tool, {"query": "q"})
+        return tool, second
+
+    tool, second = asyncio.run(scenario())
+    assert tool.calls == 1
+    assert second["success"] is True
+    assert second["metadata"] == {"tool": "web.search", "deduplicated": "memoized"}
+
+
+def test_nested_data_is_not_shared_between_callers():
+    async def scenario():
+        tool = StubTool()
+        coalescer = ToolCallCoalescer()
+        first, second = await asyncio.gather(*(coalescer.invoke(tool, {"query": "q"}) for _ in range(2)))
+        first["data"]["call"] = "mutated"
+        third = await coalescer.invoke(tool, {"query": "q"})
+        return second, third
+
+    second, third = asyncio.run(scenario())
+    assert second["data"] == {"call": 1}
+    assert third["data"] == {"call": 1}
+
+
+def test_callers_in_different_tenants_are_not_shared():
+    async def scenario():
+        tool = StubTool()
+        coalescer = ToolCallCoalescer()
+        await coalescer.invoke(tool, {"query": "q"}, {"tenant_id": "contoso", "user_id": "alex"})
+        await coalescer.invoke(tool, {"query": "q"}, {"tenant_id": "fabrikam", "user_id": "alex"})
+        await coalescer.invoke(tool, {"query": "q"}, {"tenant_id": "contoso", "user_id": "alex"})
+        return tool
+
+    assert asyncio.run(scenario()).calls == 2
+
+
+def test_non_idempotent_tools_pass_through():
+    async def scenario():
+        tool = StubTool(idempotent=False)
+        coalescer = ToolCallCoalescer()
+        await asyncio.gather(*(coalescer.invoke(tool, {"query": "q"}) for _ in range(3)))
+        return tool
+
+    assert asyncio.run(scenario()).calls == 3
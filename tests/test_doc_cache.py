@@ -0,0 +1,125 @@
+"""End-to-end tests for the document cache against a local HTTP server."""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from utils.doc_cache import (
+    DOWNLOADED, FRESH, OFFLINE, REVALIDATED, STALE, DocumentCache, DocumentUnavailable,
+)
+
+PAGE = b"""<html><head><title>Topics</title><script>var x = 1;</script></head>
+<body><nav>Menu</nav><h1>Create topics</h1><p>Topics define how the agent responds.</p></body></html>"""
+ETAG = '"v1"'
+
+
+class DocServer:
+    """Serves PAGE with an ETag; ``mode`` switches it to errors or truncated bodies."""
+
+    def __init__(self):
+        self.mode = "ok"
+        self.cache_control = "max-age=0"
+        self.statuses = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if server.mode == "error":
+                    self.send_error(500)
+                    server.statuses.append(500)
+                    return
+                if self.headers.get("If-None-Match") == ETAG and server.mode == "ok":
+                    self.send_response(304)
+                    self.send_header("Cache-Control", server.cache_control)
+                    self.end_headers()
+                    server.statuses.append(304)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("ETag", ETAG)
+                self.send_header("Cache-Control", server.cache_control)
+                self.send_header("Content-Length", str(len(PAGE)))
+                self.end_headers()
+                self.wfile.write(PAGE[:40] if server.mode == "truncate" else PAGE)
+                self.close_connection = True
+                server.statuses.append(200)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/docs/topics"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def server():
+    server = DocServer()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = DocumentCache(str(tmp_path / "doc-cache"), timeout=5)
+    yield cache
+    cache.close()
+
+
+def test_download_extracts_text_and_revalidates_with_304(server, cache):
+    first = cache.fetch(server.url)
+    assert first.source == DOWNLOADED
+    assert first.title == "Topics"
+    assert first.text == "Create topics\n\nTopics define how the agent responds."
+
+    second = cache.fetch(server.url)
+    assert second.source == REVALIDATED
+    assert second.text == first.text
+    assert server.statuses == [200, 304]
+
+
+def test_fresh_page_is_served_without_a_request(server, cache):
+    server.cache_control = "max-age=3600"
+    cache.fetch(server.url)
+    assert cache.fetch(server.url).source == FRESH
+    assert server.statuses == [200]
+
+
+@pytest.mark.parametrize("mode", ["error", "truncate"])
+def test_failed_refresh_serves_the_stale_copy(server, cache, mode):
+    original = cache.fetch(server.url)
+    server.mode = mode
+    cache.invalidate(server.url)
+    stale = cache.fetch(server.url)
+    assert stale.source == STALE
+    assert stale.text == original.text
+    assert cache.stats()["errors"] == 1
+
+
+def test_unreachable_page_without_a_copy_is_unavailable(server, cache):
+    server.mode = "truncate"
+    with pytest.raises(DocumentUnavailable):
+        cache.fetch(server.url)
+
+
+def test_offline_snapshot_serves_pages_without_the_network(server, cache, tmp_path):
+    original = cache.fetch(server.url)
+    snapshot = tmp_path / "docs-snapshot.zip"
+    assert cache.export_snapshot(str(snapshot)) == 1
+    server.stop()
+
+    offline = DocumentCache(str(tmp_path / "offline-cache"), offline=True)
+    try:
+        assert offline.import_snapshot(str(snapshot)) == 1
+        document = offline.fetch(server.url)
+        assert document.source == OFFLINE
+        assert (document.title, document.text) == (original.title, original.text)
+        with pytest.raises(DocumentUnavailable):
+            offline.fetch(server.url + "/missing")
+    finally:
+        offline.close()
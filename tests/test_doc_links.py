@@ -0,0 +1,75 @@
+"""Tests for the documentation link checker's markdown parsing."""
+
+import pytest
+
+from utils.doc_links import DocLinkChecker, github_slug, parse_date, parse_markdown
+
+
+@pytest.mark.parametrize("heading, slug", [
+    ("Quick Start", "quick-start"),
+    ("Step 3: Deploy Agents", "step-3-deploy-agents"),
+    ("`deploy-agents.py` options", "deploy-agentspy-options"),
+    ("[Linked](https://example.com) heading", "linked-heading"),
+    ("snake_case_name", "snake_case_name"),
+    ("🚀 Quick Start", "-quick-start"),
+    ("部署指南 Deployment", "部署指南-deployment"),
+])
+def test_github_slug(heading, slug):
+    assert github_slug(heading) == slug
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("2025-01-15", "2025-01-15"),
+    ("2025-3", "2025-03-01"),
+    ("January 15, 2025", "2025-01-15"),
+    ("March 2025", "2025-03-01"),
+    ("2025年1月", "2025-01-01"),
+    ("2025-13-40", None),
+    ("2025-02-30", None),
+    ("2025年13月", None),
+    ("February 30, 2025", None),
+    ("soon", None),
+])
+def test_parse_date(text, expected):
+    assert parse_date(text) == expected
+
+
+def test_parse_markdown_collects_links_anchors_versions_and_date():
+    doc = parse_markdown("\n".join([
+        "# Guide",
+        "**Last Updated**: 2025-01-15 | Version 2.1.0",
+        "See [setup](docs/SETUP.md#install) and <https://example.com/a>.",
+        "Wiki: https://en.wikipedia.org/wiki/Copilot_(software), more (see https://example.com/b).",
+        "[ref]: https://example.com/ref",
+        "`https://example.com/in-code`",
+        "```",
+        "https://example.com/in-fence",
+        "```",
+        "## Guide",
+        '<a name="custom-anchor"></a>',
+    ]))
+
+    assert doc.links == [
+        (3, "docs/SETUP.md#install"),
+        (3, "https://example.com/a"),
+        (4, "https://en.wikipedia.org/wiki/Copilot_(software)"),
+        (4, "https://example.com/b"),
+        (5, "https://example.com/ref"),
+    ]
+    assert doc.anchors == ["guide", "guide-1", "custom-anchor"]
+    assert doc.versions == [(2, "2.1.0")]
+    assert doc.last_updated == "2025-01-15"
+
+
+def test_inline_link_keeps_balanced_parentheses():
+    doc = parse_markdown("[Copilot](https://en.wikipedia.org/wiki/Copilot_(software))")
+    assert doc.links == [(1, "https://en.wikipedia.org/wiki/Copilot_(software)")]
+
+
+def test_run_reports_invalid_date_as_missing(tmp_path):
+    (tmp_path / "docs").mkdir()
+    (tmp_path / "docs" / "GUIDE.md").write_text("# Guide\n\nLast Updated: 2025-13-40\n", encoding="utf-8")
+    checker = DocLinkChecker(str(tmp_path), state_file="cache.json")
+    report = checker.run(external=False)
+    assert report["missing_last_updated"] == ["docs/GUIDE.md"]
+    assert report["broken_links"] == []
@@ -0,0 +1,160 @@
+"""Tests for concurrent fleet deployments."""
+
+import json
+import sys
+import threading
+import time
+
+import pytest
+
+from tests.conftest import load_script
+from utils.backend import StandInBackend, ThrottledError
+from utils.fleet import FleetDeployer, FleetEnvironment, load_fleet
+
+deploy_agents = load_script("deploy-agents")
+
+PHASES = {
+    "phase1": [{"id": f"agent-{i}", "name": f"Agent {i}", "prompt": "v1"} for i in range(4)],
+    "phase2": [{"id": f"agent-{i}", "name": f"Agent {i}", "prompt": "v1"} for i in range(4, 6)],
+}
+
+
+class InFlight:
+    """Tracks the peak number of concurrent calls, overall and per key."""
+
+    def __init__(self):
+        self.current = {}
+        self.peak = {}
+        self._lock = threading.Lock()
+
+    def enter(self, *keys):
+        with self._lock:
+            for key in keys:
+                self.current[key] = self.current.get(key, 0) + 1
+                self.peak[key] = max(self.peak.get(key, 0), self.current[key])
+
+    def exit(self, *keys):
+        with self._lock:
+            for key in keys:
+                self.current[key] -= 1
+
+
+class TrackedBackend(StandInBackend):
+    def __init__(self, env, in_flight, fail_ids=(), throttle_once=()):
+        super().__init__()
+        self.env = env
+        self.in_flight = in_flight
+        self.fail_ids = set(fail_ids)
+        self.throttle_once = set(throttle_once)
+
+    def create_agent(self, config):
+        keys = ("all", f"env:{self.env.name}", f"tenant:{self.env.tenant_id}")
+        self.in_flight.enter(*keys)
+        try:
+            time.sleep(0.01)
+            if config["id"] in self.throttle_once:
+                self.throttle_once.discard(config["id"])
+                raise ThrottledError(retry_after_seconds=0)
+            if config["id"] in self.fail_ids:
+                raise RuntimeError("provisioning failed")
+            return super().create_agent(config)
+        finally:
+            self.in_flight.exit(*keys)
+
+
+def environments(count, tenants=("contoso",)):
+    return [FleetEnvironment(f"env-{i}", f"https://env-{i}.crm.dynamics.com", tenants[i % len(tenants)])
+            for i in range(count)]
+
+
+def test_calls_stay_within_every_concurrency_limit():
+    in_flight = InFlight()
+    backends = {}
+
+    def factory(env):
+        backends[env.name] = TrackedBackend(env, in_flight)
+        return backends[env.name]
+
+    deployer = FleetDeployer(PHASES, factory, max_concurrency=5, per_environment=2, per_tenant=3)
+    summary = deployer.deploy(environments(6, tenants=("contoso", "fabrikam")))
+
+    assert summary["totals"]["succeeded"] == 6
+    assert summary["totals"]["agents_deployed"] == 36
+    assert in_flight.peak["all"] <= 5
+    assert max(v for k, v in in_flight.peak.items() if k.startswith("env:")) <= 2
+    assert max(v for k, v in in_flight.peak.items() if k.startswith("tenant:")) <= 3
+    assert all(len(backend.list_agents()) == 6 for backend in backends.values())
+
+
+def test_a_failing_environment_does_not_affect_the_others():
+    in_flight = InFlight()
+
+    def factory(env):
+        if env.name == "env-1":
+            raise ConnectionRefusedError("environment unreachable")
+        return TrackedBackend(env, in_flight, fail_ids={"agent-2"} if env.name == "env-0" else ())
+
+    summary = FleetDeployer(PHASES, factory, max_retries=0).deploy(environments(3))
+    results = {env["name"]: env for env in summary["environments"]}
+
+    assert results["env-0"]["status"] == "failed"
+    assert results["env-0"]["failed"] == 1
+    assert results["env-0"]["skipped"] == len(PHASES["phase2"])
+    assert "agent-2" in results["env-0"]["errors"][0]
+    assert results["env-1"]["status"] == "failed"
+    assert "environment unreachable" in results["env-1"]["errors"][0]
+    assert results["env-2"]["status"] == "succeeded"
+    assert results["env-2"]["deployed"] == 6
+    assert summary["totals"]["failed"] == 2
+
+
+def test_throttled_calls_are_retried():
+    in_flight = InFlight()
+    deployer = FleetDeployer(PHASES, lambda env: TrackedBackend(env, in_flight, throttle_once={"agent-0"}),
+                             backoff_seconds=0)
+    result = deployer.deploy(environments(1))["environments"][0]
+
+    assert result["status"] == "succeeded"
+    assert result["retries"] == 1
+    assert result["deployed"] == 6
+
+
+def test_unchanged_agents_are_not_redeployed():
+    env = environments(1)[0]
+    backend = TrackedBackend(env, InFlight())
+    FleetDeployer(PHASES, lambda _: backend).deploy([env])
+    result = FleetDeployer(PHASES, lambda _: backend).deploy([env])["environments"][0]
+
+    assert (result["deployed"], result["unchanged"]) == (0, 6)
+
+
+@pytest.mark.parametrize("entry, message", [
+    ({"name": "no-url"}, "has no http"),
+    ({"url": "contoso.crm.dynamics.com"}, "has no http"),
+    ({"url": "https://contoso.crm.dynamics.com"}, "no tenant_id"),
+])
+def test_fleet_file_without_endpoint_or_tenant_is_rejected(tmp_path, monkeypatch, entry, message):
+    monkeypatch.delenv("TENANT_ID", raising=False)
+    fleet_file = tmp_path / "environments.json"
+    fleet_file.write_text(json.dumps({"environments": [entry]}), encoding="utf-8")
+    with pytest.raises(ValueError, match=message):
+        load_fleet(str(fleet_file))
+
+
+@pytest.mark.parametrize("flags", [["--all", "--prune"], ["--canary", "microsoft-troubleshooter"]])
+def test_fleet_rejects_unsupported_flags(monkeypatch, capsys, flags):
+    monkeypatch.setattr(sys, "argv", ["deploy-agents.py", "--fleet", "environments.json", *flags])
+    with pytest.raises(SystemExit) as exit_info:
+        deploy_agents.main()
+    assert exit_info.value.code == 2
+    assert "not supported with --fleet" in capsys.readouterr().err
+
+
+def test_each_environment_keeps_its_own_stand_in_state(tmp_path, monkeypatch):
+    monkeypatch.setenv("AGENT_BACKEND_STATE_FILE", str(tmp_path / "agents.json"))
+    contoso, fabrikam = environments(2)
+    deploy_agents.create_environment_backend(contoso).create_agent(PHASES["phase1"][0])
+
+    assert [a["id"] for a in deploy_agents.create_environment_backend(contoso).list_agents()] == ["agent-0"]
+    assert deploy_agents.create_environment_backend(fabrikam).list_agents() == []
+    assert (tmp_path / "agents.env-0.json").exists()
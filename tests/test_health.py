@@ -0,0 +1,135 @@
+"""Tests for concurrent, cached health probes."""
+
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+
+from tests.conftest import load_script
+from utils.backend import StandInBackend
+from utils.health import HEALTHY, TIMEOUT, UNHEALTHY, HealthChecker, http_probe
+
+test_agents = load_script("test-agents")
+
+
+class CountingProbe:
+    def __init__(self, ok=True):
+        self.ok = ok
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if not self.ok:
+            raise ConnectionError("agent unreachable")
+
+
+@pytest.fixture
+def checkers():
+    created = []
+
+    def make(probes, **kwargs):
+        created.append(HealthChecker(probes, **kwargs))
+        return created[-1]
+
+    yield make
+    for checker in created:
+        checker.close()
+
+
+def fetch(url):
+    try:
+        with urllib.request.urlopen(url, timeout=5) as response:
+            return response.status, response.read().decode("utf-8")
+    except urllib.error.HTTPError as e:
+        return e.code, e.read().decode("utf-8")
+
+
+def test_results_are_cached_for_the_ttl(checkers):
+    probe = CountingProbe()
+    checker = checkers({"a": probe}, timeout=1.0, cache_ttl=0.2)
+
+    checker.results()
+    checker.results()
+    assert probe.calls == 1
+
+    time.sleep(0.25)
+    checker.results()
+    assert probe.calls == 2
+
+
+def test_hanging_probe_times_out_and_is_not_restarted(checkers):
+    release = threading.Event()
+    calls = []
+
+    def hanging():
+        calls.append(1)
+        release.wait(5)
+
+    checker = checkers({"slow": hanging, "fast": CountingProbe()}, timeout=0.1)
+    started = time.perf_counter()
+    first = checker.check()
+    assert time.perf_counter() - started < 1.0
+    assert first["slow"].status == TIMEOUT
+    assert first["fast"].status == HEALTHY
+
+    assert checker.check()["slow"].status == TIMEOUT
+    assert len(calls) == 1
+    release.set()
+
+
+def test_health_endpoint_status_code_follows_the_probes(checkers):
+    failing = CountingProbe(ok=False)
+    checker = checkers({"a": CountingProbe(), "b": failing}, timeout=1.0, cache_ttl=0)
+    server = checker.serve(port=0)
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    status, body = fetch(f"{url}/health")
+    assert status == 503
+    assert '"status": "degraded"' in body
+
+    failing.ok = True
+    assert fetch(f"{url}/health")[0] == 200
+    assert fetch(f"{url}/missing")[0] == 404
+
+
+def test_metrics_endpoint_exposes_prometheus_text(checkers):
+    checker = checkers({"ok": CountingProbe(), 'say "hi"': CountingProbe(ok=False)}, timeout=1.0)
+    server = checker.serve(port=0)
+
+    status, body = fetch(f"http://127.0.0.1:{server.server_address[1]}/metrics")
+    assert status == 200
+    assert "# TYPE agent_up gauge" in body
+    assert 'agent_up{agent="ok"} 1' in body
+    assert 'agent_up{agent="say \\"hi\\""} 0' in body
+    assert 'agent_probes_total{agent="ok",result="healthy"} 1' in body
+    assert 'agent_probes_total{agent="ok",result="timeout"} 0' in body
+    assert "agent_health_last_check_timestamp_seconds" in body
+
+
+def test_http_probe_requires_a_2xx_response(checkers):
+    target = CountingProbe()
+    server = checkers({"target": target}, timeout=1.0, cache_ttl=0).serve(port=0)
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    results = checkers({"up": http_probe(f"{url}/health"), "missing": http_probe(f"{url}/missing")},
+                       timeout=2.0).check()
+    assert results["up"].status == HEALTHY
+    assert results["missing"].status == UNHEALTHY
+    assert "404" in results["missing"].error
+
+
+def test_quick_check_probes_the_configured_backend(tmp_path, monkeypatch):
+    state_file = tmp_path / "agents.json"
+    StandInBackend(state_file=str(state_file)).create_agent({"id": "orchestrator", "name": "Orchestrator"})
+    monkeypatch.setenv("AGENT_BACKEND_STATE_FILE", str(state_file))
+
+    checker = test_agents.create_health_checker(timeout=1.0)
+    try:
+        results = checker.check()
+    finally:
+        checker.close()
+    assert results["Orchestrator Agent"].status == HEALTHY
+    assert results["M365 Agent"].status == UNHEALTHY
+    assert "AgentNotFoundError" in results["M365 Agent"].error
@@ -0,0 +1,29 @@
+"""Tests for the log analyzer CLI."""
+
+import sys
+
+import pytest
+
+from tests.conftest import load_script
+
+log_analyzer = load_script("log-analyzer")
+
+
+def test_interval_units():
+    assert log_analyzer.parse_interval("15m") == 900
+    assert log_analyzer.parse_interval("2h") == 7200
+    assert log_analyzer.parse_interval("30") == 30
+
+
+@pytest.mark.parametrize("interval", ["", "h", "abc", "0", "-5m", "nan"])
+def test_invalid_interval_is_an_error(interval):
+    with pytest.raises(ValueError):
+        log_analyzer.parse_interval(interval)
+
+
+def test_cli_reports_an_invalid_interval(tmp_path, monkeypatch, capsys):
+    log_file = tmp_path / "agent-team.log"
+    log_file.write_text('{"ts": 1.0, "level": "INFO", "event": "tool.invoke"}\n', encoding="utf-8")
+    monkeypatch.setattr(sys, "argv", ["log-analyzer.py", "--file", str(log_file), "stats", "--interval", "soon"])
+    assert log_analyzer.main() == 1
+    assert "❌ Error: Invalid interval" in capsys.readouterr().out
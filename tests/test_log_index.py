@@ -0,0 +1,83 @@
+"""Tests for the incremental log index."""
+
+import json
+
+from utils.log_index import LogIndex
+
+
+def write_lines(path, records, mode="a"):
+    with open(path, mode, encoding="utf-8") as f:
+        for record in records:
+            f.write((record if isinstance(record, str) else json.dumps(record)) + "\n")
+
+
+def event(ts, **fields):
+    return dict({"ts": ts, "level": "INFO", "event": "tool.invoke"}, **fields)
+
+
+def test_index_file_is_outside_the_backup_pattern(tmp_path):
+    log_file = tmp_path / "agent-team.log"
+    write_lines(log_file, [event(1.0)])
+    index = LogIndex(str(log_file))
+    index.update()
+
+    assert index.index_path.exists()
+    assert list(tmp_path.glob(f"{log_file.name}.*")) == []
+
+
+def test_incremental_update_and_posting_queries(tmp_path):
+    log_file = tmp_path / "agent-team.log"
+    write_lines(log_file, [
+        event(1.0, agent="m365_agent", error_code="NETWORK_TIMEOUT", correlation_id="a"),
+        event(2.0, agent="m365_agent", correlation_id="b"),
+    ])
+    assert LogIndex(str(log_file)).update() == 2
+
+    write_lines(log_file, [event(3.0, agent="teams_agent", error={"code": "NETWORK_TIMEOUT"})])
+    index = LogIndex(str(log_file))
+    assert index.update() == 1
+
+    assert [e["ts"] for e in index.query(code="NETWORK_TIMEOUT")] == [1.0, 3.0]
+    assert [e["ts"] for e in index.query(code="NETWORK_TIMEOUT", agent="m365_agent")] == [1.0]
+    assert [e["ts"] for e in index.query(correlation_id="b")] == [2.0]
+    assert [e["ts"] for e in index.query(since=1.5)] == [2.0, 3.0]
+
+
+def test_unparseable_timestamp_marks_the_index_unsorted(tmp_path):
+    log_file = tmp_path / "agent-team.log"
+    write_lines(log_file, [event(1.0), event("not a time"), event(2.0), event(3.0)])
+    index = LogIndex(str(log_file))
+    index.update()
+
+    assert not index.sorted
+    assert [e["ts"] for e in index.query(since=1.5)] == [2.0, 3.0]
+    assert [e["ts"] for e in index.query(until=2.5)] == [1.0, 2.0]
+
+
+def test_truncated_log_is_reindexed(tmp_path):
+    log_file = tmp_path / "agent-team.log"
+    write_lines(log_file, [event(1.0), event(2.0)])
+    LogIndex(str(log_file)).update()
+
+    write_lines(log_file, [event(5.0, agent="rotated")], mode="w")
+    index = LogIndex(str(log_file))
+    index.update()
+    assert [e.get("agent") for e in index.query()] == ["rotated"]
+
+
+def test_empty_log_is_not_memory_mapped(tmp_path):
+    log_file = tmp_path / "agent-team.log"
+    log_file.touch()
+    index = LogIndex(str(log_file))
+    assert index.update() == 0
+    assert index.query() == []
+
+
+def test_read_after_truncation_to_empty_yields_nothing(tmp_path):
+    log_file = tmp_path / "agent-team.log"
+    write_lines(log_file, [event(1.0)])
+    index = LogIndex(str(log_file))
+    index.update()
+
+    log_file.write_bytes(b"")
+    assert list(index.read([0])) == []
@@ -0,0 +1,50 @@
+"""Tests for the buffered structured log writer."""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from utils.log_writer import LogWriter
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent / "scripts"
+
+
+def read_events(path):
+    return [json.loads(line) for line in Path(path).read_text(encoding="utf-8").splitlines()]
+
+
+def test_audit_events_are_written_at_exit(tmp_path):
+    log_file = tmp_path / "agent-team.log"
+    code = "from utils.log_writer import audit\nfor i in range(5):\n    audit('agent.deploy', n=i)\n"
+    env = dict(os.environ, LOG_FILE=str(log_file))
+    subprocess.run([sys.executable, "-c", code], cwd=SCRIPTS_DIR, env=env, check=True, timeout=30)
+
+    events = read_events(log_file)
+    assert [event["n"] for event in events] == list(range(5))
+    assert {event["level"] for event in events} == {"AUDIT"}
+
+
+def test_flush_waits_for_batches_being_written(tmp_path):
+    writer = LogWriter(str(tmp_path / "agent-team.log"), batch_size=10, flush_interval=60)
+    try:
+        for i in range(1000):
+            writer.info("tool.invoke", n=i)
+        writer.flush()
+        assert len(read_events(writer.path)) == 1000
+        assert writer.stats()["written"] == 1000
+    finally:
+        writer.close()
+
+
+def test_overflow_drops_info_but_keeps_warnings_up_to_the_overflow_limit(tmp_path):
+    writer = LogWriter(str(tmp_path / "agent-team.log"), capacity=10, flush_interval=60, batch_size=1000)
+    try:
+        results = [writer.info("info", n=i) for i in range(15)]
+        warnings = [writer.warning("warning", n=i) for i in range(15)]
+        assert results.count(True) == 10
+        assert warnings.count(True) == 10
+        assert writer.stats()["dropped"] == 10
+    finally:
+        writer.close()
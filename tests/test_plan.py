@@ -0,0 +1,94 @@
+"""Tests for deployment plans and how deploy-agents applies them."""
+
+import sys
+
+import pytest
+
+from tests.conftest import load_script
+from utils.backend import StandInBackend
+from utils.plan import CREATE, DELETE, NOOP, UPDATE, apply_plan, build_plan, diff_agent, format_plan
+
+deploy_agents = load_script("deploy-agents")
+
+ORCHESTRATOR = {"id": "orchestrator", "name": "Orchestrator", "toolkits": ["Web Search"], "prompt": "v1"}
+TROUBLESHOOTER = {"id": "troubleshooter", "name": "Troubleshooter", "toolkits": [], "prompt": "v1"}
+
+
+def test_missing_agents_are_created_and_matching_agents_are_left_alone():
+    actions = build_plan([ORCHESTRATOR, TROUBLESHOOTER], [dict(ORCHESTRATOR, version=7)])
+
+    assert [(a.action, a.agent_id) for a in actions] == [(NOOP, "orchestrator"), (CREATE, "troubleshooter")]
+    assert not actions[0].mutating
+
+
+def test_update_lists_only_the_changed_fields():
+    desired = dict(ORCHESTRATOR, prompt="v2", toolkits=["Web Search", "File Management"])
+    (action,) = build_plan([desired], [ORCHESTRATOR])
+
+    assert action.action == UPDATE
+    assert action.changes == {
+        "prompt": ("v1", "v2"),
+        "toolkits": (["Web Search"], ["Web Search", "File Management"]),
+    }
+
+
+def test_fields_only_the_service_sets_are_ignored():
+    assert diff_agent(ORCHESTRATOR, dict(ORCHESTRATOR, created_at="2026-01-30", version=3)) == {}
+    assert diff_agent(dict(ORCHESTRATOR, description="new"), ORCHESTRATOR) == {"description": (None, "new")}
+
+
+def test_undesired_agents_are_deleted_only_with_prune():
+    deployed = [ORCHESTRATOR, TROUBLESHOOTER]
+    assert [a.action for a in build_plan([ORCHESTRATOR], deployed)] == [NOOP]
+
+    actions = build_plan([ORCHESTRATOR], deployed, prune=True)
+    assert [(a.action, a.agent_id) for a in actions] == [(NOOP, "orchestrator"), (DELETE, "troubleshooter")]
+
+
+def test_applying_a_plan_issues_only_the_mutating_calls():
+    backend = StandInBackend()
+    backend.create_agent(ORCHESTRATOR)
+    backend.create_agent(dict(TROUBLESHOOTER, id="retired"))
+    backend.calls.clear()
+
+    desired = [ORCHESTRATOR, dict(TROUBLESHOOTER, prompt="v2")]
+    actions = build_plan(desired, backend.list_agents(), prune=True)
+    assert apply_plan(actions, backend) == 2
+
+    assert backend.calls == {"list_agents": 1, "create_agent": 1, "delete_agent": 1}
+    assert all(a.action == NOOP for a in build_plan(desired, backend.list_agents(), prune=True))
+
+
+def test_format_plan_shows_symbols_changes_and_totals():
+    actions = build_plan([dict(ORCHESTRATOR, prompt="v2"), TROUBLESHOOTER], [ORCHESTRATOR])
+    text = format_plan(actions)
+
+    assert "  ~ update orchestrator" in text
+    assert "        prompt: 'v1' → 'v2'" in text
+    assert "  + create troubleshooter" in text
+    assert text.endswith("Plan: 1 to create, 1 to update, 0 to delete, 0 unchanged")
+
+
+class FailingBackend(StandInBackend):
+    def create_agent(self, config):
+        if config["id"] == "microsoft-code-generator":
+            raise ConnectionError("backend unavailable")
+        return super().create_agent(config)
+
+
+def test_failed_action_marks_the_agent_and_phase_failed(capsys):
+    backend = FailingBackend()
+
+    assert not deploy_agents.deploy_phase("phase2", backend)
+    output = capsys.readouterr().out
+    assert "❌ Failed: Microsoft Code Generator (ConnectionError: backend unavailable)" in output
+    assert "Deployed: 1/2 agents" in output
+    assert [a["id"] for a in backend.list_agents()] == ["microsoft-knowledge-specialist"]
+
+
+def test_plan_without_agent_selection_is_a_usage_error(monkeypatch, capsys):
+    monkeypatch.setattr(sys, "argv", ["deploy-agents.py", "--plan"])
+    with pytest.raises(SystemExit) as exit_info:
+        deploy_agents.main()
+    assert exit_info.value.code == 2
+    assert "--plan needs --all or --phase" in capsys.readouterr().err
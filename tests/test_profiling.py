@@ -0,0 +1,79 @@
+"""Tests for the shared --profile support."""
+
+import pstats
+import sys
+import threading
+import time
+
+import pytest
+
+from utils.profiling import StackSampler, run_with_profiling
+
+
+def busy_main():
+    deadline = time.perf_counter() + 0.1
+    while time.perf_counter() < deadline:
+        sum(range(1000))
+    return sys.argv[1:]
+
+
+@pytest.fixture
+def profile_dir(tmp_path, monkeypatch):
+    monkeypatch.delenv("AGENT_PROFILE", raising=False)
+    return tmp_path / "profiles"
+
+
+def run(monkeypatch, *argv):
+    monkeypatch.setattr(sys, "argv", ["deploy-agents.py", *argv])
+    return run_with_profiling(busy_main)
+
+
+def test_profiling_options_are_stripped_and_off_by_default(monkeypatch, profile_dir):
+    assert run(monkeypatch, "--all", "--profile-dir", str(profile_dir)) == ["--all"]
+    assert not profile_dir.exists()
+
+
+def test_deterministic_mode_writes_pstats_without_sampling(monkeypatch, profile_dir, capsys):
+    started = []
+    monkeypatch.setattr(StackSampler, "start", lambda self: started.append(self) or self)
+
+    assert run(monkeypatch, "--profile", "--profile-dir", str(profile_dir), "--all") == ["--all"]
+
+    (pstats_file,) = profile_dir.iterdir()
+    assert pstats_file.name.startswith("deploy-agents-") and pstats_file.suffix == ".pstats"
+    functions = {name for _, _, name in pstats.Stats(str(pstats_file)).stats}
+    assert "busy_main" in functions
+    assert started == []
+    assert "pstats:" in capsys.readouterr().out
+
+
+def test_sampling_mode_writes_collapsed_stacks(monkeypatch, profile_dir, capsys):
+    monkeypatch.setenv("AGENT_PROFILE", "1")
+    run(monkeypatch, "--profile-mode", "sampling", "--profile-interval", "1", "--profile-dir", str(profile_dir))
+
+    (collapsed_file,) = profile_dir.iterdir()
+    assert collapsed_file.suffix == ".collapsed"
+    lines = collapsed_file.read_text(encoding="utf-8").splitlines()
+    stack, count = lines[0].rsplit(" ", 1)
+    assert int(count) > 0
+    assert stack.startswith("MainThread;")
+    assert any("busy_main (test_profiling.py:" in line for line in lines)
+    assert "Function (inclusive)" in capsys.readouterr().out
+
+
+def test_sampler_roots_stacks_at_the_thread_name():
+    stop = threading.Event()
+    worker = threading.Thread(target=stop.wait, name="deploy-worker-0")
+    worker.start()
+    sampler = StackSampler(interval_ms=1).start()
+    try:
+        time.sleep(0.05)
+    finally:
+        sampler.stop()
+        stop.set()
+        worker.join()
+
+    assert sampler.samples > 0
+    assert any(stack.startswith("deploy-worker-0;") for stack in sampler.stacks)
+    assert not any(stack.startswith("profile-sampler;") for stack in sampler.stacks)
+    assert all(count <= sampler.samples for _, count in sampler.hot_spots(10))
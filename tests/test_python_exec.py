@@ -0,0 +1,52 @@
+"""Tests for the Python Execution toolkit's warm pool and tool wrapper."""
+
+import asyncio
+import threading
+
+import pytest
+
+from utils import python_exec
+from utils.python_exec import PythonExecuteTool, PythonExecutionPool
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    pool = PythonExecutionPool(workers=1, preload=())
+    monkeypatch.setattr(python_exec, "_pool", pool)
+    yield pool
+    pool.close()
+
+
+def test_snippet_output_is_returned(pool):
+    result = asyncio.run(PythonExecuteTool().invoke({"code": "print(6 * 7)"}))
+    assert result["success"]
+    assert result["data"]["stdout"] == "42\n"
+
+
+def test_timeout_is_a_non_retryable_execution_failure(pool):
+    result = asyncio.run(PythonExecuteTool().invoke({"code": "while True: pass", "timeout_seconds": 0.5}))
+    assert not result["success"]
+    assert result["error"]["code"] == "TOOL_EXECUTION_FAILED"
+    assert result["error"]["is_retryable"] is False
+    assert result["error"]["details"]["type"] == "TimeoutError"
+
+
+def test_timed_out_worker_is_replaced_without_forking(pool):
+    assert not pool.run("while True: pass", timeout=0.5)["success"]
+    (replacement,) = list(pool._idle.queue)
+    assert replacement.process._start_method in ("forkserver", "spawn")
+    assert pool.run("import json; print(json.dumps([1]))")["stdout"] == "[1]\n"
+
+
+def test_stats_are_consistent_under_concurrent_runs():
+    pool = PythonExecutionPool(workers=2, preload=())
+    try:
+        threads = [threading.Thread(target=lambda: [pool.run("pass") for _ in range(10)]) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        stats = pool.stats()
+    finally:
+        pool.close()
+    assert (stats["runs"], stats["failures"], stats["idle"]) == (40, 0, 2)
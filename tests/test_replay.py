@@ -0,0 +1,77 @@
+"""Tests for recording and replaying orchestrator traffic."""
+
+import sys
+
+import pytest
+
+from tests.conftest import load_script
+from utils.backend import StandInBackend
+from utils.replay import ORCHESTRATOR, Recorder, Recording, Replayer
+from utils.routing import get_router
+
+test_agents = load_script("test-agents")
+
+REQUESTS = [
+    "Design a topic structure for an HR onboarding agent",
+    "My custom connector returns 401 after an hour, how do I fix it?",
+]
+
+
+class CountingBackend(StandInBackend):
+    """Answers every call differently, so replay must return recorded responses in order"""
+
+    def invoke_agent(self, agent_id: str, message: str) -> str:
+        self._call("invoke_agent")
+        return f"[{agent_id}] reply {self.calls['invoke_agent']}"
+
+
+def record(path, repeats=3):
+    router = get_router("assistant")
+    with Recorder(str(path)) as recorder:
+        backend = recorder.wrap(CountingBackend())
+        for message in REQUESTS * repeats:
+            with recorder.exchange(ORCHESTRATOR, message, session_id="s1") as exchange:
+                exchange.agent = router.route_one(message)
+                exchange.response = backend.invoke_agent(exchange.agent, message)
+    return Recording(str(path))
+
+
+def comparable(report):
+    return {key: value for key, value in report.items()
+            if key not in ("wall_seconds", "requests_per_second", "overhead_ms")}
+
+
+def test_replay_matches_the_recording(tmp_path):
+    report = Replayer(record(tmp_path / "traffic.rec")).run()
+    assert report["requests"] == 6
+    assert report["specialist_calls"] == 6
+    assert report["response_mismatches"] == 0
+    assert report["route_mismatches"] == 0
+    assert report["errors"] == 0
+
+
+def test_replaying_twice_gives_the_same_report(tmp_path):
+    replayer = Replayer(record(tmp_path / "traffic.rec"))
+    first, second = replayer.run(), replayer.run()
+    assert comparable(second) == comparable(first)
+    assert second["response_mismatches"] == 0
+    assert second["specialist_calls"] == 6
+
+
+def test_replay_of_a_missing_or_invalid_file_is_an_error(tmp_path, capsys):
+    not_a_recording = tmp_path / "notes.txt"
+    not_a_recording.write_text("hello", encoding="utf-8")
+
+    assert test_agents.run_replay(str(tmp_path / "missing.rec")) == 1
+    assert "❌ Error: Cannot replay" in capsys.readouterr().out
+    assert test_agents.run_replay(str(not_a_recording)) == 1
+    assert "is not a recording" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize("speed", ["-1", "nan", "inf"])
+def test_invalid_replay_speed_is_a_usage_error(monkeypatch, capsys, speed):
+    monkeypatch.setattr(sys, "argv", ["test-agents.py", "--replay", "traffic.rec", "--replay-speed", speed])
+    with pytest.raises(SystemExit) as exit_info:
+        test_agents.main()
+    assert exit_info.value.code == 2
+    assert "--replay-speed" in capsys.readouterr().err
@@ -0,0 +1,114 @@
+"""Tests for request admission, deadline shedding and cancellation."""
+
+import asyncio
+import time
+
+import pytest
+
+from utils.scheduler import AdmissionRejected, Priority, RequestScheduler
+
+
+async def hold(event: asyncio.Event) -> str:
+    await event.wait()
+    return "done"
+
+
+def test_full_queue_rejects_up_front():
+    async def scenario():
+        scheduler = RequestScheduler(max_parallel_tasks=1, queue_limits={"interactive": 1})
+        release = asyncio.Event()
+        running = asyncio.create_task(scheduler.run(hold, release))
+        queued = asyncio.create_task(scheduler.run(hold, release))
+        await asyncio.sleep(0)
+        with pytest.raises(AdmissionRejected) as rejected:
+            await scheduler.run(hold, release)
+        release.set()
+        assert await asyncio.gather(running, queued) == ["done", "done"]
+        return rejected.value.reason, scheduler.metrics()["interactive"]
+
+    reason, metrics = asyncio.run(scenario())
+    assert reason == "queue_full"
+    assert metrics["queue_full"] == 1
+    assert metrics["completed"] == 2
+
+
+def test_unreachable_deadline_is_rejected_at_admission():
+    async def scenario():
+        scheduler = RequestScheduler(max_parallel_tasks=1)
+        await scheduler.run(asyncio.sleep, 0.05)
+        release = asyncio.Event()
+        running = asyncio.create_task(scheduler.run(hold, release))
+        await asyncio.sleep(0)
+        with pytest.raises(AdmissionRejected) as rejected:
+            await scheduler.run(hold, release, timeout=0.001)
+        release.set()
+        await running
+        return rejected.value.reason
+
+    assert asyncio.run(scenario()) == "deadline"
+
+
+def test_queued_request_is_shed_when_its_deadline_passes():
+    async def scenario():
+        scheduler = RequestScheduler(max_parallel_tasks=1)
+        release = asyncio.Event()
+        running = asyncio.create_task(scheduler.run(hold, release))
+        await asyncio.sleep(0)
+        started = time.monotonic()
+        with pytest.raises(AdmissionRejected) as rejected:
+            await scheduler.run(hold, release, timeout=0.05)
+        waited = time.monotonic() - started
+        metrics = scheduler.metrics()["interactive"]
+        release.set()
+        await running
+        return rejected.value.reason, waited, metrics
+
+    reason, waited, metrics = asyncio.run(scenario())
+    assert reason == "expired"
+    assert waited < 1.0
+    assert metrics["expired"] == 1
+    assert metrics["queue_depth"] == 0
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    async def scenario():
+        scheduler = RequestScheduler(max_parallel_tasks=1, queue_limits={"interactive": 1})
+        release = asyncio.Event()
+        running = asyncio.create_task(scheduler.run(hold, release))
+        queued = asyncio.create_task(scheduler.run(hold, release))
+        await asyncio.sleep(0)
+        assert scheduler.metrics()["interactive"]["queue_depth"] == 1
+
+        queued.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await queued
+        depth = scheduler.metrics()["interactive"]["queue_depth"]
+        replacement = asyncio.create_task(scheduler.run(hold, release))
+        await asyncio.sleep(0)
+        release.set()
+        return depth, await asyncio.gather(running, replacement)
+
+    depth, results = asyncio.run(scenario())
+    assert depth == 0
+    assert results == ["done", "done"]
+
+
+def test_interactive_requests_dispatch_before_batch():
+    async def scenario():
+        scheduler = RequestScheduler(max_parallel_tasks=1)
+        order = []
+
+        async def record(label):
+            order.append(label)
+
+        release = asyncio.Event()
+        running = asyncio.create_task(scheduler.run(hold, release))
+        await asyncio.sleep(0)
+        batch = asyncio.create_task(scheduler.run(record, "batch", priority=Priority.BATCH))
+        interactive = asyncio.create_task(scheduler.run(record, "interactive"))
+        await asyncio.sleep(0)
+        release.set()
+        await asyncio.gather(running, batch, interactive)
+        return order
+
+    assert asyncio.run(scenario()) == ["interactive", "batch"]
@@ -0,0 +1,121 @@
+"""Tests for the conversation session store."""
+
+import os
+
+import pytest
+
+from utils.sessions import SESSION_OVERHEAD_BYTES, SessionStore
+
+
+class Clock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def make_store(tmp_path, clock):
+    stores = []
+
+    def make(**kwargs):
+        kwargs.setdefault("spill_file", str(tmp_path / "sessions-{pid}.db"))
+        stores.append(SessionStore(timeout_minutes=30, clock=clock, **kwargs))
+        return stores[-1]
+
+    yield make
+    for store in stores:
+        store.close()
+
+
+# Room for two empty sessions, not three
+TWO_SESSIONS_MB = (SESSION_OVERHEAD_BYTES * 2.5) / (1024 * 1024)
+
+
+def test_idle_session_expires_after_the_timeout(make_store, clock):
+    store = make_store()
+    store.create("a")
+    store.create("b")
+
+    clock.now += 20 * 60
+    store.append_turn("b", "user", "still here")
+    clock.now += 15 * 60
+
+    assert store.get("a") is None
+    assert store.get("b") is not None
+    assert store.stats()["expired"] == 1
+    with pytest.raises(KeyError):
+        store.append_turn("a", "user", "too late")
+
+
+def test_session_is_not_expired_early(make_store, clock):
+    store = make_store()
+    store.create("a")
+    clock.now += 30 * 60 - 1
+    assert store.expire() == 0
+    assert store.get("a") is not None
+
+
+def test_least_recently_used_session_spills_over_the_memory_limit(make_store):
+    store = make_store(memory_limit_mb=TWO_SESSIONS_MB)
+    store.create("a")
+    store.create("b")
+    store.get("a")
+    store.create("c")
+
+    stats = store.stats()
+    assert (stats["live_sessions"], stats["spilled_sessions"]) == (2, 1)
+    assert stats["memory_bytes"] <= stats["memory_limit_bytes"]
+    assert len(store) == 3
+    assert "b" not in store._sessions
+
+
+def test_spilled_session_is_restored_with_its_turns(make_store, clock):
+    store = make_store(memory_limit_mb=TWO_SESSIONS_MB * 4)
+    store.create("a", user_id="alex", tenant_id="contoso")
+    store.append_turn("a", "user", "What's on my calendar?")
+    clock.now += 5
+    store.append_turn("a", "assistant", "Two meetings.", agent="m365_agent")
+    store.create("b")
+    store.create("c")
+    store.append_turn("c", "user", "y" * 4000)
+    assert "a" not in store._sessions
+
+    session = store.get("a")
+    assert (session.user_id, session.tenant_id) == ("alex", "contoso")
+    assert [(t.role, t.content, t.agent) for t in store.turns("a")] == [
+        ("user", "What's on my calendar?", None),
+        ("assistant", "Two meetings.", "m365_agent"),
+    ]
+    assert store.stats()["restored"] == 1
+
+
+def test_spilled_session_expires_on_disk(make_store, clock):
+    store = make_store(memory_limit_mb=TWO_SESSIONS_MB)
+    for session_id in "abc":
+        store.create(session_id)
+    assert store.stats()["spilled_sessions"] == 1
+
+    clock.now += 31 * 60
+    stats = store.stats()
+    assert (stats["live_sessions"], stats["spilled_sessions"], stats["expired"]) == (0, 0, 3)
+    assert store.get("a") is None
+
+
+def test_close_drops_sessions_and_removes_the_spill_file(make_store):
+    store = make_store(memory_limit_mb=TWO_SESSIONS_MB)
+    for session_id in "abc":
+        store.create(session_id)
+    spill_file = store.spill_file
+    assert store.stats()["spilled_sessions"] == 1
+
+    store.close()
+    assert len(store) == 0
+    assert store.get("a") is None
+    assert not os.path.exists(spill_file)
@@ -0,0 +1,46 @@
+"""Tests for telemetry batching and the offline disk buffer."""
+
+from utils import telemetry
+from utils.telemetry import DEFAULT_INGESTION_ENDPOINT, TRACK_PATH, IngestionStandIn, TelemetryClient
+
+
+def test_empty_endpoint_override_falls_back_to_the_default(monkeypatch, tmp_path):
+    monkeypatch.setenv("APPLICATION_INSIGHTS_KEY", "00000000-0000-0000-0000-000000000000")
+    monkeypatch.setenv("APPLICATION_INSIGHTS_ENDPOINT", "")
+    monkeypatch.setattr(telemetry, "_telemetry", telemetry.NullTelemetry())
+    client = telemetry.configure_telemetry(start=False, buffer_dir=str(tmp_path))
+    try:
+        assert client.url == DEFAULT_INGESTION_ENDPOINT + TRACK_PATH
+    finally:
+        client.close()
+
+
+def test_batch_is_kept_on_disk_when_the_endpoint_is_invalid(tmp_path):
+    client = TelemetryClient("key", "not-a-url", start=False, buffer_dir=str(tmp_path))
+    client.increment("requests", agent="m365_agent")
+    assert client.flush() is False
+    assert client.stats()["buffered_batches"] == 1
+
+    stand_in = IngestionStandIn().start()
+    try:
+        client.url = stand_in.endpoint + TRACK_PATH
+        assert client.flush() is True
+        assert client.stats()["buffered_batches"] == 0
+        assert [item["data"]["baseData"]["metrics"][0]["name"] for item in stand_in.items] == ["requests"]
+    finally:
+        stand_in.stop()
+
+
+def test_unavailable_endpoint_buffers_then_resends_in_order(tmp_path):
+    stand_in = IngestionStandIn().start()
+    client = TelemetryClient("key", stand_in.endpoint, start=False, buffer_dir=str(tmp_path))
+    try:
+        stand_in.available = False
+        client.track_event("first")
+        assert client.flush() is False
+        stand_in.available = True
+        client.track_event("second")
+        assert client.flush() is True
+        assert [item["data"]["baseData"]["name"] for item in stand_in.items] == ["first", "second"]
+    finally:
+        stand_in.stop()
@@ -0,0 +1,114 @@
+"""Tests for the token cache's proactive refresh scheduling."""
+
+import os
+import threading
+import time
+
+import pytest
+
+from utils import token_cache
+from utils.token_cache import MIN_REFRESH_DELAY_SECONDS, AccessToken, CachedTokenProvider
+
+SCOPE = "https://graph.microsoft.com/.default"
+
+
+class StubAcquirer:
+    """Issues tokens with a fixed lifetime; calls after the first block until released."""
+
+    def __init__(self, lifetime: float):
+        self.lifetime = lifetime
+        self.calls = 0
+        self.release = threading.Event()
+
+    def __call__(self, *scopes):
+        self.calls += 1
+        if self.calls > 1:
+            self.release.wait(5)
+        return AccessToken(f"token-{self.calls}", int(time.time() + self.lifetime))
+
+
+def make_provider(acquirer, refresh_margin=300, cache_file=None):
+    return CachedTokenProvider("tenant", "client", cache_file=cache_file, cache_key="secret",
+                               refresh_margin=refresh_margin, acquirer=acquirer)
+
+
+def test_short_lived_token_is_refreshed_halfway_not_immediately():
+    acquirer = StubAcquirer(lifetime=120)
+    with make_provider(acquirer) as provider:
+        provider.get_token(SCOPE)
+        (timer,) = provider._timers.values()
+        assert timer.interval >= 59
+        for _ in range(10):
+            provider.get_token(SCOPE)
+        assert acquirer.calls == 1
+        assert provider.stats()["background_refreshes"] == 0
+
+
+def test_refresh_delay_has_a_floor():
+    acquirer = StubAcquirer(lifetime=1)
+    with make_provider(acquirer) as provider:
+        provider._schedule_refresh(provider._key((SCOPE,)), (SCOPE,), AccessToken("t", int(time.time())))
+        (timer,) = provider._timers.values()
+        assert timer.interval == MIN_REFRESH_DELAY_SECONDS
+
+
+def test_one_background_refresh_in_flight_per_token():
+    acquirer = StubAcquirer(lifetime=3600)
+    with make_provider(acquirer) as provider:
+        key = provider._key((SCOPE,))
+        provider.get_token(SCOPE)
+        provider._refresh_at[key] = time.time() - 1  # refresh is due
+
+        before = threading.active_count()
+        tokens = {provider.get_token(SCOPE).token for _ in range(50)}
+        assert tokens == {"token-1"}
+        assert threading.active_count() - before <= 1
+
+        acquirer.release.set()
+        deadline = time.time() + 5
+        while provider.get_token(SCOPE).token == "token-1" and time.time() < deadline:
+            time.sleep(0.01)
+        assert provider.get_token(SCOPE).token == "token-2"
+        assert acquirer.calls == 2
+        assert provider.stats()["background_refreshes"] == 1
+
+
+needs_shared_cache = pytest.mark.skipif(token_cache.Fernet is None or os.name == "nt",
+                                        reason="needs cryptography and flock")
+
+
+@needs_shared_cache
+def test_short_lived_token_is_reused_from_the_shared_cache(tmp_path):
+    cache_file = str(tmp_path / "tokens.bin")
+    with make_provider(StubAcquirer(lifetime=120), cache_file=cache_file) as first:
+        first.get_token(SCOPE)
+
+    acquirer = StubAcquirer(lifetime=120)
+    with make_provider(acquirer, cache_file=cache_file) as second:
+        assert second.get_token(SCOPE).token == "token-1"
+        assert acquirer.calls == 0
+        assert second.stats()["disk_hits"] == 1
+
+
+@needs_shared_cache
+def test_file_lock_is_not_held_while_acquiring(tmp_path):
+    import fcntl
+
+    cache_file = tmp_path / "tokens.bin"
+    lock_free = []
+
+    def acquirer(*scopes):
+        fd = os.open(str(cache_file) + ".lock", os.O_RDWR | os.O_CREAT)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            lock_free.append(True)
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        except BlockingIOError:
+            lock_free.append(False)
+        finally:
+            os.close(fd)
+        return AccessToken("token", int(time.time() + 3600))
+
+    with make_provider(acquirer, cache_file=str(cache_file)) as provider:
+        provider.get_token(SCOPE)
+    assert lock_free == [True]
@@ -0,0 +1,106 @@
+"""Tests for the indexed tool registry."""
+
+import sys
+
+import pytest
+
+from utils.tool_registry import UNIVERSAL_PLATFORM, ToolNotFoundError, ToolRegistry
+from utils.tools import ITool, ToolMetadata, ToolType
+
+
+def metadata(name, platform, category="calendar"):
+    return ToolMetadata(name=name, category=category, description=name, tool_type=ToolType.SELF_BUILT,
+                        platform=platform, version="1.0.0", parameters={}, authentication_required=False)
+
+
+class BaseTool(ITool):
+    async def invoke(self, parameters, auth_context=None, execution_context=None):
+        return {"success": True, "data": None, "metadata": {}, "error": None}
+
+
+def make_tool(name, platform, category="calendar"):
+    class Tool(BaseTool):
+        pass
+
+    Tool.metadata = metadata(name, platform, category)
+    Tool.configured_for = None
+    Tool.configure_platform = lambda self, value: setattr(self, "configured_for", value)
+    return Tool
+
+
+@pytest.fixture
+def registry():
+    return ToolRegistry()
+
+
+def test_tool_without_invoke_cannot_be_instantiated():
+    class Incomplete(ITool):
+        metadata = metadata("calendar.read", "microsoft")
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_platform_tool_is_preferred_and_instances_are_shared(registry):
+    native = registry.register(make_tool("calendar.create_event", "microsoft"))
+    registry.register(make_tool("calendar.create_event", UNIVERSAL_PLATFORM))
+
+    tool = registry.get_tool("calendar.create_event", "microsoft")
+    assert isinstance(tool, native)
+    assert registry.get_tool("calendar.create_event", "microsoft") is tool
+
+
+def test_universal_tool_is_configured_for_the_platform(registry):
+    registry.register(make_tool("calendar.create_event", UNIVERSAL_PLATFORM))
+
+    google = registry.get_tool("calendar.create_event", "google_cloud")
+    aws = registry.get_tool("calendar.create_event", "aws")
+    assert (google.configured_for, aws.configured_for) == ("google_cloud", "aws")
+    with pytest.raises(ToolNotFoundError):
+        registry.get_tool("email.send", "microsoft")
+
+
+def test_list_tools_lists_each_name_once_per_platform(registry):
+    registry.register(make_tool("calendar.create_event", "microsoft"))
+    registry.register(make_tool("calendar.create_event", UNIVERSAL_PLATFORM))
+    registry.register(make_tool("calendar.read", UNIVERSAL_PLATFORM))
+    registry.register(make_tool("storage.upload", "microsoft", category="storage"))
+
+    listed = registry.list_tools(platform="microsoft")
+    assert sorted((m.name, m.platform) for m in listed) == [
+        ("calendar.create_event", "microsoft"),
+        ("calendar.read", UNIVERSAL_PLATFORM),
+        ("storage.upload", "microsoft"),
+    ]
+    assert [m.name for m in registry.list_tools(category="calendar", platform="aws")] == [
+        "calendar.create_event", "calendar.read",
+    ]
+    assert len(registry.list_tools()) == 4
+
+
+def test_reregistering_replaces_the_index_entry(registry):
+    registry.register(make_tool("calendar.read", "microsoft"))
+    replacement = registry.register(make_tool("calendar.read", "microsoft"))
+
+    assert registry.list_tools(platform="microsoft") == [replacement.metadata]
+    assert isinstance(registry.get_tool("calendar.read", "microsoft"), replacement)
+
+
+def test_platform_module_is_imported_lazily_and_retried_after_a_failure(registry, tmp_path, monkeypatch):
+    module = tmp_path / "lazy_google_tools.py"
+    module.write_text("raise ImportError('SDK not installed')\n", encoding="utf-8")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, "lazy_google_tools", raising=False)
+    registry.add_platform_module("google_cloud", "lazy_google_tools")
+
+    assert registry.list_tools(platform="microsoft") == []
+    with pytest.raises(ImportError):
+        registry.list_tools(platform="google_cloud")
+
+    module.write_text("IMPORTED = True\n", encoding="utf-8")
+    assert registry.list_tools(platform="google_cloud") == []
+    assert sys.modules["lazy_google_tools"].IMPORTED
+
+    del sys.modules["lazy_google_tools"]
+    registry.list_tools(platform="google_cloud")
+    assert "lazy_google_tools" not in sys.modules
@@ -0,0 +1,154 @@
+"""Tests for span tracing, JSONL export and the trace viewer."""
+
+import asyncio
+import contextvars
+import threading
+
+import pytest
+
+from tests.conftest import load_script
+from utils.tracing import JsonlSpanExporter, Span, Tracer, load_spans, render_waterfall
+
+trace_viewer = load_script("trace-viewer")
+
+
+class MemoryExporter:
+    def __init__(self):
+        self.batches = []
+
+    def export(self, spans):
+        self.batches.append(list(spans))
+
+    @property
+    def spans(self):
+        return {span.name: span for batch in self.batches for span in batch}
+
+
+@pytest.fixture
+def exporter():
+    return MemoryExporter()
+
+
+@pytest.fixture
+def tracer(exporter):
+    return Tracer([exporter], batch_size=1)
+
+
+def test_spans_nest_within_a_trace(tracer, exporter):
+    with tracer.span("request") as root:
+        with tracer.span("route", agent="troubleshooter") as child:
+            assert tracer.current_span() is child
+        assert tracer.current_span() is root
+    assert tracer.current_span() is None
+
+    spans = exporter.spans
+    assert spans["route"].parent_id == root.span_id
+    assert spans["route"].trace_id == root.trace_id
+    assert spans["route"].attributes == {"agent": "troubleshooter"}
+    assert root.parent_id is None
+
+
+def test_threads_with_a_copied_context_inherit_the_current_span(tracer, exporter):
+    def work():
+        with tracer.span("worker"):
+            pass
+
+    with tracer.span("request") as root:
+        copied = threading.Thread(target=contextvars.copy_context().run, args=(work,))
+        plain = threading.Thread(target=work)
+        for thread in (copied, plain):
+            thread.start()
+            thread.join()
+
+    workers = [span for batch in exporter.batches for span in batch if span.name == "worker"]
+    assert [(span.parent_id, span.trace_id == root.trace_id) for span in workers] == [
+        (root.span_id, True), (None, False),
+    ]
+
+
+def test_concurrent_async_tasks_keep_separate_parents(tracer, exporter):
+    async def specialist(name):
+        with tracer.span(name):
+            await asyncio.sleep(0.01)
+            with tracer.span(f"{name}.tool"):
+                await asyncio.sleep(0)
+
+    async def handle():
+        with tracer.span("request") as root:
+            await asyncio.gather(specialist("a"), specialist("b"))
+        return root
+
+    root = asyncio.run(handle())
+    spans = exporter.spans
+    assert spans["a"].parent_id == spans["b"].parent_id == root.span_id
+    assert spans["a.tool"].parent_id == spans["a"].span_id
+    assert spans["b.tool"].parent_id == spans["b"].span_id
+
+
+def test_failed_block_marks_the_span_as_an_error(tracer, exporter):
+    with pytest.raises(ValueError):
+        with tracer.span("deploy"):
+            raise ValueError("bad config")
+
+    span = exporter.spans["deploy"]
+    assert (span.status, span.status_message) == ("error", "ValueError: bad config")
+    assert span.end_ns is not None
+
+
+def test_jsonl_export_is_batched_and_read_back(tmp_path):
+    path = tmp_path / "traces.jsonl"
+    tracer = Tracer([JsonlSpanExporter(str(path))], batch_size=3)
+    with tracer.span("first") as first:
+        with tracer.span("child"):
+            pass
+    assert not path.exists()
+    with tracer.span("second"):
+        pass
+    assert len(path.read_text(encoding="utf-8").splitlines()) == 3
+
+    with tracer.span("third"):
+        pass
+    tracer.flush()
+    assert [span.name for span in load_spans(str(path))] == ["child", "first", "second", "third"]
+
+    spans = load_spans(str(path), first.trace_id[:8])
+    assert sorted(span.name for span in spans) == ["child", "first"]
+    assert spans[0].to_dict() == Span.from_dict(spans[0].to_dict()).to_dict()
+
+
+def make_span(name, span_id, parent_id, start_ms, end_ms, status="ok"):
+    return Span(name=name, trace_id="t" * 32, span_id=span_id, parent_id=parent_id,
+                start_ns=start_ms * 1_000_000, end_ns=end_ms * 1_000_000, status=status)
+
+
+def test_waterfall_indents_children_and_positions_bars():
+    spans = [
+        make_span("tool.attempt", "c", "b", 50, 100, status="error"),
+        make_span("request", "a", None, 0, 100),
+        make_span("route", "b", "a", 50, 100),
+    ]
+    lines = render_waterfall(spans, width=10)
+
+    assert [line[3:].split()[0] for line in lines] == ["request", "route", "tool.attempt"]
+    assert lines[0].startswith("   request ")
+    assert lines[1].startswith("     route ")
+    assert lines[2].startswith("❌     tool.attempt ")
+    assert lines[0].endswith("100.0 ms |██████████|")
+    assert lines[1].endswith("50.0 ms |     █████|")
+    assert render_waterfall([]) == []
+
+
+def test_viewer_shows_a_trace_by_prefix(tmp_path, capsys):
+    path = tmp_path / "traces.jsonl"
+    JsonlSpanExporter(str(path)).export([
+        make_span("request", "a", None, 0, 100),
+        make_span("route", "b", "a", 10, 20, status="error"),
+    ])
+
+    assert trace_viewer.show_trace(str(path), "tttt", width=10) == 0
+    output = capsys.readouterr().out
+    assert "Trace " + "t" * 32 + " (2 spans)" in output
+    assert "1 span(s) failed" in output
+
+    assert trace_viewer.show_trace(str(path), "missing", width=10) == 1
+    assert "No spans found" in capsys.readouterr().out